@@ -0,0 +1,134 @@
+"""
+kline 列式 batch vs 旧的 list[dict] 路径：180 天 1m 回填的吞吐与内存对比
+
+    cd src && python -m benchmarks.kline_batch
+"""
+
+from datetime import datetime
+import time
+import tracemalloc
+
+from klines.batch import KlineBatch
+import numpy as np
+
+DAYS = 180
+PAGE = 1000
+FLUSH_ROWS = 50_000  # 与 KlineSink 默认 max_rows 一致
+INTERVAL_MS = 60_000
+BINANCE_FIELDS = {
+    "timestamp": 0,
+    "open": 1,
+    "high": 2,
+    "low": 3,
+    "close": 4,
+    "volume": 5,
+    "quote_volume": 7,
+    "count": 8,
+}
+
+
+def make_pages(days: int = DAYS, page: int = PAGE) -> list[list[list]]:
+    """生成 Binance /klines 格式的原始响应（数值为字符串）"""
+    n = days * 1440
+    start = 1_700_000_000_000 // INTERVAL_MS * INTERVAL_MS
+    rng = np.random.default_rng(0)
+    close = 40_000 + rng.normal(0, 20, n).cumsum()
+    rows = [
+        [
+            start + i * INTERVAL_MS,
+            f"{close[i] - 3:.2f}",
+            f"{close[i] + 5:.2f}",
+            f"{close[i] - 6:.2f}",
+            f"{close[i]:.2f}",
+            f"{rng.random() * 50:.5f}",
+            start + (i + 1) * INTERVAL_MS - 1,
+            f"{rng.random() * 2_000_000:.5f}",
+            int(rng.integers(100, 5000)),
+            "0",
+            "0",
+            "0",
+        ]
+        for i in range(n)
+    ]
+    return [rows[i : i + page] for i in range(0, n, page)]
+
+
+def run_legacy(pages) -> int:
+    """旧路径：format_item 构造 dict → 对齐 → strftime dt → 逐行拼 TSV"""
+    total = 0
+    buffer = []
+    for page in pages:
+        batch = [
+            {
+                "exchange_id": 1,
+                "inst_type": 1,
+                "symbol": "BTCUSDT",
+                "timestamp": d[0],
+                "open": d[1],
+                "high": d[2],
+                "low": d[3],
+                "close": d[4],
+                "volume": d[5],
+                "quote_volume": d[7],
+                "count": d[8],
+            }
+            for d in page
+        ]
+        for d in batch:
+            d["timestamp"] = (d["timestamp"] // INTERVAL_MS) * INTERVAL_MS
+        for d in batch:
+            d["dt"] = datetime.fromtimestamp(d["timestamp"] / 1000).strftime("%Y-%m-%d %H:%M:%S")
+        buffer.extend(batch)
+        if len(buffer) >= FLUSH_ROWS:
+            total += len(_legacy_tsv(buffer))
+            buffer = []
+    if buffer:
+        total += len(_legacy_tsv(buffer))
+    return total
+
+
+def _legacy_tsv(rows: list[dict]) -> bytes:
+    columns = list(rows[0].keys())
+    lines = ["\t".join("" if row.get(c) is None else str(row.get(c)) for c in columns) for row in rows]
+    return "\n".join(lines).encode("utf-8")
+
+
+def run_columnar(pages) -> int:
+    """新路径：KlineBatch.from_rows → 向量化对齐 → 按 flush 列式 to_tsv"""
+    total = 0
+    buffer, buffered = [], 0
+    for page in pages:
+        batch = KlineBatch.from_rows(page, BINANCE_FIELDS, 1, 1, "BTCUSDT").align(INTERVAL_MS)
+        buffer.append(batch)
+        buffered += len(batch)
+        if buffered >= FLUSH_ROWS:
+            total += len(_columnar_tsv(buffer))
+            buffer, buffered = [], 0
+    if buffer:
+        total += len(_columnar_tsv(buffer))
+    return total
+
+
+def _columnar_tsv(batches: list[KlineBatch]) -> bytes:
+    return "\n".join(b.to_tsv() for b in batches).encode("utf-8")
+
+
+def measure(name: str, fn, pages):
+    tracemalloc.start()
+    start = time.perf_counter()
+    payload = fn(pages)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = sum(len(p) for p in pages)
+    print(
+        f"{name:<10} rows={rows:>8}  time={elapsed:7.3f}s  rows/s={rows / elapsed:>12,.0f}  "
+        f"peak_mem={peak / 1024 / 1024:8.1f}MB  payload={payload / 1024 / 1024:6.1f}MB"
+    )
+
+
+if __name__ == "__main__":
+    pages = make_pages()
+    print(f"180d 1m backfill: {len(pages)} pages x {PAGE} rows, flush every {FLUSH_ROWS} rows")
+    measure("list[dict]", run_legacy, pages)
+    measure("columnar", run_columnar, pages)
@@ -0,0 +1,129 @@
+"""
+各交易所 KlineEndpoint 响应解析的单位成本：
+取列（逐字段列表推导 / itemgetter 按行取再 zip 转置）与完整解析（data_getter + KlineBatch.from_rows）
+
+    cd src && python -m benchmarks.kline_parse
+"""
+
+from operator import itemgetter
+import time
+
+from klines.batch import KlineBatch
+import numpy as np
+
+from exchanges._base_ import BaseClient
+from exchanges.aster import AsterPerpClient, AsterSpotClient
+from exchanges.binance import BinancePerpClient, BinanceSpotClient
+from exchanges.bitget import BitgetPerpClient, BitgetSpotClient
+from exchanges.bitmart import BitmartPerpClient, BitmartSpotClient
+from exchanges.bybit import BybitPerpClient, BybitSpotClient
+from exchanges.coinbase import CoinbaseSpotClient
+from exchanges.gate import GatePerpClient, GateSpotClient
+from exchanges.kraken import KrakenSpotClient
+from exchanges.mexc import MexcPerpClient, MexcSpotClient
+from exchanges.okx import OkxPerpClient, OkxSpotClient
+from exchanges.woox import WooxPerpClient, WooxSpotClient
+
+CLIENTS: list[type[BaseClient]] = [
+    AsterPerpClient,
+    AsterSpotClient,
+    BinancePerpClient,
+    BinanceSpotClient,
+    BitgetPerpClient,
+    BitgetSpotClient,
+    BitmartPerpClient,
+    BitmartSpotClient,
+    BybitPerpClient,
+    BybitSpotClient,
+    CoinbaseSpotClient,
+    GatePerpClient,
+    GateSpotClient,
+    KrakenSpotClient,
+    MexcPerpClient,
+    MexcSpotClient,
+    OkxPerpClient,
+    OkxSpotClient,
+    WooxPerpClient,
+    WooxSpotClient,
+]
+# 列式响应（{列名: [...]}）的接口
+COLUMNAR = {MexcPerpClient}
+SYMBOL = "BTCUSDT"
+PAGES = 200
+INTERVAL_MS = 60_000
+
+
+def make_payload(client: type[BaseClient], rows: int) -> dict | list:
+    """按 KlineEndpoint 的 fields / data_path / time_unit 生成一页原始响应（数值为字符串）"""
+    spec = client.kline_endpoint
+    rng = np.random.default_rng(0)
+    start = 1_700_000_000_000
+    scale = 1000 if spec.time_unit == "s" else 1
+    values = {
+        "timestamp": [(start + i * INTERVAL_MS) // scale for i in range(rows)],
+        **{name: [f"{v:.4f}" for v in 40_000 + rng.normal(0, 20, rows)] for name in spec.fields if name != "timestamp"},
+    }
+    if client in COLUMNAR:
+        data = {key: values[name] for name, key in spec.fields.items()}
+    elif all(isinstance(key, int) for key in spec.fields.values()):
+        width = max(spec.fields.values()) + 1
+        data = []
+        for i in range(rows):
+            row = ["0"] * width
+            for name, key in spec.fields.items():
+                row[key] = values[name][i]
+            data.append(row)
+    else:
+        data = [{key: values[name][i] for name, key in spec.fields.items()} for i in range(rows)]
+
+    for key in reversed(spec.data_path):
+        data = {SYMBOL if key == "{symbol}" else key: data}
+    return data
+
+
+def extract_comprehension(spec, data) -> dict:
+    """KlineBatch.from_rows 的取列方式：每个字段一次列表推导"""
+    return {name: [r[key] for r in data] for name, key in spec.fields.items()}
+
+
+def extract_itemgetter(spec, data) -> dict:
+    """itemgetter 一次取整行，再 zip 转置成列"""
+    return dict(zip(spec.fields, zip(*map(itemgetter(*spec.fields.values()), data), strict=True), strict=True))
+
+
+def parse(spec, payload, get_data) -> KlineBatch:
+    """生产路径：data_getter 取出 kline 列表，按行 / 按列构建 KlineBatch"""
+    data = get_data(payload)
+    scale = 1000 if spec.time_unit == "s" else 1
+    if isinstance(data, dict):
+        return KlineBatch.from_columns(
+            {name: data[key] for name, key in spec.fields.items()}, 1, 1, SYMBOL, time_scale=scale
+        )
+    return KlineBatch.from_rows(data, spec.fields, 1, 1, SYMBOL, time_scale=scale)
+
+
+def measure(fn, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(PAGES):
+        fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{PAGES} pages per exchange, rows/s (higher is better)")
+    print(f"{'client':<22} {'page':>5} {'comprehension':>14} {'itemgetter':>12} {'full parse':>12}")
+    for client in CLIENTS:
+        spec = client.kline_endpoint
+        payload = make_payload(client, spec.limit)
+        get_data = spec.data_getter(SYMBOL)
+        data = get_data(payload)
+        rows = spec.limit * PAGES
+        if isinstance(data, dict):
+            extract = "-"
+        else:
+            assert extract_comprehension(spec, data) == {k: list(v) for k, v in extract_itemgetter(spec, data).items()}
+            t_comp = measure(extract_comprehension, spec, data)
+            t_item = measure(extract_itemgetter, spec, data)
+            extract = f"{rows / t_comp:>14,.0f} {rows / t_item:>12,.0f}"
+        t_parse = measure(parse, spec, payload, get_data)
+        print(f"{client.__name__:<22} {spec.limit:>5} {extract:>27} {rows / t_parse:>12,.0f}")
@@ -0,0 +1,250 @@
+"""
+离线 kline 管道压测：进程内 mock 交易所（benchmarks.mock_exchange）+ 本地 StreamLoad 替身，
+测 BaseClient.get_kline → update_kline → KlineSink → DorisStreamLoader.send_rows 整条链路
+
+    cd src && python -m benchmarks.kline_pipeline
+    cd src && python -m benchmarks.kline_pipeline --scenario backfill --exchanges binance,okx --latency-ms 50 --error-rate 0.01
+    cd src && python -m benchmarks.kline_pipeline --sink null  # 不走 StreamLoad，只测拉取 + 解析 + 缓冲
+
+backfill: 少量 symbol 各拉 days 天 1m（force_start、不扫缺口、rollup 1h / 1d），对应回填 worker
+incremental: 大量 symbol 各补最近 minutes 分钟（查水位 + 扫缺口 + rollup），对应 sync-klines 每轮增量
+
+每个场景在独立的子进程里跑，峰值 RSS 互不影响；mock 与被测管道共用一个 event loop，
+"mock busy" 是 mock 生成响应占用的时间，读数时从耗时里扣除。
+sleep_ms 默认 0（生产为 100ms / 页），测的是管道本身的上限；Doris 查询由 LocalDoris 应答，不计入。
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import UTC, datetime
+import logging
+import multiprocessing
+import os
+import resource
+import time
+
+import numpy as np
+
+from databases.doris import DorisStreamLoader
+from databases.doris.sink import KlineSink
+from exchanges._base_ import BaseClient
+from exchanges.binance import BinanceSpotClient
+from exchanges.mexc import MexcSpotClient
+from exchanges.okx import OkxSpotClient
+from utils import http_session
+
+from .mock_exchange import MockExchange, MockStreamLoad
+
+CLIENTS: dict[str, type[BaseClient]] = {
+    "binance": BinanceSpotClient,
+    "okx": OkxSpotClient,
+    "mexc": MexcSpotClient,
+}
+INTERVAL_MS = 60_000
+MS_PER_DAY = 86_400_000
+
+logger = logging.getLogger("benchmarks.kline_pipeline")
+
+
+class LocalDoris:
+    """DorisAsyncDB.query 的替身：MAX(dt) 返回给定水位，缺口扫描 / rollup 补种等其它查询返回空"""
+
+    def __init__(self, watermark_ms: int | None = None):
+        # Doris 的 dt 是 UTC 的 naive datetime
+        self.watermark = datetime.fromtimestamp(watermark_ms / 1000, UTC).replace(tzinfo=None) if watermark_ms else None
+
+    async def query(self, sql: str, params: dict | None = None):
+        if "MAX(dt)" in sql:
+            return [(self.watermark,)]
+        return []
+
+
+class NullStreamLoader:
+    """丢弃数据只计数，把 StreamLoad 的序列化和 HTTP 从测量里去掉"""
+
+    def __init__(self):
+        self.rows: Counter[str] = Counter()
+
+    async def send_rows(self, rows, table: str, **kwargs):
+        self.rows[table] += sum(map(len, rows)) if rows and hasattr(rows[0], "to_tsv") else len(rows)
+
+    async def close(self):
+        pass
+
+
+def make_client(name: str, url: str, sink: KlineSink, doris: LocalDoris, latencies: list, candles: Counter):
+    """把 client 指向 mock：改 base_url，send_request 计时，get_kline 计数；MySQL 记账（exchange_id / open bar）跳过"""
+
+    class BenchClient(CLIENTS[name]):
+        base_url = url
+
+        async def send_request(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await super().send_request(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        async def get_kline(self, *args, **kwargs):
+            async for batch in super().get_kline(*args, **kwargs):
+                candles[name] += len(batch)
+                yield batch
+
+        async def _track_open_bar(self, *args, **kwargs):
+            pass
+
+    client = BenchClient(logger)
+    client._exchange_id = list(CLIENTS).index(name) + 1
+    client.doris_client = doris
+    client.kline_sink = sink
+    return client
+
+
+def symbols_for(name: str, n: int) -> list[str]:
+    return [f"SYM{i}-USDT" if name == "okx" else f"SYM{i}USDT" for i in range(n)]
+
+
+async def run(scenario: str, args: dict) -> dict:
+    exchanges = args["exchanges"].split(",")
+    mocks = {
+        name: MockExchange(
+            name,
+            latency_ms=args["latency_ms"],
+            jitter_ms=args["jitter_ms"],
+            page_limit=args["page_limit"],
+            error_rate=args["error_rate"],
+        )
+        for name in exchanges
+    }
+    urls = {name: await mock.start() for name, mock in mocks.items()}
+    stream_load = MockStreamLoad()
+    if args["sink"] == "local":
+        os.environ.update(DORIS_HOST="127.0.0.1", DORIS_HTTP_PORT=str(await stream_load.start()), DORIS_USER="bench")
+        loader = DorisStreamLoader()
+    else:
+        loader = NullStreamLoader()
+    sink = KlineSink(stream_loader=loader)
+    BaseClient._page_sizes.clear()
+
+    now = int(time.time() * 1000) // INTERVAL_MS * INTERVAL_MS
+    if scenario == "backfill":
+        n_symbols = args["backfill_symbols"]
+        end_ms = now // MS_PER_DAY * MS_PER_DAY - 1
+        start_ms = end_ms + 1 - args["days"] * MS_PER_DAY
+        doris = LocalDoris()
+        kwargs = {"start_ms": start_ms, "end_ms": end_ms, "force_start": True, "scan_gaps": False}
+        bars = args["days"] * MS_PER_DAY // INTERVAL_MS
+    else:
+        n_symbols = args["incremental_symbols"]
+        watermark = now - args["minutes"] * INTERVAL_MS
+        doris = LocalDoris(watermark)
+        kwargs = {"start_ms": watermark}
+        bars = args["minutes"]
+
+    latencies = {name: [] for name in exchanges}
+    candles: Counter[str] = Counter()
+    elapsed = {}
+
+    async def run_exchange(name: str, t0: float):
+        client = make_client(name, urls[name], sink, doris, latencies[name], candles)
+        sem = asyncio.Semaphore(args["concurrency"])
+
+        async def one(symbol: str):
+            async with sem:
+                await client.update_kline(symbol, "1m", rollup=True, sleep_ms=args["sleep_ms"], **kwargs)
+
+        await asyncio.gather(*(one(s) for s in symbols_for(name, n_symbols)))
+        elapsed[name] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(run_exchange(name, t0) for name in exchanges))
+    await sink.close()
+    wall = time.perf_counter() - t0
+    # client 共用 utils.http_session 的全局 session，全部结束后再关
+    await http_session.shutdown()
+
+    for mock in mocks.values():
+        await mock.close()
+    await stream_load.close()
+
+    per_exchange = []
+    for name in exchanges:
+        lat = np.array(latencies[name]) * 1000
+        per_exchange.append(
+            {
+                "exchange": name,
+                "requests": mocks[name].stats["requests"],
+                "throttled": mocks[name].stats["throttled"],
+                "page": BaseClient._page_sizes.get((name, CLIENTS[name].inst_type.value, "1m")),
+                "candles": candles[name],
+                # 期望的 bar 数减去实际拿到的（incremental 跨过分钟边界时会多一根）
+                "missing": max(0, n_symbols * bars - candles[name]),
+                "seconds": elapsed[name],
+                "p50_ms": float(np.percentile(lat, 50)) if len(lat) else 0.0,
+                "p99_ms": float(np.percentile(lat, 99)) if len(lat) else 0.0,
+            }
+        )
+    return {
+        "scenario": scenario,
+        "wall": wall,
+        "mock_busy": sum(m.busy for m in mocks.values()),
+        "loaded": dict(stream_load.rows if args["sink"] == "local" else loader.rows),
+        "stream_loads": stream_load.stats["be_requests"],
+        "via_fe": stream_load.stats["fe_requests"],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "exchanges": per_exchange,
+    }
+
+
+def run_scenario(scenario: str, args: dict) -> dict:
+    logging.basicConfig(level=logging.WARNING, force=True)
+    return asyncio.run(run(scenario, args))
+
+
+def report(result: dict):
+    print(
+        f"\n[{result['scenario']}] wall {result['wall']:.2f}s, mock busy {result['mock_busy']:.2f}s, "
+        f"peak RSS {result['peak_rss_mb']:.0f} MB, {result['stream_loads']} stream loads ({result['via_fe']} via FE)"
+    )
+    print(
+        f"{'exchange':<10} {'page':>5} {'requests':>9} {'429':>5} {'candles':>10} "
+        f"{'missing':>8} {'candles/s':>11} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for e in result["exchanges"]:
+        print(
+            f"{e['exchange']:<10} {e['page'] or '-':>5} {e['requests']:>9,} {e['throttled']:>5} {e['candles']:>10,} "
+            f"{e['missing']:>8,} {e['candles'] / e['seconds']:>11,.0f} {e['requests'] / e['seconds']:>8,.0f} "
+            f"{e['p50_ms']:>8.1f} {e['p99_ms']:>8.1f}"
+        )
+    total = sum(e["candles"] for e in result["exchanges"])
+    requests = sum(e["requests"] for e in result["exchanges"])
+    print(
+        f"{'total':<10} {'':>5} {requests:>9,} {'':>5} {total:>10,} {'':>8} "
+        f"{total / result['wall']:>11,.0f} {requests / result['wall']:>8,.0f}"
+    )
+    print(f"loaded rows: {result['loaded']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["backfill", "incremental", "all"], default="all")
+    parser.add_argument("--exchanges", default="binance,okx,mexc")
+    parser.add_argument("--sink", choices=["local", "null"], default="local")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--page-limit", type=int, default=None, help="覆盖各交易所默认的单页上限")
+    parser.add_argument("--error-rate", type=float, default=0, help="429 概率")
+    parser.add_argument("--sleep-ms", type=int, default=0, help="页间等待，生产为 100")
+    parser.add_argument("--concurrency", type=int, default=8, help="每个交易所同时拉取的 symbol 数")
+    parser.add_argument("--days", type=int, default=30, help="backfill 每个 symbol 的天数")
+    parser.add_argument("--backfill-symbols", type=int, default=4)
+    parser.add_argument("--minutes", type=int, default=60, help="incremental 每个 symbol 落后的分钟数")
+    parser.add_argument("--incremental-symbols", type=int, default=200)
+    args = vars(parser.parse_args())
+
+    scenarios = ["backfill", "incremental"] if args["scenario"] == "all" else [args["scenario"]]
+    ctx = multiprocessing.get_context("spawn")
+    for scenario in scenarios:
+        with ctx.Pool(1) as pool:
+            report(pool.apply(run_scenario, (scenario, args)))
@@ -0,0 +1,331 @@
+"""
+进程内 mock 交易所 / Doris StreamLoad，供 benchmarks.kline_pipeline 离线压测使用
+
+MockExchange 按 Binance / OKX / MEXC 现货的 kline 接口格式返回确定性的合成数据：
+- latency_ms / jitter_ms: 每个请求的响应延迟
+- page_limit: 单页最多返回的 bar 数（超过时按交易所的方向截断：Binance / MEXC 保留最早的，OKX 保留最新的）
+- 时间参数按各交易所的真实语义解释：Binance / MEXC 的 startTime / endTime 是闭区间；
+  OKX 的 before / after 是开区间游标，返回 before < ts < after 的 bar（after 是上界）
+- error_rate: 按概率返回 429（带 Retry-After）
+MockStreamLoad 模拟 FE 307 重定向到多个 BE，BE 按 compress_type / format 头解出 body，只数行数并返回 Success
+"""
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import json
+import random
+import time
+
+from aiohttp import web
+import numpy as np
+
+from databases.doris.arrow import pa
+from databases.doris.compress import decompress
+
+INTERVAL_MS = {"1m": 60_000, "1h": 3_600_000, "1H": 3_600_000, "60m": 3_600_000, "1d": 86_400_000, "1D": 86_400_000}
+LISTED_MS = 1_577_836_800_000  # 2020-01-01，合成数据从这里开始
+CYCLE = 4096  # 合成价格的周期，字符串预先格式化好，响应时只做下标访问
+
+
+@dataclass(frozen=True)
+class WireFormat:
+    path: str
+    lower_key: str  # 时间下界参数
+    upper_key: str  # 时间上界参数
+    interval_key: str
+    default_limit: int
+    max_limit: int
+    newest_first: bool  # 响应按时间倒序，截断时保留最新的 bar
+    exclusive: bool = False  # 上下界不含端点
+
+
+FORMATS = {
+    "binance": WireFormat("/api/v3/klines", "startTime", "endTime", "interval", 500, 1000, False),
+    "okx": WireFormat("/v5/market/history-mark-price-candles", "before", "after", "bar", 100, 100, True, True),
+    "mexc": WireFormat("/api/v3/klines", "startTime", "endTime", "interval", 500, 1000, False),
+}
+
+
+def _price_table() -> dict[str, list[str]]:
+    i = np.arange(CYCLE)
+    close = 40_000 + 50 * np.sin(i / 97) + i % 13
+    volume = 1 + (i * 7919) % 500 / 10
+    return {
+        "open": [f"{v:.2f}" for v in close - 1.5],
+        "high": [f"{v:.2f}" for v in close + 4],
+        "low": [f"{v:.2f}" for v in close - 5],
+        "close": [f"{v:.2f}" for v in close],
+        "volume": [f"{v:.5f}" for v in volume],
+        "quote_volume": [f"{v:.5f}" for v in volume * close],
+        "count": [int(v) for v in 100 + i % 900],
+    }
+
+
+class MockExchange:
+    def __init__(
+        self,
+        name: str,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        page_limit: int | None = None,
+        error_rate: float = 0,
+        seed: int = 0,
+    ):
+        self.name = name
+        self.format = FORMATS[name]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_limit = page_limit or self.format.max_limit
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.table = _price_table()
+        self.stats = {"requests": 0, "throttled": 0, "rows": 0}
+        self.busy = 0.0  # 生成响应占用的时间（不含模拟延迟），与被测管道共用 event loop
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> str:
+        """在 127.0.0.1 的随机端口启动，返回 base url"""
+        app = web.Application()
+        app.router.add_get(self.format.path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats["throttled"] += 1
+            return web.json_response(
+                {"code": -1003, "msg": "Too many requests"}, status=429, headers={"Retry-After": "1"}
+            )
+
+        start = time.perf_counter()
+        q = request.query
+        fmt = self.format
+        interval_ms = INTERVAL_MS[q.get(fmt.interval_key, "1m")]
+        limit = min(int(q.get("limit", fmt.default_limit)), fmt.max_limit, self.page_limit)
+        now_bar = int(time.time() * 1000) // interval_ms * interval_ms
+        lo = max(int(q[fmt.lower_key]) + fmt.exclusive if fmt.lower_key in q else LISTED_MS, LISTED_MS)
+        hi = min(int(q[fmt.upper_key]) - fmt.exclusive if fmt.upper_key in q else now_bar, now_bar)
+        first = -(-lo // interval_ms) * interval_ms
+        n = max(0, (hi - first) // interval_ms + 1)
+        if fmt.newest_first:
+            timestamps = range(
+                first + (n - 1) * interval_ms, first + (n - min(n, limit)) * interval_ms - 1, -interval_ms
+            )
+        else:
+            timestamps = range(first, first + min(n, limit) * interval_ms, interval_ms)
+
+        bars = [(ts, ts // interval_ms % CYCLE) for ts in timestamps]
+        rows = getattr(self, f"_{self.name}_rows")(bars, interval_ms)
+        body = rows if self.name != "okx" else {"code": "0", "msg": "", "data": rows}
+        response = web.Response(text=json.dumps(body), content_type="application/json")
+        self.stats["rows"] += len(rows)
+        self.busy += time.perf_counter() - start
+        return response
+
+    def _binance_rows(self, bars: list[tuple[int, int]], interval_ms: int) -> list[list]:
+        t = self.table
+        return [
+            [
+                ts,
+                t["open"][k],
+                t["high"][k],
+                t["low"][k],
+                t["close"][k],
+                t["volume"][k],
+                ts + interval_ms - 1,
+                t["quote_volume"][k],
+                t["count"][k],
+                "0",
+                "0",
+                "0",
+            ]
+            for ts, k in bars
+        ]
+
+    def _okx_rows(self, bars: list[tuple[int, int]], interval_ms: int) -> list[list]:
+        t = self.table
+        return [[str(ts), t["open"][k], t["high"][k], t["low"][k], t["close"][k], "1"] for ts, k in bars]
+
+    def _mexc_rows(self, bars: list[tuple[int, int]], interval_ms: int) -> list[list]:
+        t = self.table
+        return [
+            [
+                ts,
+                t["open"][k],
+                t["high"][k],
+                t["low"][k],
+                t["close"][k],
+                t["volume"][k],
+                ts + interval_ms - 1,
+                t["quote_volume"][k],
+            ]
+            for ts, k in bars
+        ]
+
+
+class MockStreamLoad:
+    """
+    Doris StreamLoad 的本地替身：FE 和 backends 个 BE 各占一个端口，FE 把 PUT 轮流 307 重定向到 BE，
+    BE 读完 body 按行计数，并提供 /api/health
+    group_commit 头：同一张表 group_commit_interval 秒内的 load 合成一次提交（一个版本），
+    sync_mode 等本轮提交后才返回；stats["versions"] 是产生的 tablet 版本数
+    label 头：和 Doris 一样在回 100 Continue 之前检查，重复的 label 直接返回 "Label Already Exists"，body 不会发出；
+    two_phase_commit 头：只预提交，/api/{db}/_stream_load_2pc commit 后才计入 rows；FE 提供 get_load_state
+    """
+
+    def __init__(self, backends: int = 2, group_commit_interval: float = 0.2):
+        self.n_backends = backends
+        self.group_commit_interval = group_commit_interval
+        self.rows: Counter[str] = Counter()
+        self.stats = {"fe_requests": 0, "be_requests": 0, "chunked": 0, "bytes": 0, "versions": 0, "duplicates": 0}
+        # table → 本轮 group commit 提交完成的 future
+        self._group_commits: dict[str, asyncio.Future] = {}
+        # label → VISIBLE / PRECOMMITTED / ABORTED；预提交的 txn_id → (label, table, rows)
+        self.labels: dict[str, str] = {}
+        self._txns: dict[int, tuple[str, str, int]] = {}
+        self._next_txn = 1000
+        self._runners: list[web.AppRunner] = []
+        self._be_urls: list[str] = []
+
+    async def _serve(self, app: web.Application) -> int:
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self._runners.append(runner)
+        return site._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> int:
+        """启动 BE 和 FE，返回 FE 端口"""
+        for _ in range(self.n_backends):
+            be = web.Application(client_max_size=1024**3)
+            be.router.add_put("/api/{db}/{table}/_stream_load", self.handle_be, expect_handler=self.expect_be)
+            be.router.add_put("/api/{db}/_stream_load_2pc", self.handle_2pc)
+            be.router.add_get("/api/health", self.handle_health)
+            self._be_urls.append(f"http://127.0.0.1:{await self._serve(be)}")
+        fe = web.Application()
+        fe.router.add_put("/api/{db}/{table}/_stream_load", self.handle_fe, expect_handler=self.handle_fe)
+        fe.router.add_put("/api/{db}/_stream_load_2pc", self.handle_fe)
+        fe.router.add_get("/api/{db}/get_load_state", self.handle_load_state)
+        return await self._serve(fe)
+
+    async def close(self):
+        for runner in self._runners:
+            await runner.cleanup()
+
+    async def handle_fe(self, request: web.Request) -> web.Response:
+        """也作为 expect handler：和 Doris FE 一样不回 100 Continue，直接重定向"""
+        backend = self._be_urls[self.stats["fe_requests"] % len(self._be_urls)]
+        self.stats["fe_requests"] += 1
+        return web.Response(status=307, headers={"Location": backend + request.path_qs})
+
+    def _label_conflict(self, request: web.Request) -> web.Response | None:
+        label = request.headers.get("label")
+        state = self.labels.get(label)
+        if state is None or state == "ABORTED":
+            return None
+        self.stats["duplicates"] += 1
+        return web.json_response(
+            {
+                "Label": label,
+                "Status": "Label Already Exists",
+                "ExistingJobStatus": "FINISHED" if state == "VISIBLE" else "RUNNING",
+                "Message": f"Label [{label}] has already been used.",
+            }
+        )
+
+    async def expect_be(self, request: web.Request) -> web.Response | None:
+        if (conflict := self._label_conflict(request)) is not None:
+            return conflict
+        await request.writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        request.writer.output_size = 0
+        return None
+
+    async def handle_be(self, request: web.Request) -> web.Response:
+        if (conflict := self._label_conflict(request)) is not None:
+            return conflict
+        self.stats["be_requests"] += 1
+        body = await request.read()
+        self.stats["bytes"] += len(body)
+        self.stats["chunked"] += request.headers.get("Transfer-Encoding") == "chunked"
+        data = decompress(body, request.headers.get("compress_type"))
+        if request.headers.get("format") == "arrow":
+            rows = pa.ipc.open_stream(data).read_all().num_rows
+        else:
+            rows = data.count(b"\n") + (not data.endswith(b"\n")) if data else 0
+        table = request.match_info["table"]
+        self._next_txn += 1
+        label = request.headers.get("label") or f"mock_{self._next_txn}"
+        result = {
+            "TxnId": self._next_txn,
+            "Label": label,
+            "Status": "Success",
+            "NumberLoadedRows": rows,
+            "LoadBytes": len(body),
+        }
+        mode = request.headers.get("group_commit")
+        if request.headers.get("two_phase_commit") == "true":
+            self.labels[label] = "PRECOMMITTED"
+            self._txns[self._next_txn] = (label, table, rows)
+            result["TwoPhaseCommit"] = "true"
+            return web.json_response(result)
+        self.rows[table] += rows
+        if mode in ("async_mode", "sync_mode"):
+            committed = self._group_commit(table)
+            result.update(GroupCommit=True, Label=f"group_commit_{id(committed):x}")
+            if mode == "sync_mode":
+                await committed
+        else:
+            self.labels[label] = "VISIBLE"
+            self.stats["versions"] += 1
+        return web.json_response(result)
+
+    def _group_commit(self, table: str) -> asyncio.Future:
+        committed = self._group_commits.get(table)
+        if committed is None:
+            committed = self._group_commits[table] = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_later(self.group_commit_interval, self._commit, table)
+        return committed
+
+    def _commit(self, table: str):
+        self.stats["versions"] += 1
+        self._group_commits.pop(table).set_result(None)
+
+    async def handle_2pc(self, request: web.Request) -> web.Response:
+        operation = request.headers["txn_operation"]
+        if "txn_id" in request.headers:
+            txn_id = int(request.headers["txn_id"])
+        else:  # 按 label 操作
+            label = request.headers.get("label")
+            txn_id = next((t for t, txn in self._txns.items() if txn[0] == label), -1)
+        txn = self._txns.pop(txn_id, None)
+        if txn is None:
+            return web.json_response({"status": "Fail", "msg": f"transaction [{txn_id}] not found"})
+        label, table, rows = txn
+        if operation == "commit":
+            self.labels[label] = "VISIBLE"
+            self.rows[table] += rows
+            self.stats["versions"] += 1
+        else:
+            self.labels[label] = "ABORTED"
+        return web.json_response({"status": "Success", "msg": f"transaction [{txn_id}] {operation} successfully."})
+
+    async def handle_load_state(self, request: web.Request) -> web.Response:
+        state = self.labels.get(request.query.get("label"), "UNKNOWN")
+        return web.json_response({"msg": "success", "code": 0, "data": state, "count": 0})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "OK", "msg": "To Be Added"})
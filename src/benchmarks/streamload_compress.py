@@ -0,0 +1,67 @@
+"""
+StreamLoad csv payload 的 compress_type 对比：压缩耗时 / 压缩率，
+以及按带宽估算的传输时间（本机回环测不出传输收益，按 --bandwidth-mbps 换算）
+
+    cd src && python -m benchmarks.streamload_compress
+    cd src && python -m benchmarks.streamload_compress --bandwidth-mbps 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from databases.doris import DorisStreamLoader
+from databases.doris.compress import available, choose, compress
+
+from .mock_exchange import MockStreamLoad
+from .streamload_format import SNAPSHOT_COLUMNS, make_klines, make_snapshots
+
+ROUNDS = 3
+
+
+async def main(bandwidth_mbps: float):
+    stream_load = MockStreamLoad()
+    os.environ.update(DORIS_HOST="127.0.0.1", DORIS_HTTP_PORT=str(await stream_load.start()), DORIS_USER="bench")
+    loader = DorisStreamLoader(load_format="csv")
+    cases = [
+        ("kline_1m", make_klines(), {}),
+        ("market_snapshot", make_snapshots(20_000), {"column_names": SNAPSHOT_COLUMNS}),
+    ]
+    print(f"transfer estimated at {bandwidth_mbps:g} Mbit/s")
+    print(
+        f"{'table':<16} {'type':>5} {'MB':>7} {'ratio':>6} {'compress ms':>12} {'xfer ms':>8} "
+        f"{'total ms':>9} {'send ms':>8}"
+    )
+    for table, rows, kwargs in cases:
+        _, body, _ = loader.build_payload(rows, table, **kwargs)
+        auto = choose("auto", len(body))
+        for compress_type in ("none", "gz", "lz4", "zstd"):
+            if compress_type != "none" and not available(compress_type):
+                print(f"{table:<16} {compress_type:>5} not installed")
+                continue
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                sent = body if compress_type == "none" else compress(body, compress_type)
+            seconds = (time.perf_counter() - start) / ROUNDS
+            xfer = len(sent) * 8 / (bandwidth_mbps * 1e6)
+
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                await loader.send_rows(rows, table, compress_type=compress_type, **kwargs)
+            send = (time.perf_counter() - start) / ROUNDS
+            mark = "*" if (auto or "none") == compress_type else ""
+            print(
+                f"{table:<16} {compress_type + mark:>5} {len(sent) / 1e6:>7.2f} {len(body) / len(sent):>6.2f} "
+                f"{seconds * 1000:>12.1f} {xfer * 1000:>8.1f} {(seconds + xfer) * 1000:>9.1f} {send * 1000:>8.1f}"
+            )
+    print("* = auto choice")
+    print("loader stats:", {table: dict(stats) for table, stats in loader.stats.items()})
+    await loader.close()
+    await stream_load.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bandwidth-mbps", type=float, default=1000)
+    asyncio.run(main(parser.parse_args().bandwidth_mbps))
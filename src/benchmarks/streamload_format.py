@@ -0,0 +1,169 @@
+"""
+StreamLoad payload 格式对比：csv（逐值 str() 拼 TSV）vs arrow（Arrow IPC stream），需要 pyarrow
+- kline_1m: KlineSink 一次 flush 的量（50 个 1000 行的 KlineBatch）
+- market_snapshot: restore 一批 5000 行、约 70 列的 list[list]（sqlite 读出的元组）
+构建 payload 的耗时 / 体积，以及经本地 MockStreamLoad 发送的端到端耗时；Doris 端解析 CSV 的开销不在其中
+
+    cd src && python -m benchmarks.streamload_format
+"""
+
+import asyncio
+import os
+import time
+
+from klines.batch import KlineBatch
+import numpy as np
+
+from databases.doris import DorisStreamLoader
+
+from .mock_exchange import MockStreamLoad
+
+ROUNDS = 5
+SNAPSHOT_INT_COLUMNS = {
+    "ts",
+    "exchange_id",
+    "inst_type",
+    "next_funding_time",
+    "trades",
+    "long_liquidation_count",
+    "short_liquidation_count",
+    "top_10bids_level",
+    "top_10asks_level",
+    "version",
+}
+SNAPSHOT_COLUMNS = [
+    "ts",
+    "symbol",
+    "exchange_id",
+    "inst_type",
+    "dt",
+    "mark_price",
+    "index_price",
+    "last_price",
+    "funding_rate",
+    "next_funding_time",
+    "open_interest",
+    "volume",
+    "quote_volume",
+    "trades",
+    "taker_buy_vol",
+    "taker_sell_vol",
+    "taker_buy_notional",
+    "taker_sell_notional",
+    "long_liquidation_volume",
+    "long_liquidation_notional",
+    "long_liquidation_count",
+    "short_liquidation_volume",
+    "short_liquidation_notional",
+    "short_liquidation_count",
+    "max_long_liquidation_notional",
+    "max_short_liquidation_notional",
+    "min_liquidation_price",
+    "max_liquidation_price",
+    *(f"bid_p{p}" for p in (100, 99, 98, 95, 90, 75, 50, 25, 10, 5, 2, 1, 0)),
+    *(f"ask_p{p}" for p in (0, 1, 2, 5, 10, 25, 50, 75, 100)),
+    "bid_total_qty",
+    "top_10bids_level",
+    "ask_total_qty",
+    "top_10asks_level",
+    *(f"depth_{side}_{bps}bps" for side in ("bid", "ask") for bps in (1, 3, 5, 10, 20)),
+    "curvature_short_bid",
+    "curvature_long_bid",
+    "curvature_short_ask",
+    "curvature_long_ask",
+    "worker_id",
+    "version",
+]
+
+
+def make_klines(batches: int = 50, rows: int = 1000) -> list[KlineBatch]:
+    rng = np.random.default_rng(0)
+    start = 1_700_000_000_000
+    result = []
+    for b in range(batches):
+        close = 40_000 + rng.normal(0, 20, rows).cumsum()
+        result.append(
+            KlineBatch(
+                1,
+                1,
+                f"SYM{b}USDT",
+                start + np.arange(rows, dtype=np.int64) * 60_000,
+                open=close - 3,
+                high=close + 5,
+                low=close - 6,
+                close=close,
+                volume=rng.random(rows) * 50,
+                quote_volume=rng.random(rows) * 2_000_000,
+                count=rng.integers(100, 5000, rows),
+            )
+        )
+    return result
+
+
+def iter_snapshots(rows: int = 5000, block: int = 1000):
+    """逐行生成 market_snapshot 元组（随机数按 block 行一批取），模拟 sqlite cursor"""
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, block):
+        values = rng.random((min(block, rows - start), len(SNAPSHOT_COLUMNS))) * 40_000
+        for k in range(len(values)):
+            ts = 1_765_900_800_000 + (start + k) * 1000
+            row = []
+            for j, column in enumerate(SNAPSHOT_COLUMNS):
+                if column == "ts":
+                    row.append(ts)
+                elif column == "symbol":
+                    row.append("BTCUSDT")
+                elif column == "dt":
+                    row.append(time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts // 1000)))
+                elif column == "worker_id":
+                    row.append("worker-1")
+                elif column in SNAPSHOT_INT_COLUMNS:
+                    row.append(int(values[k, j]))
+                else:
+                    row.append(float(values[k, j]))
+            yield tuple(row)
+
+
+def make_snapshots(rows: int = 5000) -> list[tuple]:
+    return list(iter_snapshots(rows))
+
+
+def measure(loader: DorisStreamLoader, rows, table: str, load_format: str, **kwargs) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        _, body, used = loader.build_payload(rows, table, load_format=load_format, **kwargs)
+    assert used == load_format
+    return (time.perf_counter() - start) / ROUNDS, len(body)
+
+
+async def measure_send(loader: DorisStreamLoader, rows, table: str, load_format: str, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await loader.send_rows(rows, table, load_format=load_format, **kwargs)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+async def main():
+    stream_load = MockStreamLoad()
+    os.environ.update(DORIS_HOST="127.0.0.1", DORIS_HTTP_PORT=str(await stream_load.start()), DORIS_USER="bench")
+    loader = DorisStreamLoader()
+    cases = [
+        ("kline_1m", make_klines(), {}),
+        ("market_snapshot", make_snapshots(), {"column_names": SNAPSHOT_COLUMNS}),
+    ]
+    print(f"{'table':<16} {'rows':>7} {'format':>7} {'build ms':>9} {'MB':>7} {'rows/s':>12} {'send ms':>9}")
+    for table, rows, kwargs in cases:
+        n = sum(map(len, rows)) if isinstance(rows[0], KlineBatch) else len(rows)
+        for load_format in ("csv", "arrow"):
+            seconds, size = measure(loader, rows, table, load_format, **kwargs)
+            send = await measure_send(loader, rows, table, load_format, **kwargs)
+            print(
+                f"{table:<16} {n:>7,} {load_format:>7} {seconds * 1000:>9.1f} {size / 1e6:>7.2f} "
+                f"{n / seconds:>12,.0f} {send * 1000:>9.1f}"
+            )
+    await loader.close()
+    await stream_load.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
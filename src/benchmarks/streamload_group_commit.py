@@ -0,0 +1,69 @@
+"""
+高频小批量 StreamLoad 的 group commit 对比：模拟一轮 sync_long_short_ratio_5m
+（exchanges × symbols 次 market_sentiment_5m 小 load，每次几行），按 off / async / sync 模式发送，
+比较调用方看到的延迟和 Doris 端产生的 tablet 版本数（本地 MockStreamLoad 模拟攒批提交）
+
+    cd src && python -m benchmarks.streamload_group_commit
+    cd src && python -m benchmarks.streamload_group_commit --loads 1000 --interval 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from databases.doris import DorisStreamLoader
+
+from .mock_exchange import MockStreamLoad
+
+TABLE = "market_sentiment_5m"
+
+
+def make_rows(i: int, n: int = 3) -> list[dict]:
+    ts = 1_765_900_800_000 + i * 300_000
+    return [
+        {"ts": ts + k * 300_000, "symbol": f"SYM{i}USDT", "long_short_ratio": 1.0 + k / 10, "long_account": 0.5}
+        for k in range(n)
+    ]
+
+
+async def main(loads: int, concurrency: int, interval: float):
+    stream_load = MockStreamLoad(group_commit_interval=interval)
+    os.environ.update(DORIS_HOST="127.0.0.1", DORIS_HTTP_PORT=str(await stream_load.start()), DORIS_USER="bench")
+    loader = DorisStreamLoader()
+    sem = asyncio.Semaphore(concurrency)
+    print(f"{loads} loads, concurrency {concurrency}, group_commit_interval {interval}s")
+    print(f"{'mode':>10} {'wall s':>7} {'loads/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'versions':>9} {'visible':>8}")
+
+    async def one(i: int, mode: str) -> tuple[float, bool]:
+        async with sem:
+            start = time.perf_counter()
+            result = await loader.send_rows(make_rows(i), TABLE, group_commit=mode)
+            return time.perf_counter() - start, result["Visible"]
+
+    for mode in ("off_mode", "async_mode", "sync_mode"):
+        versions = stream_load.stats["versions"]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i, mode) for i in range(loads)))
+        wall = time.perf_counter() - start
+        await asyncio.sleep(interval * 1.5)  # 等 async_mode 最后一轮提交
+        lat = np.array([latency for latency, _ in results]) * 1000
+        visible = sum(v for _, v in results)
+        print(
+            f"{mode:>10} {wall:>7.2f} {loads / wall:>8,.0f} {np.percentile(lat, 50):>8.1f} "
+            f"{np.percentile(lat, 99):>8.1f} {stream_load.stats['versions'] - versions:>9,} {visible:>8,}"
+        )
+    print("loader stats:", dict(loader.stats[TABLE]))
+    await loader.close()
+    await stream_load.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loads", type=int, default=600, help="一轮的小 load 数（exchanges × symbols）")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--interval", type=float, default=0.2, help="mock 的 group_commit_interval（秒）")
+    args = parser.parse_args()
+    asyncio.run(main(args.loads, args.concurrency, args.interval))
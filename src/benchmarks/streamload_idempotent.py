@@ -0,0 +1,69 @@
+"""
+确定性 label 的重试成本和两阶段提交：
+- retry: 同一份 kline_1m（KlineSink 一次 flush 的量）以 idempotent 写两次，第二次 label 重复，
+  Doris 在回 100 Continue 之前就拒绝，body 不再发送
+- 2pc: transaction() 写 1m / 1h / 1d 三张表，正常退出全部可见；块内抛错时全部 abort，一行都不落盘
+
+    cd src && python -m benchmarks.streamload_idempotent
+"""
+
+import asyncio
+import os
+import time
+
+from databases.doris import DorisStreamLoader
+from databases.doris.label import dataset_key, make_label
+
+from .mock_exchange import MockStreamLoad
+from .streamload_format import make_klines
+
+ROUNDS = 5
+
+
+async def main():
+    stream_load = MockStreamLoad()
+    os.environ.update(DORIS_HOST="127.0.0.1", DORIS_HTTP_PORT=str(await stream_load.start()), DORIS_USER="bench")
+    loader = DorisStreamLoader(idempotent=True)
+    klines = make_klines()
+
+    _, payload, _ = loader.build_payload(klines, "kline_1m")
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        label = make_label("kline_1m", dataset_key(klines), payload)
+    print(f"label {label}: {(time.perf_counter() - start) / ROUNDS * 1000:.1f} ms for {len(payload) / 1e6:.1f} MB")
+
+    print(f"{'attempt':>8} {'ms':>8} {'sent MB':>8} {'duplicate':>10}")
+    for attempt in ("first", "retry"):
+        sent = stream_load.stats["bytes"]
+        start = time.perf_counter()
+        result = await loader.send_rows(klines, "kline_1m")
+        print(
+            f"{attempt:>8} {(time.perf_counter() - start) * 1000:>8.1f} "
+            f"{(stream_load.stats['bytes'] - sent) / 1e6:>8.2f} {bool(result.get('Duplicate')):>10}"
+        )
+
+    tables = ("kline_1m", "kline_1h", "kline_1d")
+    small = make_klines(batches=3, rows=100)
+    stream_load.rows.clear()
+    async with loader.transaction() as txn:
+        for table in tables:
+            await txn.send_rows(small, table, idempotent=False)
+        print(f"2pc prepared, visible rows before commit: {dict(stream_load.rows)}")
+    print(f"2pc committed, visible rows: {dict(stream_load.rows)}")
+
+    stream_load.rows.clear()
+    try:
+        async with loader.transaction() as txn:
+            for table in tables:
+                await txn.send_rows(small, table, idempotent=False)
+            raise RuntimeError("fetch failed mid-write")
+    except RuntimeError as e:
+        print(f"2pc aborted ({e}), visible rows: {dict(stream_load.rows)}")
+
+    print("loader stats:", {table: dict(stats) for table, stats in loader.stats.items()})
+    await loader.close()
+    await stream_load.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+StreamLoad 整块 body vs chunked 流式 body 的客户端峰值内存（tracemalloc）：
+- buffered: list[tuple] 拼成整个 TSV 再 encode（restore 现状）
+- stream: 同一个 list，按 chunk_rows 边编码边发送
+- stream-iter: rows 是生成器（相当于直接传 sqlite cursor），行本身也不再整批驻留
+MockStreamLoad 跑在子进程里，它收下的 body 不计入本进程的峰值
+
+    cd src && python -m benchmarks.streamload_stream
+    cd src && python -m benchmarks.streamload_stream --rows 10000,100000 --compress-type zstd
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+import tracemalloc
+
+from databases.doris import DorisStreamLoader
+
+from .mock_exchange import MockStreamLoad
+from .streamload_format import SNAPSHOT_COLUMNS, iter_snapshots
+
+
+def serve(ports, stop):
+    async def main():
+        stream_load = MockStreamLoad()
+        ports.put(await stream_load.start())
+        await asyncio.to_thread(stop.wait)
+        ports.put(stream_load.stats)
+        await stream_load.close()
+
+    asyncio.run(main())
+
+
+async def measure(loader: DorisStreamLoader, mode: str, n: int, compress_type: str) -> tuple[float, float, int]:
+    """返回 (峰值 MB, 耗时 s, Doris 端确认的行数)；峰值包含 rows 本身"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = iter_snapshots(n) if mode == "stream-iter" else list(iter_snapshots(n))
+    result = await loader.send_rows(
+        rows,
+        "market_snapshot",
+        column_names=SNAPSHOT_COLUMNS,
+        compress_type=compress_type,
+        stream=mode != "buffered",
+    )
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return peak / 1e6, seconds, result["NumberLoadedRows"]
+
+
+async def main(sizes: list[int], compress_type: str):
+    ctx = multiprocessing.get_context("spawn")
+    ports, stop = ctx.Queue(), ctx.Event()
+    server = ctx.Process(target=serve, args=(ports, stop))
+    server.start()
+    os.environ.update(DORIS_HOST="127.0.0.1", DORIS_HTTP_PORT=str(ports.get()), DORIS_USER="bench")
+    loader = DorisStreamLoader()
+    print(f"compress_type={compress_type}, chunk_bytes={loader.chunk_bytes:,}")
+    print(f"{'rows':>9} {'mode':>12} {'peak MB':>9} {'seconds':>8} {'loaded':>9}")
+    try:
+        for n in sizes:
+            for mode in ("buffered", "stream", "stream-iter"):
+                peak, seconds, loaded = await measure(loader, mode, n, compress_type)
+                print(f"{n:>9,} {mode:>12} {peak:>9.1f} {seconds:>8.2f} {loaded:>9,}")
+    finally:
+        await loader.close()
+        stop.set()
+        print("stream load stats:", ports.get())
+        server.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="5000,20000,50000")
+    parser.add_argument("--compress-type", default="none")
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.rows.split(",")], args.compress_type))
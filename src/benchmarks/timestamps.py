@@ -0,0 +1,58 @@
+"""
+毫秒时间戳 → dt 字符串 / 5m 对齐的单位成本（每百万行）
+
+    cd src && python -m benchmarks.timestamps
+"""
+
+from datetime import UTC, datetime
+import time
+
+import numpy as np
+
+from utils.timestamps import align_to_5m, ms_to_dt, ms_to_dt_array
+
+N = 1_000_000
+INTERVAL_MS = 60_000
+
+
+def legacy_dt(ms: list[int]) -> list[str]:
+    """旧写法：逐行 fromtimestamp + strftime"""
+    return [datetime.fromtimestamp(t / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S") for t in ms]
+
+
+def legacy_align_to_5m(ms: int | str) -> int:
+    """旧 utils.align_to_5m：逐个构造 tz-aware datetime"""
+    dt = datetime.fromtimestamp(int(ms) / 1000, tz=UTC)
+    minute = dt.minute - (dt.minute % 5)
+    aligned = dt.replace(minute=minute, second=0, microsecond=0)
+    return int(aligned.timestamp() * 1000)
+
+
+def datetime_as_string(ms: np.ndarray) -> list[str]:
+    """numpy 内置：datetime_as_string 再把 'T' 替换成空格"""
+    dt = np.datetime_as_string(ms.astype("datetime64[ms]"), unit="s")
+    return [d.replace("T", " ") for d in dt.tolist()]
+
+
+def measure(name: str, fn, arg) -> list:
+    start = time.perf_counter()
+    result = fn(arg)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed / N * 1e6 * 1000:8.1f} ms / 1M rows")
+    return result
+
+
+if __name__ == "__main__":
+    ms = 1_700_000_000_000 + np.arange(N, dtype=np.int64) * INTERVAL_MS + 1234
+    ms_list = ms.tolist()
+
+    print(f"epoch ms → 'YYYY-MM-DD HH:MM:SS' (UTC), {N:,} rows of 1m")
+    expected = measure("fromtimestamp + strftime", legacy_dt, ms_list)
+    assert measure("ms_to_dt (scalar, gmtime)", lambda v: [ms_to_dt(t) for t in v], ms_list) == expected
+    assert measure("np.datetime_as_string", datetime_as_string, ms) == expected
+    assert measure("ms_to_dt_array", ms_to_dt_array, ms) == expected
+
+    print("\nalign to 5m")
+    expected = measure("datetime per element", lambda v: [legacy_align_to_5m(t) for t in v], ms_list)
+    assert measure("align_to_5m (int)", lambda v: [align_to_5m(t) for t in v], ms_list) == expected
+    assert measure("align_to_5m (ndarray)", align_to_5m, ms).tolist() == expected
@@ -1,8 +1,13 @@
+import asyncio
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
 from functools import lru_cache
-from io import BytesIO
+from itertools import chain
 import json
 import os
-from urllib.parse import quote
+import time
+from typing import Literal
+from urllib.parse import quote, urlsplit
 
 import aiohttp
 from dotenv import load_dotenv
@@ -13,6 +18,12 @@ from sqlalchemy.orm import sessionmaker
 
 from utils.logger import logger as _logger
 
+from .arrow import ARROW_ERRORS, arrow_available, is_arrow, serialize, to_record_batches
+from .columns import columns_header, payload_columns
+from .compress import LARGE_BYTES, choose as choose_compress_type, compress, compressor
+from .group_commit import EXCLUSIVE_HEADERS, group_commit_mode
+from .label import dataset_key, make_label
+
 load_dotenv()
 
 
@@ -65,7 +76,33 @@ class DorisAsyncDB:
 
 
 class DorisStreamLoader:
-    def __init__(self):
+    """
+    pool_size: 长连接池大小，所有 send_rows 共用，连接 keep-alive 复用
+    cache_redirects: 记住 FE 307 重定向到的 BE，之后轮询直接写 BE，省掉每次经过 FE 的一跳；
+        默认取环境变量 DORIS_STREAMLOAD_DIRECT_BE（默认开启）。DORIS_BE_NODES=host:8040,... 可预置 BE 列表
+    be_cooldown: BE 连接失败后摘除的秒数，到期先 GET /api/health 通过才放回轮询
+    load_format: send_rows 默认的 payload 格式，默认取环境变量 DORIS_STREAMLOAD_FORMAT（csv）
+    compress_type: send_rows 默认的压缩方式（none / auto / gz / lz4 / zstd），默认取环境变量 DORIS_STREAMLOAD_COMPRESS（none）
+    stream: send_rows 默认是否以 chunked body 边编码边发送，默认取环境变量 DORIS_STREAMLOAD_STREAM（关闭）
+    chunk_bytes: 流式发送时每块的大致字节数（编码前），决定流式发送的峰值内存
+    group_commit: 表 → group commit 模式（async_mode / sync_mode / off_mode），覆盖 group_commit.GROUP_COMMIT
+    idempotent: send_rows 默认是否自动生成确定性 label（见 label.py），默认取环境变量 DORIS_STREAMLOAD_IDEMPOTENT（关闭）
+    label_wait: 同名 label 的 load 还在进行中时，等待它结束的最长秒数；到时仍是 PRECOMMITTED 的视为崩溃遗留的两阶段提交，abort 后重新导入
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 16,
+        cache_redirects: bool | None = None,
+        be_cooldown: float = 30,
+        load_format: Literal["csv", "arrow"] | None = None,
+        compress_type: str | None = None,
+        stream: bool | None = None,
+        chunk_bytes: int = 1 << 20,
+        group_commit: dict[str, str] | None = None,
+        idempotent: bool | None = None,
+        label_wait: float = 60,
+    ):
         try:
             self.logger = get_run_logger()
         except Exception:
@@ -79,6 +116,134 @@ class DorisStreamLoader:
         if not self.host or not self.user:
             raise Exception("DORIS_HOST and DORIS_USER must be set")
 
+        self.pool_size = pool_size
+        if cache_redirects is None:
+            cache_redirects = os.getenv("DORIS_STREAMLOAD_DIRECT_BE", "true").lower() in ("1", "true", "yes")
+        self.cache_redirects = cache_redirects
+        self.be_cooldown = be_cooldown
+        # BE base url → 摘除截止时间（time.monotonic，0 表示可用）
+        self._backends: dict[str, float] = {
+            f"http://{node.strip()}": 0.0 for node in os.getenv("DORIS_BE_NODES", "").split(",") if node.strip()
+        }
+        self._next_backend = 0
+        self.load_format = load_format or os.getenv("DORIS_STREAMLOAD_FORMAT", "csv")
+        self.compress_type = compress_type or os.getenv("DORIS_STREAMLOAD_COMPRESS", "none")
+        if stream is None:
+            stream = os.getenv("DORIS_STREAMLOAD_STREAM", "false").lower() in ("1", "true", "yes")
+        self.stream = stream
+        self.chunk_bytes = chunk_bytes
+        self.group_commit = group_commit or {}
+        if idempotent is None:
+            idempotent = os.getenv("DORIS_STREAMLOAD_IDEMPOTENT", "false").lower() in ("1", "true", "yes")
+        self.idempotent = idempotent
+        self.label_wait = label_wait
+        # table → loads / group_commit_loads / duplicate_loads / raw_bytes / sent_bytes /
+        # compress_seconds / load_seconds 累计
+        self.stats: defaultdict[str, Counter] = defaultdict(Counter)
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """长连接池绑定到当前 loop（Prefect 每次 flow run 可能是新的 loop，旧 loop 的连接不能复用）"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+
+    async def _healthy(self, backend: str) -> bool:
+        try:
+            async with self._get_session().get(f"{backend}/api/health", timeout=aiohttp.ClientTimeout(total=3)) as resp:
+                return resp.status == 200 and (await resp.json(content_type=None)).get("status") == "OK"
+        except Exception:
+            return False
+
+    async def _pick_backend(self) -> str | None:
+        """轮询选一个可用的 BE；摘除到期的先做健康检查，不通过继续摘除"""
+        backends = list(self._backends)
+        for i in range(len(backends)):
+            backend = backends[(self._next_backend + i) % len(backends)]
+            down_until = self._backends[backend]
+            if down_until:
+                if time.monotonic() < down_until:
+                    continue
+                if not await self._healthy(backend):
+                    self._backends[backend] = time.monotonic() + self.be_cooldown
+                    continue
+                self.logger.info(f"StreamLoad BE {backend} is healthy again")
+                self._backends[backend] = 0.0
+            self._next_backend = (self._next_backend + i + 1) % len(backends)
+            return backend
+        return None
+
+    @staticmethod
+    async def _read_result(resp: aiohttp.ClientResponse) -> dict:
+        text = await resp.text()
+        try:
+            return json.loads(text)
+        except Exception as e:
+            raise Exception(f"StreamLoad response not JSON ({resp.status}): {text[:512]}") from e
+
+    async def _wait_label(self, label: str) -> str:
+        """同名 label 的 load 还在进行中：轮询 get_load_state 直到它结束或超过 label_wait，返回最后的状态"""
+        url = f"http://{self.host}:{self.http_port}/api/{self.database}/get_load_state"
+        deadline = time.monotonic() + self.label_wait
+        while True:
+            async with self._get_session().get(
+                url, params={"label": label}, auth=aiohttp.BasicAuth(self.user, self.password)
+            ) as resp:
+                state = (await self._read_result(resp)).get("data", "UNKNOWN")
+            if state not in ("PREPARE", "PRECOMMITTED") or time.monotonic() >= deadline:
+                return state
+            await asyncio.sleep(1)
+
+    async def _two_phase(
+        self, operation: Literal["commit", "abort"], txn_id: int | None = None, label: str | None = None
+    ) -> dict:
+        """按 txn_id 或 label 提交 / 回滚预提交的事务"""
+        url = f"http://{self.host}:{self.http_port}/api/{self.database}/_stream_load_2pc"
+        target = {"txn_id": str(txn_id)} if txn_id is not None else {"label": label}
+        headers = {**target, "txn_operation": operation}
+        resp, result = await self._send_streamload_request_async(url, b"", headers, (self.user, self.password))
+        if resp.status != 200 or str(result.get("status")).lower() != "success":
+            raise Exception(f"StreamLoad 2PC {operation} {target} failed: {result}")
+        return result
+
+    async def commit(self, txn_id: int) -> dict:
+        """提交 send_rows(two_phase_commit=True) 预提交的事务，提交后数据可见"""
+        return await self._two_phase("commit", txn_id)
+
+    async def abort(self, txn_id: int) -> dict:
+        return await self._two_phase("abort", txn_id)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        多表写入的两阶段提交：块内 txn.send_rows 都只预提交，全部成功才逐个 commit，出错则全部 abort
+            async with loader.transaction() as txn:
+                await txn.send_rows(rows_1m, "kline_1m")
+                await txn.send_rows(rows_1h, "kline_1h")
+        Doris 的事务是单表的，commit 阶段本身不是原子的；但任何一张表预提交失败都不会留下半批数据
+        """
+        txn = StreamLoadTransaction(self)
+        try:
+            yield txn
+        except BaseException:
+            await txn.abort()
+            raise
+        try:
+            await txn.commit()
+        except Exception:
+            await txn.abort()  # commit 失败时剩下还没提交的
+            raise
+
     # -----------------------------
     # Internal: low-level streamload
     # -----------------------------
@@ -91,30 +256,46 @@ class DorisStreamLoader:
     ):
         """
         异步 StreamLoad（aiohttp 版）
-        支持 Doris FE → BE 的 307/308 PUT 重定向，并保持认证信息。
+        FE → BE 的 307/308 PUT 重定向手动跟随并带上认证；开启 cache_redirects 时优先直接写已知的 BE，
+        BE 连不上（数据还没发出）时摘除该 BE 并退回 FE 重新分配
+        data 为 callable 时是流式 body 的工厂，每次请求取一个新的 async generator（body 不能重放）
         """
 
         username, password = auth
-
-        async with aiohttp.ClientSession() as session:
-            # aiohttp 的 BasicAuth
-            aio_auth = aiohttp.BasicAuth(username, password)
-
+        aio_auth = aiohttp.BasicAuth(username, password)
+        if callable(data):
+            body = data
+        else:
             # ⚠ aiohttp PUT 必须把 BytesIO 转成 raw content
             payload = data.getvalue() if hasattr(data, "getvalue") else data
 
-            async with session.put(
-                url,
-                data=payload,
-                headers=headers,
-                auth=aio_auth,
-            ) as resp:
-                try:
-                    text = await resp.text()
-                    result = json.loads(text)
-                except Exception as e:
-                    raise Exception(f"StreamLoad response not JSON: {resp.text}") from e
-                return resp, result
+            def body():
+                return payload
+
+        session = self._get_session()
+
+        backend = await self._pick_backend() if self.cache_redirects else None
+        if backend:
+            try:
+                async with session.put(
+                    backend + urlsplit(url).path, data=body(), headers=headers, auth=aio_auth, allow_redirects=False
+                ) as resp:
+                    return resp, await self._read_result(resp)
+            except aiohttp.ClientConnectorError as e:
+                self.logger.warning(f"StreamLoad BE {backend} unreachable, falling back to FE: {e}")
+                self._backends[backend] = time.monotonic() + self.be_cooldown
+
+        # Expect: 100-continue，FE 在收 body 之前就返回重定向，流式 body 不会被消费
+        async with session.put(url, data=body(), headers=headers, auth=aio_auth, allow_redirects=False) as resp:
+            if resp.status not in (307, 308):
+                return resp, await self._read_result(resp)
+            location = resp.headers["Location"]
+
+        if self.cache_redirects:
+            parts = urlsplit(location)
+            self._backends.setdefault(f"{parts.scheme}://{parts.netloc}", 0.0)
+        async with session.put(location, data=body(), headers=headers, auth=aio_auth, allow_redirects=False) as resp:
+            return resp, await self._read_result(resp)
 
     # -----------------------------
     # Public: DataFrame → Doris
@@ -161,84 +342,339 @@ class DorisStreamLoader:
     #     else:
     #         raise Exception(f"StreamLoad to {database}.{table} failed: {result}")
 
-    async def send_rows(self, rows, table: str, column_names: list[str] | None = None, **kwargs):
+    def _csv_blocks(self, rows, table: str, column_names: list[str] | None, constants: dict | None):
         """
-        写入 Doris StreamLoad:
-        - rows: list[dict] or list[list]
-        - column_names: required for list[list]，可选 for list[dict]
+        rows → (payload 列, TSV 文本块迭代器)；每块约 chunk_bytes，块内 "\n" 分隔、不带结尾换行。
+        list[dict] / list[list] 也可以是一次性迭代器（如 sqlite cursor），按需逐块编码
         """
-        if not rows:
-            return
+        # KlineBatch 等列式 batch：按列整批序列化，多个 batch 的列 / 常量必须一致
+        if isinstance(rows, list) and hasattr(rows[0], "to_tsv"):
+            return rows[0].column_names, (batch.to_tsv() for batch in rows if len(batch))
+
+        # -------------------
+        # 兼容 pandas DataFrame：切片逐块 to_csv，每行按每列约 16 字节估算切片行数
+        # -------------------
+        if hasattr(rows, "to_csv"):  # pandas DataFrame
+            column_names = payload_columns(table, list(rows.columns), constants)
+            frame = rows[column_names]
+            step = max(1, self.chunk_bytes // (16 * len(column_names)))
+            return column_names, (
+                frame.iloc[i : i + step]
+                .to_csv(sep="\t", index=False, header=False, encoding="utf-8")
+                .removesuffix("\n")
+                for i in range(0, len(frame), step)
+            )
+
+        rows = iter(rows)
+        first = next(rows)
+        rows = chain([first], rows)
+
         # -------------------
         # 1. 处理 list[dict]
         # -------------------
-        if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+        if isinstance(first, dict):
             # 自动抽字段
             if column_names is None:
-                column_names = list(rows[0].keys())
-
-            csv_lines = []
-            for row in rows:
-                line = "\t".join("" if row.get(col) is None else str(row.get(col)) for col in column_names)
-                csv_lines.append(line)
-
-            csv_data = "\n".join(csv_lines)
+                column_names = list(first.keys())
+            column_names = payload_columns(table, column_names, constants)
+            lines = (
+                "\t".join("" if row.get(col) is None else str(row.get(col)) for col in column_names) for row in rows
+            )
 
         # -------------------
         # 2. 处理 list[list]
         # -------------------
-        elif isinstance(rows, (list, tuple)) and rows and isinstance(rows[0], (list, tuple)):
+        elif isinstance(first, (list, tuple)):
             if column_names is None:
                 raise ValueError("column_names is required when rows is list[list]")
+            payload = payload_columns(table, column_names, constants)
+            keep = [i for i, col in enumerate(column_names) if col in payload]
+            column_names = payload
+            lines = ("\t".join("" if row[i] is None else str(row[i]) for i in keep) for row in rows)
 
-            csv_lines = []
-            for row in rows:
-                line = "\t".join("" if v is None else str(v) for v in row)
-                csv_lines.append(line)
+        else:
+            raise ValueError("rows must be list[dict], list[list], or DataFrame")
 
-            csv_data = "\n".join(csv_lines)
+        def blocks():
+            block, size = [], 0
+            for line in lines:
+                block.append(line)
+                size += len(line) + 1
+                if size >= self.chunk_bytes:
+                    yield "\n".join(block)
+                    block, size = [], 0
+            if block:
+                yield "\n".join(block)
+
+        return column_names, blocks()
+
+    def _csv_payload(self, rows, table: str, column_names: list[str] | None, constants: dict | None):
+        """rows → (payload 列, TSV 文本)"""
+        column_names, blocks = self._csv_blocks(rows, table, column_names, constants)
+        return column_names, "\n".join(blocks)
+
+    async def _stream_body(self, blocks, compress_type: str | None, sizes: Counter):
+        """
+        chunked body：逐块编码（和压缩）后 yield，内存里只有当前一块；
+        raw_bytes / sent_bytes 累计到 sizes。每行以 "\n" 结尾，Doris 忽略最后的空行
+        """
+        stream = compressor(compress_type) if compress_type else None
+        for block in blocks:
+            chunk = (block + "\n").encode("utf-8")
+            sizes["raw_bytes"] += len(chunk)
+            if stream:
+                chunk = stream.compress(chunk)
+                if not chunk:
+                    continue
+            sizes["sent_bytes"] += len(chunk)
+            yield chunk
+        if stream:
+            chunk = stream.flush()
+            sizes["sent_bytes"] += len(chunk)
+            yield chunk
+
+    def build_payload(
+        self,
+        rows,
+        table: str,
+        column_names: list[str] | None = None,
+        constants: dict | None = None,
+        load_format: Literal["csv", "arrow"] | None = None,
+    ) -> tuple[list[str], bytes | memoryview, str]:
+        """
+        rows → (payload 列, body, 实际使用的格式)；参数同 send_rows。
+        arrow 需要 pyarrow，未安装或类型推断失败时退回 csv
+        """
+        load_format = load_format or self.load_format
+        if is_arrow(rows):
+            load_format = "arrow"
+        if load_format == "arrow":
+            if not arrow_available():
+                self.logger.warning("pyarrow is not installed, StreamLoad falls back to csv")
+                self.load_format = load_format = "csv"
+            else:
+                try:
+                    column_names, batches = to_record_batches(rows, table, column_names, constants)
+                    return column_names, serialize(batches), "arrow"
+                except ARROW_ERRORS as e:
+                    self.logger.warning(f"StreamLoad to {table}: cannot build arrow batch ({e}), falling back to csv")
+        column_names, csv_data = self._csv_payload(rows, table, column_names, constants)
+        return column_names, csv_data.encode("utf-8"), "csv"
+
+    async def send_rows(
+        self,
+        rows,
+        table: str,
+        column_names: list[str] | None = None,
+        constants: dict | None = None,
+        load_format: Literal["csv", "arrow"] | None = None,
+        compress_type: str | None = None,
+        stream: bool | None = None,
+        group_commit: str | None = None,
+        label: str | None = None,
+        label_key: str | None = None,
+        idempotent: bool | None = None,
+        two_phase_commit: bool = False,
+        **kwargs,
+    ):
+        """
+        写入 Doris StreamLoad:
+        - rows: list[dict] / list[list] / DataFrame / KlineBatch / list[KlineBatch] / pyarrow RecordBatch / Table
+        - column_names: required for list[list]，可选 for list[dict]
+        - constants: 整批相同的列（如 exchange_id / inst_type），通过 columns 头传常量，不进 payload；
+          KlineBatch 默认取 batch.constants
+        - COMPUTED_COLUMNS 中登记的计算列（如 dt）由 Doris 端按表达式生成，rows 里即使有也不发送
+        - load_format: "csv" / "arrow"，默认取 DORIS_STREAMLOAD_FORMAT（csv）；RecordBatch / Table 总是按 arrow 发送
+        - compress_type: none / auto / gz / lz4 / zstd，默认取 DORIS_STREAMLOAD_COMPRESS（none）；只作用于 csv，
+          压缩在 worker 线程里做，每张表的原始 / 实际发送字节数和耗时累计在 self.stats
+        - stream: csv 按 chunk_bytes 一块边编码边以 chunked transfer encoding 发送，不再拼出整个 payload，
+          峰值内存与行数无关；默认取 self.stream。此时 rows 也可以是 dict / list 的迭代器（如 sqlite cursor），
+          压缩逐块流式进行，auto 因大小未知按大 payload 选择。arrow 仍整批序列化
+        - group_commit: async_mode / sync_mode / off_mode，默认按表取（见 group_commit.GROUP_COMMIT）；
+          BE 端攒批提交，返回的 result["Visible"] 表示返回时数据是否已可见（async_mode 只保证已写入 WAL）
+        - label: 显式 label；label_key: 数据集 key（如 "BTCUSDT-2025121616"），label 由它和内容摘要生成
+          （stream 时拿不到整个 payload，只用 key）；idempotent: 没有 label / label_key 时按 rows 的常量列、
+          时间范围和内容摘要自动生成，默认取 self.idempotent，不和 group commit / stream 同时生效。
+          Doris 返回 "Label Already Exists" 时按成功返回，result["Duplicate"] = True
+        - two_phase_commit: 只预提交，返回的 result["TxnId"] 需要 commit / abort；多表写入用 transaction()
+        """
+        if rows is None:
+            return
+        if hasattr(rows, "to_tsv"):
+            rows = [rows]
+        if not hasattr(rows, "__len__"):  # 迭代器：先取第一行判断是否为空
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is None:
+                return
+            rows = chain([first], rows)
+        elif len(rows) == 0:
+            return
 
-        # -------------------
-        # 3. 兜底：兼容 pandas DataFrame
-        # -------------------
-        elif hasattr(rows, "to_csv"):  # pandas DataFrame
-            column_names = list(rows.columns)
-            csv_data = rows.to_csv(index=False, header=False, encoding="utf-8")
+        if isinstance(rows, list) and hasattr(rows[0], "to_tsv") and constants is None:
+            constants = rows[0].constants
+        if is_arrow(rows):
+            load_format = "arrow"
+        stream = (self.stream if stream is None else stream) and (load_format or self.load_format) == "csv"
+        if not stream and not hasattr(rows, "__len__"):
+            rows = list(rows)
+
+        compress_type = compress_type or self.compress_type
+        sizes: Counter[str] = Counter()
+        compress_seconds = 0.0
+        if stream:
+            load_format = "csv"
+            column_names, blocks = self._csv_blocks(rows, table, column_names, constants)
+            compress_type = choose_compress_type(compress_type, LARGE_BYTES)
+
+            def body():
+                # 迭代器 rows 只能读一遍；FE 重定向 / BE 摘除都发生在 body 发出之前，这里只是兜底
+                if sizes["raw_bytes"]:
+                    raise Exception(f"StreamLoad to {self.database}.{table}: chunked body already sent, cannot replay")
+                return self._stream_body(blocks, compress_type, sizes)
 
         else:
-            raise ValueError("rows must be list[dict], list[list], or DataFrame")
+            column_names, payload, load_format = self.build_payload(rows, table, column_names, constants, load_format)
+            body = payload
+            # arrow 本身是二进制列，只压缩 csv
+            compress_type = choose_compress_type(compress_type, len(payload)) if load_format == "csv" else None
+            if compress_type:
+                start = time.monotonic()
+                body = await asyncio.to_thread(compress, payload, compress_type)
+                compress_seconds = time.monotonic() - start
+            sizes["raw_bytes"], sizes["sent_bytes"] = len(payload), len(body)
 
         # -------------------
         # StreamLoad headers
         # -------------------
-        headers = {
-            "Expect": "100-continue",
-            "column_separator": r"\t",
-            "enclose": '"',
-            "trim_double_quotes": "true",
-            "line_delimiter": r"\n",
-            "columns": ",".join(column_names),
-        }
+        headers = {"Expect": "100-continue"}
+        if load_format == "arrow":
+            headers["format"] = "arrow"
+        else:
+            headers.update(
+                {
+                    "column_separator": r"\t",
+                    "enclose": '"',
+                    "trim_double_quotes": "true",
+                    "line_delimiter": r"\n",
+                }
+            )
+        headers["columns"], has_computed = columns_header(table, column_names, constants)
+        if has_computed:
+            headers["timezone"] = "UTC"
+        if compress_type:
+            headers["compress_type"] = compress_type
+        if label is None and label_key is not None:
+            label = make_label(table, label_key, None if stream else payload)
+        if label:
+            headers["label"] = label
+        if two_phase_commit:
+            headers["two_phase_commit"] = "true"
         headers.update(kwargs)
+        group_commit = group_commit_mode(table, group_commit, self.group_commit)
+        conflicts = [h for h in EXCLUSIVE_HEADERS if str(headers.get(h, "")).lower() not in ("", "false")]
+        if group_commit and conflicts:
+            self.logger.debug(f"StreamLoad {table}: {conflicts} set, group commit disabled")
+            group_commit = None
+        if group_commit:
+            headers["group_commit"] = group_commit
+        elif label is None and not stream and (self.idempotent if idempotent is None else idempotent):
+            label = headers["label"] = make_label(table, dataset_key(rows, column_names), payload)
 
         streamload_url = f"http://{self.host}:{self.http_port}/api/{self.database}/{table}/_stream_load"
 
-        resp, result = await self._send_streamload_request_async(
-            streamload_url,
-            data=BytesIO(csv_data.encode("utf-8")),
-            headers=headers,
-            auth=(self.user, self.password),
-        )
+        start = time.monotonic()
+        duplicate = None
+        for _ in range(2):
+            resp, result = await self._send_streamload_request_async(
+                streamload_url,
+                data=body,
+                headers=headers,
+                auth=(self.user, self.password),
+            )
+            if result.get("Status") != "Label Already Exists":
+                break
+            # 同一份数据已经写过（或正在写）：完成的直接当成功；进行中的等它结束，失败了 label 可以重用，再发一次
+            state = result.get("ExistingJobStatus")
+            if state != "FINISHED":
+                state = await self._wait_label(label)
+            if state in ("FINISHED", "VISIBLE", "COMMITTED"):
+                duplicate = state
+                result.update(Status="Success", Duplicate=True)
+                self.logger.info(f"StreamLoad {table}: label {label} already loaded ({state}), skipped")
+                break
+            if state == "PRECOMMITTED":
+                # label_wait 内没人 commit / abort：多半是崩溃的两阶段提交遗留的事务，abort 后 label 才能重用
+                try:
+                    await self._two_phase("abort", label=label)
+                except Exception as e:
+                    raise Exception(
+                        f"StreamLoad to {self.database}.{table}: label {label} is held by a stale PRECOMMITTED "
+                        f"transaction and aborting it failed ({e}); abort it via _stream_load_2pc "
+                        f"(label + txn_operation: abort) before retrying"
+                    ) from e
+                self.logger.warning(f"StreamLoad {table}: aborted stale PRECOMMITTED transaction for label {label}")
+                continue
+            self.logger.warning(f"StreamLoad {table}: previous load with label {label} ended as {state}, reloading")
+        load_seconds = time.monotonic() - start
+
+        stats = self.stats[table]
+        stats["loads"] += 1
+        stats["group_commit_loads"] += bool(group_commit)
+        stats["duplicate_loads"] += bool(duplicate)
+        stats["raw_bytes"] += sizes["raw_bytes"]
+        stats["sent_bytes"] += 0 if duplicate else sizes["sent_bytes"]
+        stats["compress_seconds"] += compress_seconds
+        stats["load_seconds"] += load_seconds
+        if compress_type:
+            self.logger.info(
+                f"StreamLoad {table}: {sizes['raw_bytes'] / 1e6:.2f} MB → {sizes['sent_bytes'] / 1e6:.2f} MB "
+                f"({compress_type}{', chunked' if stream else ''}), "
+                f"compress {compress_seconds:.3f}s, load {load_seconds:.3f}s"
+            )
 
         if resp.status == 200 and result.get("Status") == "Success":
+            if duplicate:
+                result["Visible"] = duplicate != "COMMITTED"
+            else:
+                result["Visible"] = group_commit != "async_mode" and not two_phase_commit
             return result
         else:
             self.logger.info(column_names)
-            self.logger.info(csv_data)
+            if load_format == "csv" and not stream:
+                self.logger.info(bytes(payload).decode("utf-8"))
             self.logger.error(f"StreamLoad to {self.database}.{table} failed: {result}")
             raise Exception(f"StreamLoad to {self.database}.{table} failed: {result}")
 
 
+class StreamLoadTransaction:
+    """DorisStreamLoader.transaction() 的句柄：send_rows 以 two_phase_commit 预提交并记下 TxnId"""
+
+    def __init__(self, loader: DorisStreamLoader):
+        self.loader = loader
+        self.txn_ids: list[int] = []
+
+    async def send_rows(self, rows, table: str, **kwargs):
+        result = await self.loader.send_rows(rows, table, two_phase_commit=True, **kwargs)
+        # 重复的 label 没有新事务（之前那次已经可见）
+        if result and not result.get("Duplicate"):
+            self.txn_ids.append(result["TxnId"])
+        return result
+
+    async def commit(self):
+        while self.txn_ids:
+            await self.loader.commit(self.txn_ids[0])
+            self.txn_ids.pop(0)
+
+    async def abort(self):
+        txn_ids, self.txn_ids = self.txn_ids, []
+        for txn_id in txn_ids:
+            try:
+                await self.loader.abort(txn_id)
+            except Exception as e:
+                self.loader.logger.error(f"StreamLoad 2PC abort txn {txn_id} failed: {e}")
+
+
 # ------------------
 # Singleton Instance
 # ------------------
@@ -0,0 +1,73 @@
+"""
+StreamLoad 的 Arrow 格式（format: arrow，Arrow IPC stream）：数值按二进制列发送，
+省掉客户端逐个 str() 格式化和 Doris 端的 CSV 解析。
+
+pyarrow 是可选依赖（pip install ".[arrow]"），没有安装时 DorisStreamLoader 退回 CSV。
+"""
+
+from .columns import payload_columns
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# 类型推断失败（同一列混了字符串和数字等）时退回 CSV
+ARROW_ERRORS: tuple[type[Exception], ...] = (pa.ArrowInvalid, pa.ArrowTypeError) if pa else ()
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def is_arrow(rows) -> bool:
+    return pa is not None and isinstance(rows, pa.RecordBatch | pa.Table)
+
+
+def kline_to_arrow(batch) -> "pa.RecordBatch":
+    """KlineBatch → RecordBatch（列同 batch.column_names）；NaN 转为 null"""
+    arrays = [pa.repeat(batch.symbol, len(batch)), pa.array(batch.timestamp)]
+    arrays += [pa.array(getattr(batch, name), from_pandas=True) for name in batch.fields]
+    return pa.RecordBatch.from_arrays(arrays, names=batch.column_names)
+
+
+def to_record_batches(
+    rows, table: str, column_names: list[str] | None = None, constants: dict | None = None
+) -> tuple[list[str], list["pa.RecordBatch"]]:
+    """
+    rows（同 send_rows：RecordBatch / Table / list[KlineBatch] / list[dict] / list[list] / DataFrame）
+    → (payload 列, RecordBatch 列表)；计算列和常量列同 CSV 一样不进 payload
+    """
+    if is_arrow(rows):
+        names = payload_columns(table, rows.schema.names, constants)
+        rows = rows.select(names)
+        return names, rows.to_batches() if isinstance(rows, pa.Table) else [rows]
+
+    if isinstance(rows, list) and hasattr(rows[0], "to_tsv"):
+        return rows[0].column_names, [kline_to_arrow(batch) for batch in rows if len(batch)]
+
+    if isinstance(rows, list) and isinstance(rows[0], dict):
+        names = payload_columns(table, column_names or list(rows[0].keys()), constants)
+        return names, [pa.RecordBatch.from_pydict({c: [row.get(c) for row in rows] for c in names})]
+
+    if isinstance(rows, list | tuple) and isinstance(rows[0], list | tuple):
+        if column_names is None:
+            raise ValueError("column_names is required when rows is list[list]")
+        names = payload_columns(table, column_names, constants)
+        index = {c: i for i, c in enumerate(column_names)}
+        return names, [pa.RecordBatch.from_pydict({c: [row[index[c]] for row in rows] for c in names})]
+
+    if hasattr(rows, "to_csv"):  # pandas DataFrame
+        names = payload_columns(table, list(rows.columns), constants)
+        return names, [pa.RecordBatch.from_pandas(rows[names], preserve_index=False)]
+
+    raise ValueError("rows must be RecordBatch, Table, list[dict], list[list], or DataFrame")
+
+
+def serialize(batches: list["pa.RecordBatch"]) -> memoryview:
+    """写成 Arrow IPC stream，直接返回底层 buffer，不再拷贝成 bytes"""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batches[0].schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return memoryview(sink.getvalue())
@@ -0,0 +1,52 @@
+"""
+StreamLoad columns 映射：服务端计算列 + 常量列，客户端不再序列化这些列。
+
+columns 头示例：
+    symbol,timestamp,open,...,dt=from_unixtime(`timestamp` div 1000),exchange_id=1,inst_type=2
+"""
+
+_TS_TO_DT = {"dt": "from_unixtime(ts div 1000)"}
+_TIMESTAMP_TO_DT = {"dt": "from_unixtime(`timestamp` div 1000)"}
+
+# 表 → {目标列: StreamLoad 表达式}；from_unixtime 按 timezone 头（UTC）解释
+COMPUTED_COLUMNS: dict[str, dict[str, str]] = {
+    "kline_1m": _TIMESTAMP_TO_DT,
+    "kline_1h": _TIMESTAMP_TO_DT,
+    "kline_1d": _TIMESTAMP_TO_DT,
+    "kline_quarantine": _TIMESTAMP_TO_DT,
+    "funding_settlement": _TS_TO_DT,
+    "market_sentiment_5m": _TS_TO_DT,
+    "market_sentiment_1h": _TS_TO_DT,
+    "market_sentiment_1d": _TS_TO_DT,
+    "kalshi_market_snapshot": _TS_TO_DT,
+    "cex_inflow_hourly": _TS_TO_DT,
+    "large_transfer": _TS_TO_DT,
+    "onchain_large_transfer": _TS_TO_DT,
+    "macro_kline_raw_1m": _TS_TO_DT,
+}
+
+
+def _literal(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int | float):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def payload_columns(table: str, column_names: list[str], constants: dict | None = None) -> list[str]:
+    """实际需要客户端序列化的列：去掉服务端计算列和常量列"""
+    skip = COMPUTED_COLUMNS.get(table, {}).keys() | (constants or {}).keys()
+    return [c for c in column_names if c not in skip]
+
+
+def columns_header(table: str, column_names: list[str], constants: dict | None = None) -> tuple[str, bool]:
+    """
+    column_names: payload 列（已经过 payload_columns）
+    返回 (columns 头, 是否含计算列)；含计算列时需要带 timezone 头
+    """
+    computed = COMPUTED_COLUMNS.get(table, {})
+    parts = list(column_names)
+    parts += [f"{c}={expr}" for c, expr in computed.items()]
+    parts += [f"{c}={_literal(v)}" for c, v in (constants or {}).items()]
+    return ",".join(parts), bool(computed)
@@ -0,0 +1,94 @@
+"""
+StreamLoad 的 compress_type：CSV payload 压缩后发送，Doris 端按 compress_type 头解压。
+
+lz4 / zstd 是可选依赖（pip install ".[compress]"），未安装时退回标准库 gzip。
+auto 按 payload 大小选择：小 payload 不压缩（省下的传输时间抵不过两端的压缩 / 解压），
+中等用最快的 lz4，大 payload 用压缩率更高的 zstd。
+"""
+
+import gzip
+import zlib
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESS_TYPES = ("gz", "lz4", "zstd")
+MIN_COMPRESS_BYTES = 1 << 20
+LARGE_BYTES = 16 << 20
+
+
+def available(compress_type: str) -> bool:
+    return {"gz": True, "lz4": lz4_frame is not None, "zstd": zstandard is not None}.get(compress_type, False)
+
+
+def choose(mode: str | None, size: int) -> str | None:
+    """mode: none / auto / gz / lz4 / zstd → 实际使用的 compress_type，None 表示不压缩"""
+    if not mode or mode == "none":
+        return None
+    if mode == "auto":
+        if size < MIN_COMPRESS_BYTES:
+            return None
+        preferred = ("zstd", "lz4", "gz") if size >= LARGE_BYTES else ("lz4", "zstd", "gz")
+    elif mode in COMPRESS_TYPES:
+        preferred = (mode, "gz")
+    else:
+        raise ValueError(f"Unknown compress_type: {mode}")
+    return next(c for c in preferred if available(c))
+
+
+def compress(body: bytes | memoryview, compress_type: str) -> bytes:
+    """CPU 密集，调用方用 asyncio.to_thread 放到 worker 线程（三种实现都会释放 GIL）"""
+    if compress_type == "gz":
+        return gzip.compress(body, compresslevel=1)
+    if compress_type == "lz4":
+        return lz4_frame.compress(body)
+    if compress_type == "zstd":
+        return zstandard.ZstdCompressor(level=1).compress(body)
+    raise ValueError(f"Unknown compress_type: {compress_type}")
+
+
+class _Lz4Stream:
+    """LZ4FrameCompressor 需要先 begin() 写出帧头，包一层对齐 compressobj 的 compress / flush 接口"""
+
+    def __init__(self):
+        self._compressor = lz4_frame.LZ4FrameCompressor()
+        self._header = self._compressor.begin()
+
+    def compress(self, chunk: bytes) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._compressor.compress(chunk)
+
+    def flush(self) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._compressor.flush()
+
+
+def compressor(compress_type: str):
+    """流式压缩（chunked body 用）：返回带 compress(chunk) / flush() 的对象，输出与 compress 同格式"""
+    if compress_type == "gz":
+        return zlib.compressobj(1, zlib.DEFLATED, 31)  # wbits=31：gzip 头尾
+    if compress_type == "lz4":
+        return _Lz4Stream()
+    if compress_type == "zstd":
+        return zstandard.ZstdCompressor(level=1).compressobj()
+    raise ValueError(f"Unknown compress_type: {compress_type}")
+
+
+def decompress(body: bytes, compress_type: str | None) -> bytes:
+    """compress 的逆操作（本地 mock / 排查用）"""
+    if not compress_type:
+        return body
+    if compress_type == "gz":
+        return gzip.decompress(body)
+    if compress_type == "lz4":
+        return lz4_frame.decompress(body)
+    if compress_type == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)  # 流式压缩的帧头不带原始大小
+    raise ValueError(f"Unknown compress_type: {compress_type}")
@@ -0,0 +1,37 @@
+"""
+StreamLoad group commit（Doris 2.1+）：高频小批量写入由 BE 按表攒批，每个 group_commit_interval_ms
+（表属性，默认 10s）合成一次提交，只产生一个 tablet 版本，减轻 compaction 压力。
+
+- async_mode：写入 WAL 即返回，本轮提交后可见
+- sync_mode：等本轮提交完成再返回，返回即可见，延迟最多一个 group_commit_interval
+- off_mode：普通 StreamLoad，每次 load 一个版本
+
+DORIS_GROUP_COMMIT=off 整体关闭（Doris 2.1 以下不认识 group_commit 头）。
+"""
+
+import os
+
+GROUP_COMMIT_MODES = ("async_mode", "sync_mode", "off_mode")
+
+# 表 → group commit 模式；不在表里的走普通 StreamLoad
+GROUP_COMMIT: dict[str, str] = {
+    "market_sentiment_5m": "async_mode",
+    "funding_settlement": "async_mode",
+    "kalshi_market_snapshot": "async_mode",
+    "kalshi_market_meta": "sync_mode",  # 下一轮 sync_market_meta 开头要读回已结算的 ticker
+    "onchain_large_transfer": "async_mode",
+    "macro_kline_raw_1m": "async_mode",
+}
+
+# 和 group commit 互斥的 StreamLoad 头（Doris 直接拒绝），带上时退回普通 StreamLoad
+EXCLUSIVE_HEADERS = ("label", "two_phase_commit", "partial_columns")
+
+
+def group_commit_mode(table: str, mode: str | None = None, overrides: dict[str, str] | None = None) -> str | None:
+    """mode（单次调用）> overrides（loader 级）> GROUP_COMMIT → 实际使用的模式，None 表示普通 StreamLoad"""
+    mode = mode or (overrides or {}).get(table) or GROUP_COMMIT.get(table)
+    if mode is not None and mode not in GROUP_COMMIT_MODES:
+        raise ValueError(f"Unknown group_commit mode: {mode}")
+    if mode == "off_mode" or os.getenv("DORIS_GROUP_COMMIT", "on").lower() in ("off", "off_mode", "false", "0"):
+        return None
+    return mode
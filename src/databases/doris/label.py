@@ -0,0 +1,56 @@
+"""
+StreamLoad 确定性 label：同一份数据重复写入（Prefect task 重试、flow 重跑）得到同一个 label，
+Doris 返回 "Label Already Exists" 时按成功处理，重试变成 no-op。
+
+label = {table}_{数据集 key}_{内容摘要}：数据集 key 描述写的是哪一段数据（常量列 + 时间范围），
+内容摘要保证同一范围内数据变了（未收盘 bar 更新、交易所修正）时 label 也跟着变，不会被误判为重复。
+Doris 按库保留已完成的 label（label_keep_max_second，默认 3 天），超过后同一 label 会重新导入。
+"""
+
+import hashlib
+import re
+
+LABEL_MAX_LENGTH = 128
+_INVALID = re.compile(r"[^-_A-Za-z0-9:]")
+_TIME_COLUMNS = ("ts", "timestamp")
+
+
+def _digest(data, size: int = 10) -> str:
+    return hashlib.blake2b(data, digest_size=size).hexdigest()
+
+
+def dataset_key(rows, column_names: list[str] | None = None) -> str:
+    """
+    rows → 数据集 key：KlineBatch 列表取常量列 + symbol（多个时取个数）+ 首尾 timestamp，
+    list[dict] / list[list] 有 ts / timestamp 列时取首尾时间，其它只用行数
+    """
+    if isinstance(rows, list) and rows and hasattr(rows[0], "to_tsv"):
+        batches = [batch for batch in rows if len(batch)]
+        if not batches:
+            return "0"
+        symbols = {batch.symbol for batch in batches}
+        start = min(int(batch.timestamp.min()) for batch in batches)
+        end = max(int(batch.timestamp.max()) for batch in batches)
+        parts = [*map(str, batches[0].constants.values()), symbols.pop() if len(symbols) == 1 else f"{len(symbols)}s"]
+        return "-".join([*parts, str(start), str(end)])
+
+    if isinstance(rows, list | tuple) and rows:
+        if isinstance(rows[0], dict):
+            column = next((c for c in _TIME_COLUMNS if c in rows[0]), None)
+            values = [row[column] for row in rows] if column else []
+        else:
+            index = next((column_names.index(c) for c in _TIME_COLUMNS if c in (column_names or [])), None)
+            values = [row[index] for row in rows] if index is not None else []
+        values = [v for v in values if v is not None]
+        if values:
+            return f"{min(values)}-{max(values)}-{len(rows)}"
+    return str(len(rows)) if hasattr(rows, "__len__") else "rows"
+
+
+def make_label(table: str, key: str, body=None) -> str:
+    """body（编码后的 payload）不为空时拼上内容摘要；超过 Doris 128 字符上限时截断并以整体摘要结尾"""
+    parts = [table, key] if body is None else [table, key, _digest(body)]
+    label = _INVALID.sub("_", "_".join(parts))
+    if len(label) > LABEL_MAX_LENGTH:
+        label = f"{label[: LABEL_MAX_LENGTH - 21]}_{_digest(label.encode(), 10)}"
+    return label
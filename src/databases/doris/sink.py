@@ -0,0 +1,240 @@
+import asyncio
+from collections import Counter
+from collections.abc import Hashable
+from functools import lru_cache
+from itertools import chain
+import time
+
+from prefect import get_run_logger
+
+from databases.doris import DorisStreamLoader, get_stream_loader
+from utils.logger import logger as _logger
+
+
+class KlineSink:
+    """
+    跨 page / symbol 聚合的 Doris 写入缓冲：
+    - 行数 (max_rows)、字节数 (max_bytes)、时间 (max_interval) 任一达到即 flush
+    - 最多 max_concurrent_flushes 个 StreamLoad 并发
+    - 缓冲 + 在途行数超过 max_pending_rows 时 put() 阻塞，对上游 fetcher 形成背压
+    - two_phase_commit：每次 StreamLoad 只预提交，flush() 时全部成功才统一 commit，有失败则全部 abort，
+      多张表（如 1m 和 rollup 出的 1h / 1d）一起可见；flush() 要在 Doris 事务超时（timeout 头）内调用
+    - owner：put / flush 传同一个 owner 时，该 owner 的行单独缓冲、单独 StreamLoad，
+      flush(owner) 只落它自己的缓冲、只抛它自己的失败、只提交它自己的事务（如并发的回填 chunk）
+    """
+
+    def __init__(
+        self,
+        stream_loader: DorisStreamLoader | None = None,
+        max_rows: int = 50_000,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_interval: float = 5.0,
+        max_concurrent_flushes: int = 4,
+        max_pending_rows: int = 500_000,
+        two_phase_commit: bool = False,
+    ):
+        try:
+            self.logger = get_run_logger()
+        except Exception:
+            self.logger = _logger
+        self.stream_loader = stream_loader or get_stream_loader()
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_interval = max_interval
+        self.max_concurrent_flushes = max_concurrent_flushes
+        self.max_pending_rows = max_pending_rows
+        self.two_phase_commit = two_phase_commit
+
+        # key: (owner, table, columns, constants)；同一 buffer 内的行字段、常量一致，保证 StreamLoad columns 头正确
+        # buffer 内元素为 KlineBatch 或 list[dict]，flush 时再合并
+        self._buffers: dict[tuple, list] = {}
+        self._buffer_rows: dict[tuple, int] = {}
+        self._buffer_bytes: dict[tuple, int] = {}
+        self._buffer_since: dict[tuple, float] = {}
+        self._pending_rows = 0
+        self._inflight: dict[asyncio.Task, Hashable] = {}  # 在途 StreamLoad → owner
+        self._errors: dict[Hashable, list[Exception]] = {}
+        self._prepared: dict[Hashable, list[int]] = {}  # two_phase_commit 时已预提交、等 flush() commit 的 TxnId
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._cond: asyncio.Condition | None = None
+        self._flush_sem: asyncio.Semaphore | None = None
+        self._timer: asyncio.Task | None = None
+
+    def _bind_loop(self):
+        """
+        asyncio 原语绑定到当前 loop（Prefect 每次 flow run 可能是新的 loop）。
+        上一个 loop 里没 flush 完的状态属于已经结束的 flow run：缓冲和未上报的错误丢弃，
+        在途计数清零（否则 put() 可能永远等不到背压释放），已预提交的事务在新 loop 里 abort
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        stale_txns = [txn_id for txn_ids in self._prepared.values() for txn_id in txn_ids]
+        if self._loop is not None:
+            self._drop_stale(stale_txns)
+        self._loop = loop
+        self._cond = asyncio.Condition()
+        self._flush_sem = asyncio.Semaphore(self.max_concurrent_flushes)
+        self._inflight = {}
+        self._timer = None
+        if stale_txns:
+            task = asyncio.create_task(self._abort(stale_txns))
+            self._inflight[task] = None
+            task.add_done_callback(self._done)
+
+    def _drop_stale(self, stale_txns: list[int]):
+        dropped = Counter()
+        for key, n_rows in self._buffer_rows.items():
+            dropped[key[1]] += n_rows
+        inflight_rows = self._pending_rows - sum(dropped.values())
+        errors = sum(map(len, self._errors.values()))
+        if dropped or inflight_rows or errors or stale_txns:
+            self.logger.warning(
+                f"KlineSink rebound to a new event loop, dropping state of the previous run: "
+                f"buffered rows {dict(dropped)}, {inflight_rows} in-flight rows, {errors} unreported error(s), "
+                f"aborting {len(stale_txns)} prepared transaction(s)"
+            )
+        self._buffers.clear()
+        self._buffer_rows.clear()
+        self._buffer_bytes.clear()
+        self._buffer_since.clear()
+        self._pending_rows = 0
+        self._errors.clear()
+        self._prepared.clear()
+
+    def _done(self, task: asyncio.Task):
+        self._inflight.pop(task, None)
+
+    @staticmethod
+    def _estimate_bytes(rows) -> int:
+        """按单行 TSV 长度估算整批大小，避免逐行计算"""
+        if hasattr(rows, "fields"):  # KlineBatch
+            line = len(rows.fields) * 12 + len(rows.symbol) + 16
+        else:
+            first = rows[0]
+            line = sum(len(str(v)) for v in first.values() if v is not None) + len(first)
+        return line * len(rows)
+
+    async def put(self, rows, table: str, owner: Hashable = None):
+        """写入一批行（KlineBatch 或 list[dict]）；缓冲超限时等待在途 flush 完成"""
+        if rows is None or len(rows) == 0:
+            return
+        self._bind_loop()
+
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._pending_rows < self.max_pending_rows)
+            self._pending_rows += len(rows)
+
+        if hasattr(rows, "column_names"):  # KlineBatch：常量不同的 batch 不能合并到同一次 StreamLoad
+            key = (owner, table, tuple(rows.column_names), tuple(rows.constants.items()))
+        else:
+            key = (owner, table, tuple(rows[0].keys()), ())
+        buffer = self._buffers.setdefault(key, [])
+        if not buffer:
+            self._buffer_since[key] = time.monotonic()
+        buffer.append(rows)
+        self._buffer_rows[key] = self._buffer_rows.get(key, 0) + len(rows)
+        self._buffer_bytes[key] = self._buffer_bytes.get(key, 0) + self._estimate_bytes(rows)
+
+        if self._buffer_rows[key] >= self.max_rows or self._buffer_bytes[key] >= self.max_bytes:
+            self._flush_buffer(key)
+
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_periodically())
+
+    def _flush_buffer(self, key: tuple):
+        chunks = self._buffers.pop(key, None)
+        n_rows = self._buffer_rows.pop(key, 0)
+        self._buffer_bytes.pop(key, None)
+        self._buffer_since.pop(key, None)
+        if not chunks:
+            return
+        # KlineBatch 保持为 list[KlineBatch]，由 send_rows 逐个列式序列化
+        rows = chunks if hasattr(chunks[0], "to_tsv") else list(chain.from_iterable(chunks))
+        owner, table = key[:2]
+        task = asyncio.create_task(self._send(rows, n_rows, table, owner))
+        self._inflight[task] = owner
+        task.add_done_callback(self._done)
+
+    async def _send(self, rows, n_rows: int, table: str, owner: Hashable):
+        try:
+            async with self._flush_sem:
+                start = time.monotonic()
+                if self.two_phase_commit:
+                    result = await self.stream_loader.send_rows(rows, table, two_phase_commit=True)
+                    if result and not result.get("Duplicate"):
+                        self._prepared.setdefault(owner, []).append(result["TxnId"])
+                else:
+                    await self.stream_loader.send_rows(rows, table)
+                self.logger.info(f"KlineSink flushed {n_rows} rows to {table} in {time.monotonic() - start:.3f}s")
+        except Exception as e:
+            self.logger.error(f"KlineSink flush to {table} failed ({n_rows} rows): {e}")
+            self._errors.setdefault(owner, []).append(e)
+        finally:
+            async with self._cond:
+                self._pending_rows -= n_rows
+                self._cond.notify_all()
+
+    async def _flush_periodically(self):
+        while self._buffers or self._inflight:
+            await asyncio.sleep(self.max_interval / 2)
+            now = time.monotonic()
+            for key, since in list(self._buffer_since.items()):
+                if now - since >= self.max_interval:
+                    self._flush_buffer(key)
+
+    async def flush(self, owner: Hashable = None):
+        """flush owner 的全部缓冲并等待它的在途 StreamLoad；owner 的写入有失败时抛出"""
+        if self._loop is None:
+            return
+        self._bind_loop()
+        for key in [key for key in self._buffers if key[0] == owner]:
+            self._flush_buffer(key)
+        while tasks := [task for task, task_owner in self._inflight.items() if task_owner == owner]:
+            await asyncio.gather(*tasks)
+
+        prepared = self._prepared.pop(owner, [])
+        errors = self._errors.pop(owner, [])
+        if errors:
+            await self._abort(prepared)
+            raise Exception(f"KlineSink: {len(errors)} flush(es) failed, first error: {errors[0]}") from errors[0]
+        for n, txn_id in enumerate(prepared):
+            try:
+                await self.stream_loader.commit(txn_id)
+            except Exception:
+                await self._abort(prepared[n + 1 :])
+                raise
+        if prepared:
+            self.logger.info(f"KlineSink committed {len(prepared)} StreamLoad transactions")
+
+    async def _abort(self, txn_ids: list[int]):
+        for txn_id in txn_ids:
+            try:
+                await self.stream_loader.abort(txn_id)
+            except Exception as e:
+                self.logger.error(f"KlineSink abort txn {txn_id} failed: {e}")
+
+    async def close(self):
+        try:
+            # 正常情况下各 owner 已自行 flush；遗留的缓冲在这里落盘，失败只能记日志
+            for owner in ({key[0] for key in self._buffers} | set(self._errors) | set(self._prepared)) - {None}:
+                try:
+                    await self.flush(owner)
+                except Exception as e:
+                    self.logger.error(f"KlineSink flush of owner {owner} failed on close: {e}")
+            await self.flush()
+        finally:
+            if self._timer and not self._timer.done():
+                self._timer.cancel()
+            self._timer = None
+            # 释放 StreamLoad 的长连接池，下次写入时按需重建
+            await self.stream_loader.close()
+
+
+# ------------------
+# Singleton Instance
+# ------------------
+@lru_cache
+def get_kline_sink() -> KlineSink:
+    return KlineSink()
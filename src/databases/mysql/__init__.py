@@ -8,9 +8,27 @@ from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
-from .models import ExchangeInfo, ExchangeSymbol
+from .models import (
+    ExchangeInfo,
+    ExchangeSymbol,
+    KlineArchiveCoverage,
+    KlineBackfillChunk,
+    KlineBackfillJob,
+    KlineOpenBar,
+)
 
-__all__ = ["ExchangeInfo", "ExchangeSymbol", "async_engine", "async_upsert_dataframe", "get_session", "sync_engine"]
+__all__ = [
+    "ExchangeInfo",
+    "ExchangeSymbol",
+    "KlineArchiveCoverage",
+    "KlineBackfillChunk",
+    "KlineBackfillJob",
+    "KlineOpenBar",
+    "async_engine",
+    "async_upsert_dataframe",
+    "get_session",
+    "sync_engine",
+]
 
 load_dotenv()
 
@@ -1,7 +1,7 @@
 from typing import Optional
 import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKeyConstraint, Index, SmallInteger, String, text
+from sqlalchemy import BigInteger, DateTime, ForeignKeyConstraint, Index, Integer, SmallInteger, String, text
 from sqlalchemy.dialects.mysql import BIGINT, TINYINT
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -22,6 +22,7 @@ class ClxSymbol(Base):
     id: Mapped[int] = mapped_column(BIGINT, primary_key=True, comment='技术主键')
     symbol_id: Mapped[int] = mapped_column(BIGINT, nullable=False, comment='关联 exchange_symbol.id（交易所交易对）')
     is_active: Mapped[int] = mapped_column(TINYINT(1), nullable=False, server_default=text("'1'"), comment='是否在站点上线：1=上线可用，0=站点下线')
+    sync_priority: Mapped[int] = mapped_column(TINYINT, nullable=False, server_default=text("'0'"), comment='kline 同步优先级：越大越先同步，0=按成交额 / 落后程度排序')
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP'), comment='创建时间（symbol 首次加入站点）')
     updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), comment='更新时间（站点上下线变更）')
 
@@ -67,3 +68,87 @@ class ExchangeSymbol(Base):
 
     exchange: Mapped['ExchangeInfo'] = relationship('ExchangeInfo', back_populates='exchange_symbol')
     clx_symbol: Mapped[list['ClxSymbol']] = relationship('ClxSymbol', back_populates='symbol')
+
+
+class KlineArchiveCoverage(Base):
+    __tablename__ = 'kline_archive_coverage'
+    __table_args__ = (
+        Index('idx_exchange_symbol_interval', 'exchange_id', 'inst_type', 'symbol', 'interval'),
+        Index('uk_archive_period', 'exchange_id', 'inst_type', 'symbol', 'interval', 'period', unique=True),
+        {'comment': '交易所历史 kline 归档导入记录'}
+    )
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    exchange_id: Mapped[int] = mapped_column(SmallInteger, nullable=False, comment='交易所标识')
+    inst_type: Mapped[int] = mapped_column(TINYINT, nullable=False, comment='产品类别：0:SPOT现货, 1:perpetual永续合约')
+    symbol: Mapped[str] = mapped_column(String(100), nullable=False, comment='交易对唯一标识')
+    interval: Mapped[str] = mapped_column(String(8), nullable=False, comment='归档 kline 周期')
+    period: Mapped[str] = mapped_column(String(10), nullable=False, comment='归档周期：YYYY-MM（月度）或 YYYY-MM-DD（日度）')
+    start_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='归档内第一根 bar 的毫秒时间戳')
+    end_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='归档内最后一根 bar 的毫秒时间戳')
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False, comment='归档内 bar 数量')
+    checksum: Mapped[str] = mapped_column(String(64), nullable=False, comment='归档文件 sha256')
+    source: Mapped[str] = mapped_column(String(512), nullable=False, comment='归档文件路径 / S3 key')
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP'), comment='创建时间')
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), comment='最后更新时间')
+
+
+class KlineBackfillChunk(Base):
+    __tablename__ = 'kline_backfill_chunk'
+    __table_args__ = (
+        Index('idx_job', 'job_id'),
+        Index('idx_status_lease', 'status', 'lease_until'),
+        {'comment': 'kline 回填任务的分片工作单元，worker 用 FOR UPDATE SKIP LOCKED 领取'}
+    )
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    job_id: Mapped[int] = mapped_column(BIGINT, nullable=False, comment='关联 kline_backfill_job.id')
+    start_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='分片起始毫秒时间戳（含）')
+    end_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='分片结束毫秒时间戳（含）')
+    cursor_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='下次从这里继续拉取，失败时保存已落盘的进度')
+    status: Mapped[int] = mapped_column(TINYINT, nullable=False, server_default=text("'0'"), comment='0=PENDING, 1=RUNNING, 2=DONE, 3=FAILED')
+    attempts: Mapped[int] = mapped_column(SmallInteger, nullable=False, server_default=text("'0'"), comment='已领取次数')
+    worker: Mapped[Optional[str]] = mapped_column(String(100), comment='当前领取的 worker')
+    lease_until: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, comment='租约到期时间，过期后可被其它 worker 重新领取')
+    error: Mapped[Optional[str]] = mapped_column(String(512), comment='最近一次失败原因')
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP'), comment='创建时间')
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), comment='最后更新时间')
+
+
+class KlineBackfillJob(Base):
+    __tablename__ = 'kline_backfill_job'
+    __table_args__ = (
+        Index('idx_exchange_symbol_interval', 'exchange_id', 'inst_type', 'symbol', 'interval'),
+        Index('idx_status', 'status'),
+        {'comment': 'kline 定向回填任务'}
+    )
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    exchange_id: Mapped[int] = mapped_column(SmallInteger, nullable=False, comment='交易所标识')
+    inst_type: Mapped[int] = mapped_column(TINYINT, nullable=False, comment='产品类别：0:SPOT现货, 1:perpetual永续合约')
+    symbol: Mapped[str] = mapped_column(String(100), nullable=False, comment='交易对唯一标识')
+    interval: Mapped[str] = mapped_column(String(8), nullable=False, comment='kline 周期')
+    start_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='回填起始毫秒时间戳（含）')
+    end_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='回填结束毫秒时间戳（含）')
+    status: Mapped[int] = mapped_column(TINYINT, nullable=False, server_default=text("'0'"), comment='0=PENDING, 1=RUNNING, 2=DONE, 3=FAILED')
+    total_chunks: Mapped[int] = mapped_column(Integer, nullable=False, comment='分片总数')
+    done_chunks: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("'0'"), comment='已完成分片数')
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP'), comment='创建时间')
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), comment='最后更新时间')
+
+
+class KlineOpenBar(Base):
+    __tablename__ = 'kline_open_bar'
+    __table_args__ = (
+        Index('uk_open_bar', 'exchange_id', 'inst_type', 'symbol', 'interval', unique=True),
+        {'comment': 'REST 写入时尚未收盘的 kline，tail refresh 时重新拉取'}
+    )
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    exchange_id: Mapped[int] = mapped_column(SmallInteger, nullable=False, comment='交易所标识')
+    inst_type: Mapped[int] = mapped_column(TINYINT, nullable=False, comment='产品类别：0:SPOT现货, 1:perpetual永续合约')
+    symbol: Mapped[str] = mapped_column(String(100), nullable=False, comment='交易对唯一标识')
+    interval: Mapped[str] = mapped_column(String(8), nullable=False, comment='kline 周期')
+    open_ts: Mapped[Optional[int]] = mapped_column(BigInteger, comment='最早一根写入时未收盘 bar 的毫秒时间戳，NULL 表示已全部收盘')
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP'), comment='创建时间')
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), comment='最后更新时间')
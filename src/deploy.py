@@ -1,10 +1,19 @@
 from datetime import UTC, datetime
 import os
 
+from flows.backfill_klines import drain_kline_backfill, submit_kline_backfill, submit_kraken_history
+from flows.ingest_kline_archives import ingest_kline_archives
+from flows.stream_klines import stream_klines_1m
 from flows.sync_cex_inflow import sync_cex_inflow
 from flows.sync_funding_rate import sync_funding_rate
 from flows.sync_kalshi import sync_kalshi_flow
-from flows.sync_klines import sync_klines_1m
+from flows.sync_klines import (
+    refresh_open_klines_1m,
+    sync_klines_1d,
+    sync_klines_1h,
+    sync_klines_1m,
+    sync_klines_shard,
+)
 from flows.sync_long_short_ratio import (
     sync_long_short_ratio_1d,
     sync_long_short_ratio_1h,
@@ -13,7 +22,9 @@ from flows.sync_long_short_ratio import (
 from flows.sync_macro_indicators import sync_macro_indicators
 from flows.sync_onchain_tx import sync_onchain_large_transfer
 from flows.sync_symbols import sync_symbols
+from flows.verify_klines import verify_klines
 from prefect import deploy
+from prefect.client.schemas.objects import ConcurrencyLimitConfig, ConcurrencyLimitStrategy
 from prefect.client.schemas.schedules import CronSchedule, IntervalSchedule, RRuleSchedule
 from prefect.types.entrypoint import EntrypointType
 from system_utils.check_market_snapshot_integrity import check_market_snapshot_integrity
@@ -146,6 +157,16 @@ if __name__ == "__main__":
             entrypoint_type=EntrypointType.MODULE_PATH,
             concurrency_limit=1,
         ),
+        # 常驻 WebSocket 采集：每 5 分钟尝试拉起一次，已在运行时丢弃新 run
+        stream_klines_1m.to_deployment(
+            name=f"{ENV}-stream-klines-1m",
+            tags=[ENV],
+            description="WebSocket 实时采集交易所 Kline[1m]",
+            schedule=CronSchedule(cron="*/5 * * * *") if IS_PROD else None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=ConcurrencyLimitConfig(limit=1, collision_strategy=ConcurrencyLimitStrategy.CANCEL_NEW),
+        ),
+        # REST 全量扫描：补齐 WebSocket 断线缺口，并覆盖不支持 WebSocket 的交易所
         sync_klines_1m.to_deployment(
             name=f"{ENV}-sync-klines-1m",
             tags=[ENV],
@@ -154,6 +175,80 @@ if __name__ == "__main__":
             entrypoint_type=EntrypointType.MODULE_PATH,
             concurrency_limit=1,
         ),
+        # tail refresh：每个 symbol 一次小请求覆盖上次写入时未收盘的 bar
+        refresh_open_klines_1m.to_deployment(
+            name=f"{ENV}-refresh-open-klines-1m",
+            tags=[ENV],
+            description="重拉写入时未收盘的 Kline[1m]",
+            schedule=CronSchedule(cron="*/10 * * * *") if IS_PROD else None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=1,
+        ),
+        # kline 分片：由上面的 kline flow 传 shards > 1 时通过 run_deployment 拉起，不单独调度
+        sync_klines_shard.to_deployment(
+            name=f"{ENV}-sync-klines-shard",
+            tags=[ENV],
+            description="Kline 同步分片（一致性 hash 分配 symbol）",
+            schedule=None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+        ),
+        # 1h / 1d 由 1m rollup 生成，交易所 bar 只用于每日对账
+        sync_klines_1h.to_deployment(
+            name=f"{ENV}-reconcile-klines-1h",
+            tags=[ENV],
+            description="对账交易所 Kline[1h]",
+            schedule=CronSchedule(cron="20 0 * * *") if IS_PROD else None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=1,
+        ),
+        sync_klines_1d.to_deployment(
+            name=f"{ENV}-reconcile-klines-1d",
+            tags=[ENV],
+            description="对账交易所 Kline[1d]",
+            schedule=CronSchedule(cron="40 0 * * *") if IS_PROD else None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=1,
+        ),
+        # 历史回填：手动触发，参数指定归档来源 / 交易所 / 时间范围
+        ingest_kline_archives.to_deployment(
+            name=f"{ENV}-ingest-kline-archives",
+            tags=[ENV],
+            description="从交易所公开归档批量导入历史 Kline",
+            schedule=None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=1,
+        ),
+        # 定向回填：手动提交 job，drain 定时消费；允许多个 run 并行领取 chunk
+        submit_kline_backfill.to_deployment(
+            name=f"{ENV}-submit-kline-backfill",
+            tags=[ENV],
+            description="提交 Kline 定向回填任务",
+            schedule=None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+        ),
+        submit_kraken_history.to_deployment(
+            name=f"{ENV}-submit-kraken-history",
+            tags=[ENV],
+            description="提交 Kraken 成交聚合历史 Kline 回填任务",
+            schedule=None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+        ),
+        drain_kline_backfill.to_deployment(
+            name=f"{ENV}-drain-kline-backfill",
+            tags=[ENV],
+            description="消费 Kline 回填队列",
+            schedule=CronSchedule(cron="*/10 * * * *") if IS_PROD else None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=ConcurrencyLimitConfig(limit=4, collision_strategy=ConcurrencyLimitStrategy.CANCEL_NEW),
+        ),
+        verify_klines.to_deployment(
+            name=f"{ENV}-verify-klines",
+            tags=[ENV],
+            description="抽样校验已入库 Kline 是否被交易所修订",
+            schedule=CronSchedule(cron="30 3 * * *") if IS_PROD else None,
+            entrypoint_type=EntrypointType.MODULE_PATH,
+            concurrency_limit=1,
+        ),
         doris_partition_health_check.to_deployment(
             name=f"{ENV}-doris-partition-health-check",
             tags=[ENV],
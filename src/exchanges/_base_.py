@@ -1,21 +1,40 @@
 from abc import ABC, abstractmethod
 import asyncio
-from datetime import datetime, timedelta
 import time
 import traceback
-from typing import Literal
+from typing import ClassVar, Literal
 from urllib.parse import urlencode
 
 from aiohttp import ClientSession
 from constants import INTERVAL_TO_SECONDS
-from sqlalchemy import text
+from klines.batch import KlineBatch
+from klines.rollup import KlineRollup
+from klines.validate import quarantine_invalid
+from sqlalchemy import text, update
 
 from databases.doris import get_doris, get_stream_loader
-from databases.mysql import ExchangeSymbol, async_upsert, sync_engine
+from databases.doris.sink import get_kline_sink
+from databases.mysql import ExchangeSymbol, KlineOpenBar, async_engine, async_upsert, sync_engine
+from exchanges._spec_ import KlineEndpoint
 from utils.http_session import get_session
+from utils.timestamps import MS_PER_DAY, dt_to_ms
+
+# probe_first_kline 的搜索下界（2017-01-01 UTC），更早上市的 symbol 按下界返回
+PROBE_START_MS = 1483228800000
 
 
 class BaseClient(ABC):
+    # kline REST 接口描述，get_kline 据此请求 / 解析；特殊接口可以直接覆盖 get_kline
+    kline_endpoint: ClassVar[KlineEndpoint | None] = None
+    # kline 接口支持 [start, end] 窗口且对窗口长度没有限制时才能二分探测最早的 bar
+    kline_probe: ClassVar[bool] = True
+    kline_probe_interval: ClassVar[str] = "1d"
+    # (exchange_id, inst_type, symbol) → 探测到的最早 bar 开盘时间，进程内所有 client 共用
+    _first_kline_cache: ClassVar[dict[tuple[int, int, str], int | None]] = {}
+    # (exchange_name, inst_type, interval) → 实测单次请求最多返回的 bar 数，进程内探测一次
+    _page_sizes: ClassVar[dict[tuple[str, int, str], int]] = {}
+    page_size_max: ClassVar[int] = 5000  # 放大单页时的上限
+
     def __init__(self, _logger):
         self._exchange_id = None
         self.session: ClientSession | None = None
@@ -25,6 +44,7 @@ class BaseClient(ABC):
             self.logger = _logger
         self.doris_client = get_doris()
         self.doris_stream_loader = get_stream_loader()
+        self.kline_sink = get_kline_sink()
 
     @abstractmethod
     def base_url(self):
@@ -40,8 +60,8 @@ class BaseClient(ABC):
             return self._exchange_id
         with sync_engine.begin() as conn:
             result = conn.execute(text("SELECT id FROM exchange_info WHERE name = :name"), {"name": self.exchange_name})
-            row = result.scalar_one_or_none()
-            return row
+            self._exchange_id = result.scalar_one_or_none()
+            return self._exchange_id
 
     @abstractmethod
     def inst_type(self):
@@ -121,56 +141,11 @@ class BaseClient(ABC):
         )
         self.logger.info(f"{self.exchange_name}: Symbols updated")
 
-    async def _get_kline(
-        self,
-        url: str,
-        params: dict,
-        get_data,
-        format_item,
-        start_time_key: str,
-        limit: int,
-        symbol: str,
-        end_time_key: str | None = None,
-        time_unit: Literal["ms", "s"] = "ms",
-        interval: Literal["1m", "1h", "1d"] = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-        force_start: bool = False,
-        **kwargs,
-    ):
+    async def _scan_kline_gaps(self, symbol: str, interval: str, start_ms: int, end_ms: int, limit: int):
         """
-        Doris 版本的 Kline 缺口扫描 + 批量补齐
+        扫描 [start_ms, end_ms] 内 Doris 已有 kline 的缺口，返回合并后的缺口区间
         """
-        now_ms = int(time.time() * 1000)
-        end_ms = end_ms or now_ms
         interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
-        second = 1 if time_unit == "s" else 1000
-
-        # ----------------------------------------
-        # 1) 查询 Doris 中当前最大 timestamp
-        # ----------------------------------------
-        q = f"""
-        SELECT MAX(dt)
-        FROM kline_{interval}
-        WHERE exchange_id = {self.exchange_id}
-          AND inst_type = '{self.inst_type}'
-          AND symbol = '{symbol}'
-        """
-        r = await self.doris_client.query(q)
-        self.logger.info("max_ts_in_db: %s", r[0][0])
-        max_ts_in_db = int(r[0][0].timestamp()) * 1000 if r and r[0][0] else 0
-
-        # 初始 start_ms 确定
-        if start_ms is None:
-            if max_ts_in_db > 0:
-                start_ms = max_ts_in_db + interval_ms
-            else:
-                today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                start_ms = int((today - timedelta(days=180)).timestamp() * 1000)
-
-        if not force_start and max_ts_in_db > 0 and start_ms < max_ts_in_db:
-            start_ms = max_ts_in_db + interval_ms
 
         # --------------------------------------------------------------------
         # 2) Doris 扫描缺口（使用标准 SQL LAG 窗口函数）
@@ -242,7 +217,124 @@ class BaseClient(ABC):
             merged.append((cur_start, cur_end))
             return merged
 
-        missing_ranges = merge_missing_ranges(missing_ranges, interval_ms, limit)
+        return merge_missing_ranges(missing_ranges, interval_ms, limit)
+
+    async def _get_kline(
+        self,
+        url: str,
+        params: dict,
+        get_data,
+        fields: dict[str, int | str],
+        start_time_key: str,
+        limit: int,
+        symbol: str,
+        end_time_key: str | None = None,
+        time_unit: Literal["ms", "s"] = "ms",
+        exclusive_bounds: bool = False,
+        interval: Literal["1m", "1h", "1d"] = "1m",
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        sleep_ms: int = 100,
+        force_start: bool = False,
+        scan_gaps: bool = True,
+        raise_errors: bool = False,
+        onboard_ms: int | None = None,
+        probe: bool = False,
+        **kwargs,
+    ):
+        """
+        Doris 版本的 Kline 缺口扫描 + 批量补齐
+
+        get_data: 从响应中取出 kline 列表（list[list] / list[dict]）或列式 dict
+        fields: KlineBatch 列名 → 行内下标 / key（列式响应时为列的 key）
+        raise_errors: 请求失败时记录日志后继续抛出（回填 worker 据此保存进度并重试），默认只记录
+        onboard_ms: 上架时间，起点不早于它，新上架 symbol 不再逐页扫描上架前的空窗口
+        exclusive_bounds: 起止时间参数不含端点时为 True，请求的窗口各向外扩一个时间单位
+        probe: 探测模式（probe_first_kline 使用），[start_ms, end_ms] 只发一次 limit=1 的请求，
+            有数据时 yield 一个不经校验的 batch
+        """
+        if probe and not end_time_key:
+            raise ValueError(f"{self.exchange_name} kline endpoint has no end time parameter, cannot probe")
+        now_ms = int(time.time() * 1000)
+        end_ms = end_ms or now_ms
+        interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        second = 1 if time_unit == "s" else 1000
+
+        # ----------------------------------------
+        # 1) 查询 Doris 中当前最大 timestamp（强制起点时用不到，省掉这次查询）
+        # ----------------------------------------
+        max_ts_in_db = 0
+        if start_ms is None or not force_start:
+            q = f"""
+            SELECT MAX(dt)
+            FROM kline_{interval}
+            WHERE exchange_id = {self.exchange_id}
+              AND inst_type = '{self.inst_type}'
+              AND symbol = '{symbol}'
+            """
+            r = await self.doris_client.query(q)
+            self.logger.info("max_ts_in_db: %s", r[0][0])
+            # dt 按 UTC 写入（StreamLoad timezone 头），naive datetime 不能按本机时区解释
+            max_ts_in_db = dt_to_ms(r[0][0]) if r and r[0][0] else 0
+
+        # 初始 start_ms 确定
+        if start_ms is None:
+            if max_ts_in_db > 0:
+                start_ms = max_ts_in_db + interval_ms
+            else:
+                # 默认回看到 180 天前的 UTC 零点
+                start_ms = (now_ms // MS_PER_DAY - 180) * MS_PER_DAY
+
+        if not force_start and max_ts_in_db > 0 and start_ms < max_ts_in_db:
+            start_ms = max_ts_in_db + interval_ms
+
+        if onboard_ms and onboard_ms > 0:
+            start_ms = max(start_ms, int(onboard_ms) // interval_ms * interval_ms)
+        if start_ms > end_ms:
+            # 尚未上架
+            return
+
+        def set_page(n: int):
+            for key in ("limit", "size"):
+                if key in params:
+                    params[key] = n
+
+        async def fetch(start: int, end: int) -> KlineBatch:
+            params[start_time_key] = int(start // (1000 / second)) - exclusive_bounds
+            if end_time_key:
+                params[end_time_key] = int(end // (1000 / second)) + exclusive_bounds
+
+            # 请求交易所 API
+            data = get_data(await self.send_request("GET", url, params=params))
+            if isinstance(data, dict):
+                batch = KlineBatch.from_columns(
+                    {name: data[key] for name, key in fields.items()},
+                    self.exchange_id,
+                    self.inst_type,
+                    symbol,
+                    time_scale=1000 // second,
+                )
+            else:
+                batch = KlineBatch.from_rows(
+                    data, fields, self.exchange_id, self.inst_type, symbol, time_scale=1000 // second
+                )
+
+            # 对齐 timestamp（强制对齐 OHLC）
+            return batch.align(interval_ms)
+
+        if not probe and end_time_key:
+            # 按实测的单页上限分页：声明的 limit 偏大会被截断，偏小则多发请求
+            page_key = (self.exchange_name, self.inst_type.value, interval)
+            if page_key not in self._page_sizes:
+                self._page_sizes[page_key] = await self._discover_page_size(fetch, set_page, limit, interval_ms, symbol)
+            limit = self._page_sizes[page_key]
+            set_page(limit)
+
+        if scan_gaps:
+            missing_ranges = await self._scan_kline_gaps(symbol, interval, start_ms, end_ms, limit)
+        else:
+            # 对账模式：不扫描缺口，整段重新拉取覆盖
+            missing_ranges = [(start_ms, end_ms)]
 
         # --------------------------------------------------------------------
         # 4) 打印缺口
@@ -254,7 +346,9 @@ class BaseClient(ABC):
         # --------------------------------------------------------------------
         # 5) 逐 gap 批量补数据
         # --------------------------------------------------------------------
-        params[start_time_key] = int(start_ms // (1000 / second))
+        if probe:
+            # 只关心窗口内有没有 bar，一根就够
+            set_page(1)
 
         try:
             for start, end in missing_ranges:
@@ -262,29 +356,29 @@ class BaseClient(ABC):
 
                 current = start
                 while current <= end:
-                    batch_end = min(current + limit * interval_ms, end)
+                    # [current, batch_end] 两端都含，正好 limit 根；多一根时从末尾截断的交易所会丢掉最早那根
+                    batch_end = end if probe else min(current + (limit - 1) * interval_ms, end)
 
-                    params[start_time_key] = int(current // (1000 / second))
-                    if end_time_key:
-                        params[end_time_key] = int(batch_end // (1000 / second))
+                    batch = await fetch(current, batch_end)
 
-                    # 请求交易所 API
-                    data = await self.send_request("GET", url, params=params)
-                    batch = [format_item(d) for d in get_data(data)]
+                    if probe:
+                        if len(batch):
+                            yield batch
+                        return
 
-                    # 对齐 timestamp（强制对齐 OHLC）
-                    for d in batch:
-                        d["timestamp"] = (d["timestamp"] // interval_ms) * interval_ms
-
-                    if not batch:
+                    if not len(batch):
                         self.logger.debug(f"[{symbol}] No data in {current} → {batch_end}")
                         current = batch_end + interval_ms
                         await asyncio.sleep(sleep_ms / 1000)
                         continue
 
-                    yield batch
+                    next_ms = int(batch.timestamp.max()) + interval_ms
+                    # 校验对齐后的 batch，坏行进 quarantine 表
+                    batch = await quarantine_invalid(batch, interval, self.kline_sink)
+                    if len(batch):
+                        yield batch
 
-                    current = max(d["timestamp"] for d in batch) + interval_ms
+                    current = next_ms
                     await asyncio.sleep(sleep_ms / 1000)
 
         except Exception as e:
@@ -296,6 +390,76 @@ class BaseClient(ABC):
                     "traceback": traceback.format_exc(),
                 }
             )
+            if raise_errors:
+                raise
+
+    def page_size(self, interval: str) -> int | None:
+        """单次请求最多返回的 bar 数：探测过的用实测值，否则用 kline_endpoint 声明的 limit"""
+        declared = self.kline_endpoint.limit if self.kline_endpoint else None
+        return self._page_sizes.get((self.exchange_name, self.inst_type.value, interval), declared)
+
+    async def _discover_page_size(self, fetch, set_page, declared: int, interval_ms: int, symbol: str) -> int:
+        """
+        实测单次请求最多返回多少根 bar（同时覆盖 limit 上限和窗口长度限制）：
+        请求一天前结束、长度 n 根的窗口（limit 也设为 n），拿满 n 根就翻倍再试，
+        拿到连续但不足 n 根说明被截断，请求报错则停在上一个可用值。
+        数据有空洞或窗口内还没上架等无法判断的情况退回声明的 limit
+        """
+        end = (int(time.time() * 1000) - MS_PER_DAY) // interval_ms * interval_ms
+        best, n = None, declared
+        try:
+            while n <= self.page_size_max:
+                set_page(n)
+                start = end - (n - 1) * interval_ms
+                batch = await fetch(start, end)
+                rows = len(batch)
+                if rows == n:
+                    best, n = n, n * 2
+                    continue
+                if not rows or int(batch.timestamp.max() - batch.timestamp.min()) != (rows - 1) * interval_ms:
+                    break
+                first = int(batch.timestamp.min())
+                # 从窗口末尾往前截断时，要确认更早的部分确实有数据而不是还没上架
+                if first == start or len(await fetch(start, first - interval_ms)):
+                    best = max(best or 0, rows)
+                break
+        except Exception as e:
+            self.logger.warning(f"Page size probe stopped at {n}: {e}")
+        page = best or declared
+        if page != declared:
+            self.logger.info(f"{self.exchange_name} {self.inst_type.name}: page size {declared} → {page}")
+        return page
+
+    async def get_kline(
+        self,
+        symbol: str,
+        interval: str = "1m",
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        sleep_ms: int = 100,
+        **kwargs,
+    ):
+        spec = self.kline_endpoint
+        if spec is None:
+            raise NotImplementedError("get_kline")
+        async for results in self._get_kline(
+            url=spec.request_url(symbol),
+            params=spec.request_params(symbol, interval),
+            get_data=spec.data_getter(symbol),
+            fields=spec.fields,
+            start_time_key=spec.start_time_key,
+            end_time_key=spec.end_time_key,
+            limit=spec.limit,
+            time_unit=spec.time_unit,
+            exclusive_bounds=spec.exclusive_bounds,
+            symbol=symbol,
+            interval=interval,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            sleep_ms=sleep_ms,
+            **kwargs,
+        ):
+            yield results
 
     async def update_kline(
         self,
@@ -303,19 +467,171 @@ class BaseClient(ABC):
         interval: Literal["1m", "1h", "1d"] = "1m",
         start_ms: int | None = None,
         end_ms: int | None = None,
+        rollup: bool = False,
+        budget: float | None = None,
+        owner=None,
+        **kwargs,
     ):
+        """
+        拉取 kline 写入共享的 KlineSink；行在 sink flush 时才真正落 Doris，
+        调用方结束前需要 await self.kline_sink.flush(owner)
+
+        rollup=True 且 interval="1m" 时，同步把 1m 聚合成 1h / 1d 写入 kline_1h / kline_1d
+        budget: 拉取最多用时（秒），超时抛 TimeoutError；已拉到的部分照常 rollup、记录未收盘 bar
+        owner: 写入 sink 时的 owner（含 rollup 的行），flush(owner) 只等待、只抛出这些行的 load
+        """
         self.logger.info(f"Updating kline: {interval} [{self.exchange_name}] ({symbol})")
-        async for klines in self.get_kline(symbol, interval, start_ms, end_ms):
-            for kline in klines:
-                kline["dt"] = datetime.fromtimestamp(kline["timestamp"] / 1000).strftime("%Y-%m-%d %H:%M:%S")
-            await self.doris_stream_loader.send_rows(klines, "kline_" + interval)
+        kline_rollup = (
+            KlineRollup(doris_client=self.doris_client, sink=self.kline_sink, owner=owner) if rollup else None
+        )
+        interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        received, open_ts = False, None
+        # 请求发出前的时间：bar 在此之后才结束，说明写入时可能尚未收盘
+        requested_ms = int(time.time() * 1000)
+        try:
+            async with asyncio.timeout(budget):
+                async for klines in self.get_kline(symbol, interval, start_ms, end_ms, **kwargs):
+                    await self.kline_sink.put(klines, "kline_" + interval, owner=owner)
+                    if kline_rollup and interval == "1m":
+                        kline_rollup.add(klines)
+                    unclosed = klines.timestamp[klines.timestamp + interval_ms > requested_ms]
+                    received, open_ts = True, int(unclosed.min()) if len(unclosed) else None
+                    requested_ms = int(time.time() * 1000)
+        finally:
+            # 已 put 的 1m 无论如何都会落盘，水位随之前进，对应的 1h / 1d 必须同时写出
+            if kline_rollup:
+                await kline_rollup.flush()
+            if received:
+                await self._track_open_bar(symbol, interval, open_ts)
+
+    async def _track_open_bar(self, symbol: str, interval: str, open_ts: int | None):
+        """记录写入时尚未收盘的 bar，tail refresh 只重拉这些 bar"""
+        await async_upsert(
+            [
+                {
+                    "exchange_id": self.exchange_id,
+                    "inst_type": self.inst_type.value,
+                    "symbol": symbol,
+                    "interval": interval,
+                    "open_ts": open_ts,
+                }
+            ],
+            KlineOpenBar,
+            ["open_ts"],
+        )
+
+    async def refresh_open_kline(self, symbol: str, interval: Literal["1m", "1h", "1d"], open_ts: int, **kwargs):
+        """
+        tail refresh：从写入时未收盘的 bar 起重新拉到当前，不扫描缺口；
+        通常只有最后几根 bar，单次请求即可覆盖
+        """
+        await self.update_kline(symbol, interval, open_ts, force_start=True, scan_gaps=False, **kwargs)
+
+    async def _has_kline(self, symbol: str, start_ms: int, end_ms: int) -> bool:
+        async for _ in self.get_kline(
+            symbol,
+            self.kline_probe_interval,
+            start_ms,
+            end_ms,
+            sleep_ms=0,
+            force_start=True,
+            scan_gaps=False,
+            raise_errors=True,
+            probe=True,
+        ):
+            return True
+        return False
+
+    async def probe_first_kline(self, symbol: str, lo_ms: int = PROBE_START_MS, hi_ms: int | None = None) -> int | None:
+        """
+        二分查找 [lo_ms, hi_ms] 内最早一根 kline_probe_interval bar 的开盘时间，没有数据返回 None。
+        「[lo_ms, t] 内有 bar」对 t 单调，每步只发一次 limit=1 的窗口请求，1d 粒度下约 12 次请求；
+        请求失败直接抛出，避免把失败误判成空窗口而把上架时间推后
+        """
+        interval_ms = INTERVAL_TO_SECONDS[self.kline_probe_interval] * 1000
+        lo_ms = lo_ms // interval_ms * interval_ms
+        hi_ms = hi_ms or int(time.time() * 1000)
+        if not await self._has_kline(symbol, lo_ms, hi_ms):
+            return None
+        lo, hi = 0, (hi_ms - lo_ms) // interval_ms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if await self._has_kline(symbol, lo_ms, lo_ms + mid * interval_ms):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo_ms + lo * interval_ms
+
+    async def resolve_onboard_time(self, symbol: str, onboard_ms: int | None = None) -> int | None:
+        """
+        onboard_ms 为空时探测最早的 bar 作为上架时间：结果按 symbol 缓存在进程内，并回写
+        ExchangeSymbol.onboard_time（只写空值，update_all_symbols 不会覆盖），之后的同步直接读库
+        """
+        if onboard_ms or not self.kline_probe:
+            return onboard_ms
+        key = (self.exchange_id, self.inst_type.value, symbol)
+        if key in self._first_kline_cache:
+            return self._first_kline_cache[key]
+        try:
+            first_ms = await self.probe_first_kline(symbol)
+        except Exception as e:
+            # 失败不缓存，下一轮重新探测
+            self.logger.warning(f"Probe first kline for {symbol} failed: {e}")
+            return None
+        self._first_kline_cache[key] = first_ms
+        if first_ms is not None:
+            self.logger.info(f"{symbol}: first {self.kline_probe_interval} kline at {first_ms}")
+            async with async_engine.begin() as conn:
+                await conn.execute(
+                    update(ExchangeSymbol)
+                    .where(
+                        ExchangeSymbol.exchange_id == self.exchange_id,
+                        ExchangeSymbol.inst_type == self.inst_type.value,
+                        ExchangeSymbol.symbol == symbol,
+                        ExchangeSymbol.onboard_time.is_(None),
+                    )
+                    .values(onboard_time=first_ms)
+                )
+        return first_ms
+
+    # ------------------------------------------------------------------
+    # WebSocket kline 推送（klines.stream.KlineStreamCollector 使用）
+    # 子类设置 ws_url / ws_fields，并实现 ws_subscribe_messages / ws_parse_kline
+    # ------------------------------------------------------------------
+    ws_url: str | None = None
+    ws_max_symbols: int = 100  # 单连接订阅的 symbol 上限
+    ws_fields: ClassVar[dict[str, int | str]] = {}  # KlineBatch 列名 → 推送 item 内下标 / key
+    ws_time_unit: Literal["ms", "s"] = "ms"
+    ws_subscribe_delay: float = 0.2  # 订阅消息之间的间隔，避免触发限频
+    ws_ping_interval: float | None = None  # 应用层心跳间隔（秒），None 表示只依赖协议层 ping
+
+    def ws_subscribe_messages(self, symbols: list[str], interval: str) -> list[str | dict]:
+        """订阅 symbols 的 kline 频道需要发送的消息"""
+        raise NotImplementedError("ws_subscribe_messages not implemented")
+
+    def ws_parse_kline(self, message: dict) -> list[tuple[str, list | dict, bool | None]]:
+        """
+        解析一条推送，返回 [(symbol, item, closed)]；非 kline 消息返回 []
+        closed=None 表示交易所不推送收盘标记，由下一根 bar 的到来判断收盘
+        """
+        raise NotImplementedError("ws_parse_kline not implemented")
+
+    def ws_ping_message(self) -> str | dict | None:
+        return None
+
+    @property
+    def stream_load_constants(self) -> dict[str, int]:
+        """本 client 写入的行共有的列，通过 StreamLoad columns 头传常量"""
+        return {"exchange_id": self.exchange_id, "inst_type": self.inst_type.value}
 
     async def get_funding_rate(self, next_funding_times_by_symbol: dict[str, int], *args, **kwargs):
         raise NotImplementedError("get_funding_rate not implemented")
 
     async def update_funding_rate(self, *args, **kwargs):
         funding_rate_data = await self.get_funding_rate(next_funding_times_by_symbol={})
-        await self.doris_stream_loader.send_rows(funding_rate_data, "funding_settlement")
+        await self.doris_stream_loader.send_rows(
+            funding_rate_data, "funding_settlement", constants=self.stream_load_constants
+        )
 
     async def get_long_short_ratio(
         self, symbol: ExchangeSymbol, interval: Literal["5m", "1h", "1d"] = "5m", *args, **kwargs
@@ -324,12 +640,18 @@ class BaseClient(ABC):
 
     async def update_long_short_ratio_5m(self, symbol: ExchangeSymbol, *args, **kwargs):
         long_short_ratio_data = await self.get_long_short_ratio(symbol=symbol, interval="5m")
-        await self.doris_stream_loader.send_rows(long_short_ratio_data, "market_sentiment_5m")
+        await self.doris_stream_loader.send_rows(
+            long_short_ratio_data, "market_sentiment_5m", constants=self.stream_load_constants
+        )
 
     async def update_long_short_ratio_1h(self, symbol: ExchangeSymbol, *args, **kwargs):
         long_short_ratio_data = await self.get_long_short_ratio(symbol=symbol, interval="1h")
-        await self.doris_stream_loader.send_rows(long_short_ratio_data, "market_sentiment_1h")
+        await self.doris_stream_loader.send_rows(
+            long_short_ratio_data, "market_sentiment_1h", constants=self.stream_load_constants
+        )
 
     async def update_long_short_ratio_1d(self, symbol: ExchangeSymbol, *args, **kwargs):
         long_short_ratio_data = await self.get_long_short_ratio(symbol=symbol, interval="1d")
-        await self.doris_stream_loader.send_rows(long_short_ratio_data, "market_sentiment_1d")
+        await self.doris_stream_loader.send_rows(
+            long_short_ratio_data, "market_sentiment_1d", constants=self.stream_load_constants
+        )
@@ -0,0 +1,61 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Literal
+
+
+@dataclass(frozen=True)
+class KlineEndpoint:
+    """
+    kline REST 接口的声明式描述，BaseClient.get_kline 据此分页请求并按列解析响应
+
+    url: 可含 {symbol}（symbol 在路径里的接口）
+    fields: KlineBatch 列名 → 行内下标 / key（列式响应时为列的 key）
+    params: 固定参数；symbol / interval / limit 分别写入 symbol_key / interval_key / limit_key
+    interval_map: 内部 interval → 交易所 interval，None 表示原样传
+    data_path: kline 列表在响应中的路径，"{symbol}" 替换为请求的 symbol
+    empty_messages: 响应 message 含这些文本时按空页处理（如请求的时间早于交易所保留范围）
+    exclusive_bounds: 起止时间参数不含端点（如 OKX 的 before / after），请求时各向外扩一个时间单位
+    """
+
+    url: str
+    fields: dict[str, int | str]
+    start_time_key: str
+    end_time_key: str | None = None
+    params: dict[str, str] = field(default_factory=dict)
+    symbol_key: str | None = "symbol"
+    interval_key: str = "interval"
+    interval_map: dict[str, str] | None = None
+    limit_key: str | None = "limit"
+    limit: int = 1000
+    time_unit: Literal["ms", "s"] = "ms"
+    data_path: tuple[str, ...] = ()
+    empty_messages: tuple[str, ...] = ()
+    exclusive_bounds: bool = False
+
+    def request_url(self, symbol: str) -> str:
+        return self.url.format(symbol=symbol)
+
+    def request_params(self, symbol: str, interval: str) -> dict:
+        params = dict(self.params)
+        if self.symbol_key:
+            params[self.symbol_key] = symbol
+        params[self.interval_key] = self.interval_map.get(interval) if self.interval_map else interval
+        if self.limit_key:
+            params[self.limit_key] = self.limit
+        return params
+
+    def data_getter(self, symbol: str) -> Callable:
+        """按 data_path 取出 kline 列表；路径在这里展开一次，每页只做几次下标访问"""
+        path = tuple(symbol if key == "{symbol}" else key for key in self.data_path)
+        empty_messages = self.empty_messages
+
+        def get_data(data):
+            if empty_messages and isinstance(data, dict):
+                message = str(data.get("message", ""))
+                if any(m in message for m in empty_messages):
+                    return []
+            for key in path:
+                data = data[key]
+            return data
+
+        return get_data
@@ -1,12 +1,15 @@
-from datetime import UTC, datetime
+from datetime import datetime
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
 
 from databases.mysql import ExchangeSymbol
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
 from utils import align_to_5m
 
+from .stream import BinanceKlineStream
+
 
 def get_price_precision(filters) -> int:
     """根据字符串数值计算小数位数（如 0.01000000 → 2）"""
@@ -20,12 +23,13 @@ def get_quantity_precision(filters) -> int:
     return lot_size["stepSize"]
 
 
-class BinancePerpClient(BaseClient):
+class BinancePerpClient(BinanceKlineStream, BaseClient):
     """https://developers.binance.com/docs/derivatives/usds-margined-futures/general-info"""
 
     exchange_name = "binance"
     inst_type = InstType.PERP
     base_url = "https://fapi.binance.com"
+    ws_url = "wss://fstream.binance.com/ws"
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "TRADING": SymbolStatus.ACTIVE,
@@ -71,63 +75,39 @@ class BinancePerpClient(BaseClient):
                 )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://developers.binance.com/docs/binance-spot-api-docs/rest-api/market-data-endpoints#klinecandlestick-data
-
-        [
-            [
-                1499040000000,      // Open time
-                "0.01634790",       // Open
-                "0.80000000",       // High
-                "0.01575800",       // Low
-                "0.01577100",       // Close
-                "148976.11427815",  // Volume
-                1499644799999,      // Close time
-                "2434.19055334",    // Quote asset volume
-                308,                // Number of trades
-                "1756.87402397",    // Taker buy base asset volume
-                "28.46694368",      // Taker buy quote asset volume
-                "17928899.62484339" // Ignore.
-            ]
-        ]
-        """
-        limit = 1000
-        async for results in self._get_kline(
-            url="/fapi/v1/klines",
-            params={"symbol": symbol, "interval": interval, "limit": limit},
-            get_data=lambda d: d,
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": d[0],
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[5],
-                "quote_volume": d[7],
-                "count": d[8],
-            },
-            start_time_key="startTime",
-            end_time_key="endTime",
-            limit=limit,
-            time_unit="ms",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://developers.binance.com/docs/binance-spot-api-docs/rest-api/market-data-endpoints#klinecandlestick-data
+    #
+    # [
+    #     [
+    #         1499040000000,      // Open time
+    #         "0.01634790",       // Open
+    #         "0.80000000",       // High
+    #         "0.01575800",       // Low
+    #         "0.01577100",       // Close
+    #         "148976.11427815",  // Volume
+    #         1499644799999,      // Close time
+    #         "2434.19055334",    // Quote asset volume
+    #         308,                // Number of trades
+    #         "1756.87402397",    // Taker buy base asset volume
+    #         "28.46694368",      // Taker buy quote asset volume
+    #         "17928899.62484339" // Ignore.
+    #     ]
+    # ]
+    kline_endpoint = KlineEndpoint(
+        url="/fapi/v1/klines",
+        fields={
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "volume": 5,
+            "quote_volume": 7,
+            "count": 8,
+        },
+        start_time_key="startTime",
+        end_time_key="endTime",
+    )
 
     async def get_long_short_ratio(self, symbol: ExchangeSymbol, interval: str = "5m"):
         """
@@ -171,10 +151,7 @@ class BinancePerpClient(BaseClient):
         for ts in all_ts:
             row = {
                 "ts": ts,
-                "dt": datetime.fromtimestamp(ts / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
                 "symbol": symbol.symbol,
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type.value,
                 **pos_dict.get(ts, {}),
                 **acc_dict.get(ts, {}),
                 **retail_dict.get(ts, {}),
@@ -209,10 +186,7 @@ class BinancePerpClient(BaseClient):
             merged.append(
                 {
                     "ts": i["fundingTime"],
-                    "dt": datetime.fromtimestamp(i["fundingTime"] / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
-                    "exchange_id": self.exchange_id,
                     "symbol": i["symbol"],
-                    "inst_type": self.inst_type.value,
                     "funding_rate": i["fundingRate"],
                     "funding_interval": info["fundingIntervalHours"] * 60,
                     "adjusted_cap": info["adjustedFundingRateCap"],
@@ -0,0 +1,42 @@
+from typing import ClassVar
+
+
+class BinanceKlineStream:
+    """
+    https://developers.binance.com/docs/binance-spot-api-docs/web-socket-streams#klinecandlestick-streams
+
+    spot / USDⓈ-M 推送格式相同，只有 ws_url 不同
+    """
+
+    ws_max_symbols = 200
+    ws_subscribe_delay = 0.25  # 每条连接每秒最多 5 条入站消息
+    ws_fields: ClassVar[dict[str, int | str]] = {
+        "timestamp": "t",
+        "open": "o",
+        "high": "h",
+        "low": "l",
+        "close": "c",
+        "volume": "v",
+        "quote_volume": "q",
+        "count": "n",
+    }
+
+    def ws_subscribe_messages(self, symbols: list[str], interval: str) -> list[dict]:
+        streams = [f"{s.lower()}@kline_{interval}" for s in symbols]
+        return [
+            {"method": "SUBSCRIBE", "params": streams[i : i + 50], "id": i // 50 + 1}
+            for i in range(0, len(streams), 50)
+        ]
+
+    def ws_parse_kline(self, message: dict) -> list[tuple[str, dict, bool]]:
+        """
+        {
+            "e": "kline", "E": 1672515782136, "s": "BNBBTC",
+            "k": {"t": 1672515780000, "s": "BNBBTC", "i": "1m", "o": "0.0010", "c": "0.0020", "h": "0.0025",
+                  "l": "0.0015", "v": "1000", "n": 100, "x": false, "q": "1.0000", ...}
+        }
+        """
+        if message.get("e") != "kline":
+            return []
+        k = message["k"]
+        return [(k["s"], k, k["x"])]
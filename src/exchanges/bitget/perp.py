@@ -1,20 +1,24 @@
 import asyncio
-from datetime import UTC, datetime
+from datetime import datetime
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
 
 from databases.mysql import ExchangeSymbol
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
 from utils import align_to_5m
 
+from .stream import BitgetKlineStream
 
-class BitgetPerpClient(BaseClient):
+
+class BitgetPerpClient(BitgetKlineStream, BaseClient):
     """https://www.bitget.com/api-doc/contract/intro"""
 
     exchange_name = "bitget"
     inst_type = InstType.PERP
     base_url = "https://api.bitget.com"
+    ws_inst_type = "USDT-FUTURES"
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "normal": SymbolStatus.ACTIVE,
@@ -51,73 +55,42 @@ class BitgetPerpClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://www.bitget.com/api-doc/contract/market/Get-Candle-Data
-
-        {
-            "code": "00000",
-            "msg": "success",
-            "requestTime": 1695800278693,
-            "data": [
-                [
-                    "1656604800000",  // System timestamp, Unix millisecond timestamp
-                    "37834.5",        // Open price
-                    "37849.5",        // High price
-                    "37773.5",        // Low price
-                    "37773.5",        // Close price
-                    "428.3462",       // Volume
-                    "16198849.1079"   // Quote volume
-                ],
-            ]
-        }
-        """
-        interval_map = {
-            "1m": "1m",
-            "1h": "1H",
-            "1d": "1D",
-        }
-        limit = 1000
-        async for results in self._get_kline(
-            url="/api/v2/mix/market/candles",
-            params={
-                "symbol": symbol,
-                "productType": "usdt-futures",
-                "granularity": interval_map.get(interval),
-                "kLineType": "MARKET",
-                "limit": limit,
-            },
-            get_data=lambda d: d["data"],
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[5],
-                "quote_volume": d[6],
-            },
-            start_time_key="startTime",
-            end_time_key="endTime",
-            limit=limit,
-            time_unit="ms",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://www.bitget.com/api-doc/contract/market/Get-Candle-Data
+    #
+    # {
+    #     "code": "00000",
+    #     "msg": "success",
+    #     "requestTime": 1695800278693,
+    #     "data": [
+    #         [
+    #             "1656604800000",  // System timestamp, Unix millisecond timestamp
+    #             "37834.5",        // Open price
+    #             "37849.5",        // High price
+    #             "37773.5",        // Low price
+    #             "37773.5",        // Close price
+    #             "428.3462",       // Volume
+    #             "16198849.1079"   // Quote volume
+    #         ],
+    #     ]
+    # }
+    kline_endpoint = KlineEndpoint(
+        url="/api/v2/mix/market/candles",
+        fields={
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "volume": 5,
+            "quote_volume": 6,
+        },
+        start_time_key="startTime",
+        end_time_key="endTime",
+        params={"productType": "usdt-futures", "kLineType": "MARKET"},
+        interval_key="granularity",
+        interval_map={"1m": "1m", "1h": "1H", "1d": "1D"},
+        data_path=("data",),
+    )
 
     async def get_long_short_ratio(self, symbol: ExchangeSymbol, interval: str = "5m"):
         """
@@ -175,10 +148,7 @@ class BitgetPerpClient(BaseClient):
         for ts in all_ts:
             row = {
                 "ts": ts,
-                "dt": datetime.fromtimestamp(ts / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
                 "symbol": symbol.symbol,
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type.value,
                 **pos_dict.get(ts, {}),
                 **acc_dict.get(ts, {}),
                 **retail_dict.get(ts, {}),
@@ -211,10 +181,7 @@ class BitgetPerpClient(BaseClient):
                     merged.append(
                         {
                             "ts": int(j["fundingTime"]),
-                            "dt": datetime.fromtimestamp(int(j["fundingTime"]) / 1000, tz=UTC),
-                            "exchange_id": self.exchange_id,
                             "symbol": i["symbol"],
-                            "inst_type": self.inst_type.value,
                             "funding_rate": j["fundingRate"],
                             "funding_interval": float(i["fundingRateInterval"]) * 60,
                             "adjusted_cap": i["maxFundingRate"],
@@ -3,15 +3,19 @@ from typing import ClassVar
 from constants import InstType, SymbolStatus
 
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
 from utils import precision
 
+from .stream import BitgetKlineStream
 
-class BitgetSpotClient(BaseClient):
+
+class BitgetSpotClient(BitgetKlineStream, BaseClient):
     """https://www.bitget.com/api-doc/spot/intro"""
 
     exchange_name = "bitget"
     inst_type = InstType.SPOT
     base_url = "https://api.bitget.com"
+    ws_inst_type = "SPOT"
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "online": SymbolStatus.ACTIVE,
@@ -53,65 +57,39 @@ class BitgetSpotClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://www.bitget.com/api-doc/spot/market/Get-Candle-Data
-
-        {
-            "code": "00000",
-            "msg": "success",
-            "requestTime": 1695800278693,
-            "data": [
-                [
-                    "1656604800000",  // System timestamp, Unix millisecond timestamp
-                    "37834.5",        // Open price
-                    "37849.5",        // High price
-                    "37773.5",        // Low price
-                    "37773.5",        // Close price
-                    "428.3462",       // Volume
-                    "16198849.1079",  // USDT volume
-                    "16198849.1079"   // Quote volume
-                ],
-            ]
-        }
-        """
-        limit = 1000
-        interval_map = {
-            "1m": "1min",
-            "1h": "1h",
-            "1d": "1day",
-        }
-        async for results in self._get_kline(
-            url="/api/v2/spot/market/candles",
-            params={"symbol": symbol, "granularity": interval_map.get(interval), "limit": limit},
-            get_data=lambda d: d["data"],
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[5],
-                "quote_volume": d[7],
-            },
-            start_time_key="startTime",
-            end_time_key="endTime",
-            limit=limit,
-            time_unit="ms",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://www.bitget.com/api-doc/spot/market/Get-Candle-Data
+    #
+    # {
+    #     "code": "00000",
+    #     "msg": "success",
+    #     "requestTime": 1695800278693,
+    #     "data": [
+    #         [
+    #             "1656604800000",  // System timestamp, Unix millisecond timestamp
+    #             "37834.5",        // Open price
+    #             "37849.5",        // High price
+    #             "37773.5",        // Low price
+    #             "37773.5",        // Close price
+    #             "428.3462",       // Volume
+    #             "16198849.1079",  // USDT volume
+    #             "16198849.1079"   // Quote volume
+    #         ],
+    #     ]
+    # }
+    kline_endpoint = KlineEndpoint(
+        url="/api/v2/spot/market/candles",
+        fields={
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "volume": 5,
+            "quote_volume": 7,
+        },
+        start_time_key="startTime",
+        end_time_key="endTime",
+        interval_key="granularity",
+        interval_map={"1m": "1min", "1h": "1h", "1d": "1day"},
+        data_path=("data",),
+    )
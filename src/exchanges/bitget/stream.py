@@ -0,0 +1,53 @@
+from typing import ClassVar
+
+
+class BitgetKlineStream:
+    """
+    https://www.bitget.com/api-doc/spot/websocket/public/Candlesticks-Channel
+    https://www.bitget.com/api-doc/contract/websocket/public/Candlesticks-Channel
+
+    推送不带收盘标记，由下一根 bar 的到来判断收盘；子类设置 ws_inst_type
+    """
+
+    ws_url = "wss://ws.bitget.com/v2/ws/public"
+    ws_inst_type: str
+    ws_max_symbols = 200
+    ws_subscribe_delay = 0.1  # 每条连接每秒最多 10 条消息
+    ws_ping_interval = 30
+    ws_fields: ClassVar[dict[str, int | str]] = {
+        "timestamp": 0,
+        "open": 1,
+        "high": 2,
+        "low": 3,
+        "close": 4,
+        "volume": 5,
+        "quote_volume": 6,
+    }
+    ws_interval_map: ClassVar[dict[str, str]] = {
+        "1m": "1m",
+        "1h": "1H",
+        "1d": "1Dutc",
+    }
+
+    def ws_subscribe_messages(self, symbols: list[str], interval: str) -> list[dict]:
+        channel = "candle" + self.ws_interval_map[interval]
+        args = [{"instType": self.ws_inst_type, "channel": channel, "instId": s} for s in symbols]
+        return [{"op": "subscribe", "args": args[i : i + 50]} for i in range(0, len(args), 50)]
+
+    def ws_ping_message(self) -> str:
+        return "ping"
+
+    def ws_parse_kline(self, message: dict) -> list[tuple[str, list, None]]:
+        """
+        {
+            "action": "snapshot" | "update",
+            "arg": {"instType": "SPOT", "channel": "candle1m", "instId": "BTCUSDT"},
+            "data": [["1695685500000", "27000", "27000.5", "27000", "27000.5", "0.057", "1539.0155", "1539.0155"]]
+        }
+        snapshot 会带一段历史 bar，按时间升序处理
+        """
+        arg = message.get("arg")
+        if not arg or "data" not in message or not arg["channel"].startswith("candle"):
+            return []
+        rows = sorted(message["data"], key=lambda row: int(row[0]))
+        return [(arg["instId"], row, None) for row in rows]
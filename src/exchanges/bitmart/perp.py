@@ -2,9 +2,10 @@ from decimal import Decimal
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
-from utils import precision
 
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
+from utils import precision
 
 
 class BitmartPerpClient(BaseClient):
@@ -47,66 +48,38 @@ class BitmartPerpClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://developer-pro.bitmart.com/en/futuresv2/#get-k-line
-
-        {
-            "code":1000,
-            "trace":"886fb6ae-456b-4654-b4e0-1231",
-            "message": "Ok",
-            "data":[
-                {
-                    "timestamp": 1662518160,
-                    "open_price": "100",
-                    "close_price": "120",
-                    "high_price": "130",
-                    "low_price": "90",
-                    "volume": "941008"
-                },
-            ]
-        }
-        """
-        interval_map = {
-            "1m": "1",
-            "1h": "60",
-            "1d": "1440",
-        }
-        limit = 200
-        async for results in self._get_kline(
-            url="/contract/public/kline",
-            params={
-                "symbol": symbol,
-                "step": interval_map.get(interval),
-                "limit": limit,
-            },
-            get_data=lambda d: d["data"],
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": d["timestamp"] * 1000,
-                "open": d["open_price"],
-                "high": d["high_price"],
-                "low": d["low_price"],
-                "close": d["close_price"],
-                "volume": d["volume"],
-            },
-            start_time_key="start_time",
-            end_time_key="end_time",
-            limit=limit,
-            time_unit="s",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://developer-pro.bitmart.com/en/futuresv2/#get-k-line
+    #
+    # {
+    #     "code":1000,
+    #     "trace":"886fb6ae-456b-4654-b4e0-1231",
+    #     "message": "Ok",
+    #     "data":[
+    #         {
+    #             "timestamp": 1662518160,
+    #             "open_price": "100",
+    #             "close_price": "120",
+    #             "high_price": "130",
+    #             "low_price": "90",
+    #             "volume": "941008"
+    #         },
+    #     ]
+    # }
+    kline_endpoint = KlineEndpoint(
+        url="/contract/public/kline",
+        fields={
+            "timestamp": "timestamp",
+            "open": "open_price",
+            "high": "high_price",
+            "low": "low_price",
+            "close": "close_price",
+            "volume": "volume",
+        },
+        start_time_key="start_time",
+        end_time_key="end_time",
+        interval_key="step",
+        interval_map={"1m": "1", "1h": "60", "1d": "1440"},
+        limit=200,
+        time_unit="s",
+        data_path=("data",),
+    )
@@ -1,20 +1,24 @@
 import asyncio
-from datetime import UTC, datetime
+from datetime import datetime
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
 
 from databases.mysql.models import ExchangeSymbol
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
 from utils import align_to_5m, precision
 
+from .stream import BybitKlineStream
 
-class BybitPerpClient(BaseClient):
+
+class BybitPerpClient(BybitKlineStream, BaseClient):
     """https://bybit-exchange.github.io/docs/v5/intro"""
 
     exchange_name = "bybit"
     inst_type = InstType.PERP
     base_url = "https://api.bybit.com"
+    ws_url = "wss://stream.bybit.com/v5/public/linear"
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "Trading": SymbolStatus.ACTIVE,
@@ -47,77 +51,46 @@ class BybitPerpClient(BaseClient):
                 )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://bybit-exchange.github.io/docs/v5/market/kline
-
-        {
-            "retCode": 0,
-            "retMsg": "OK",
-            "result": {
-                "symbol": "BTCUSD",
-                "category": "inverse",
-                "list": [
-                    [
-                        "1670608800000",  // startTime
-                        "17071", // open
-                        "17073", // high
-                        "17027", // low
-                        "17055.5", // close
-                        "268611", // volume
-                        "15.74462667" // Turnover
-                    ],
-                ]
-            },
-            "retExtInfo": {},
-            "time": 1672025956592
-        }
-        """
-        interval_map = {
-            "1m": "1",
-            "1h": "60",
-            "1d": "D",
-        }
-        limit = 1000
-        async for results in self._get_kline(
-            url="/v5/market/kline",
-            params={
-                "category": "linear",
-                "symbol": symbol,
-                "interval": interval_map.get(interval),
-                "limit": limit,
-            },
-            get_data=lambda d: d["result"]["list"],
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[5],
-                "quote_volume": d[6],
-            },
-            start_time_key="start",
-            end_time_key="end",
-            limit=limit,
-            time_unit="ms",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://bybit-exchange.github.io/docs/v5/market/kline
+    #
+    # {
+    #     "retCode": 0,
+    #     "retMsg": "OK",
+    #     "result": {
+    #         "symbol": "BTCUSD",
+    #         "category": "inverse",
+    #         "list": [
+    #             [
+    #                 "1670608800000",  // startTime
+    #                 "17071", // open
+    #                 "17073", // high
+    #                 "17027", // low
+    #                 "17055.5", // close
+    #                 "268611", // volume
+    #                 "15.74462667" // Turnover
+    #             ],
+    #         ]
+    #     },
+    #     "retExtInfo": {},
+    #     "time": 1672025956592
+    # }
+    kline_endpoint = KlineEndpoint(
+        url="/v5/market/kline",
+        fields={
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "volume": 5,
+            "quote_volume": 6,
+        },
+        start_time_key="start",
+        end_time_key="end",
+        params={"category": "linear"},
+        interval_map={"1m": "1", "1h": "60", "1d": "D"},
+        data_path=("result", "list"),
+    )
 
     async def get_long_short_ratio(self, symbol: ExchangeSymbol, interval: str = "5m"):
         """
@@ -174,10 +147,7 @@ class BybitPerpClient(BaseClient):
         for ts in all_ts:
             row = {
                 "ts": ts,
-                "dt": datetime.fromtimestamp(ts / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
                 "symbol": symbol.symbol,
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type.value,
                 **pos_dict.get(ts, {}),
                 **retail_dict.get(ts, {}),
                 "updated_at": datetime.now(),
@@ -218,10 +188,7 @@ class BybitPerpClient(BaseClient):
                 merged.append(
                     {
                         "ts": funding_time,
-                        "dt": datetime.fromtimestamp(funding_time / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
-                        "exchange_id": self.exchange_id,
                         "symbol": symbol,
-                        "inst_type": 1,  # 永续
                         "funding_rate": funding_rate,
                         "funding_interval": i["fundingInterval"],
                         "adjusted_cap": i["upperFundingRate"],
@@ -0,0 +1,49 @@
+from typing import ClassVar
+
+
+class BybitKlineStream:
+    """
+    https://bybit-exchange.github.io/docs/v5/websocket/public/kline
+
+    spot / linear 推送格式相同，只有 ws_url 不同
+    """
+
+    ws_max_symbols = 100
+    ws_ping_interval = 20
+    ws_fields: ClassVar[dict[str, int | str]] = {
+        "timestamp": "start",
+        "open": "open",
+        "high": "high",
+        "low": "low",
+        "close": "close",
+        "volume": "volume",
+        "quote_volume": "turnover",
+    }
+    ws_interval_map: ClassVar[dict[str, str]] = {
+        "1m": "1",
+        "1h": "60",
+        "1d": "D",
+    }
+
+    def ws_subscribe_messages(self, symbols: list[str], interval: str) -> list[dict]:
+        topics = [f"kline.{self.ws_interval_map[interval]}.{s}" for s in symbols]
+        # spot 单条订阅最多 10 个 topic
+        return [{"op": "subscribe", "args": topics[i : i + 10]} for i in range(0, len(topics), 10)]
+
+    def ws_ping_message(self) -> dict:
+        return {"op": "ping"}
+
+    def ws_parse_kline(self, message: dict) -> list[tuple[str, dict, bool]]:
+        """
+        {
+            "topic": "kline.1.BTCUSDT", "type": "snapshot", "ts": 1672324988882,
+            "data": [{"start": 1672324800000, "end": 1672325099999, "interval": "1", "open": "16649.5",
+                      "close": "16677", "high": "16677", "low": "16608", "volume": "2.081",
+                      "turnover": "34666.4005", "confirm": false, "timestamp": 1672324988882}]
+        }
+        """
+        topic = message.get("topic", "")
+        if not topic.startswith("kline."):
+            return []
+        symbol = topic.rsplit(".", 1)[1]
+        return [(symbol, row, row["confirm"]) for row in message["data"]]
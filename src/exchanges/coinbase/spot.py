@@ -1,9 +1,10 @@
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
-from utils import precision
 
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
+from utils import precision
 
 
 class CoinbaseSpotClient(BaseClient):
@@ -12,6 +13,8 @@ class CoinbaseSpotClient(BaseClient):
     exchange_name = "coinbase"
     inst_type = InstType.SPOT
     base_url = "https://api.exchange.coinbase.com"
+    # 单次请求最多 300 根 bar，窗口过长直接报错
+    kline_probe = False
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "online": SymbolStatus.ACTIVE,
@@ -47,59 +50,34 @@ class CoinbaseSpotClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://docs.cdp.coinbase.com/api-reference/exchange-api/rest-api/products/get-product-candles
-
-        [
-            [
-                1763446800, // time
-                0.03344,  // low
-                0.03344,  // high
-                0.03344,  // open
-                0.03344,  // close
-                0.08291914,  // volume
-            ]
-        ]
-        """
-        interval_map = {
-            "1m": "60",
-            "1h": "3600",
-            "1d": "86400",
-        }
-        limit = 300
-        async for results in self._get_kline(
-            url=f"/products/{symbol}/candles",
-            params={
-                "granularity": interval_map.get(interval),
-            },
-            get_data=lambda d: d,
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]),
-                "open": d[3],
-                "high": d[2],
-                "low": d[1],
-                "close": d[4],
-                "volume": d[5],
-            },
-            start_time_key="start",
-            end_time_key="end",
-            limit=limit,
-            time_unit="s",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://docs.cdp.coinbase.com/api-reference/exchange-api/rest-api/products/get-product-candles
+    #
+    # [
+    #     [
+    #         1763446800, // time
+    #         0.03344,  // low
+    #         0.03344,  // high
+    #         0.03344,  // open
+    #         0.03344,  // close
+    #         0.08291914,  // volume
+    #     ]
+    # ]
+    kline_endpoint = KlineEndpoint(
+        url="/products/{symbol}/candles",
+        fields={
+            "timestamp": 0,
+            "open": 3,
+            "high": 2,
+            "low": 1,
+            "close": 4,
+            "volume": 5,
+        },
+        start_time_key="start",
+        end_time_key="end",
+        symbol_key=None,
+        interval_key="granularity",
+        interval_map={"1m": "60", "1h": "3600", "1d": "86400"},
+        limit_key=None,
+        limit=300,
+        time_unit="s",
+    )
@@ -1,9 +1,10 @@
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
-from utils import precision
 
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
+from utils import precision
 
 
 class GatePerpClient(BaseClient):
@@ -12,6 +13,8 @@ class GatePerpClient(BaseClient):
     exchange_name = "gate"
     inst_type = InstType.PERP
     base_url = "https://api.gateio.ws/api/v4"
+    # kline 请求不带 to；上架时间由 symbol 接口提供
+    kline_probe = False
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "prelaunch": SymbolStatus.PENDING,
@@ -49,57 +52,31 @@ class GatePerpClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://www.gate.com/docs/developers/apiv4/zh_CN/#%E5%90%88%E7%BA%A6%E5%B8%82%E5%9C%BA-k-%E7%BA%BF%E5%9B%BE
-        [
-            {
-                "t": 1539852480, # 秒(s)精度的 Unix 时间戳
-                "v": 97151, # 成交量
-                "c": "1.032", # 收盘价
-                "h": "1.032", # 最高价
-                "l": "1.032", # 最低价
-                "o": "1.032", # 开盘价
-                "sum": "3580" # 计价货币交易额
-            }
-        ]
-        """
-        limit = 1000
-        async for results in self._get_kline(
-            url="/futures/usdt/candlesticks",
-            params={
-                "contract": symbol,
-                "interval": interval,
-                "limit": limit,
-            },
-            get_data=lambda d: d,
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d["t"]) * 1000,
-                "open": d["o"],
-                "high": d["h"],
-                "low": d["l"],
-                "close": d["c"],
-                "volume": d["v"],
-                "quote_volume": d["sum"],
-            },
-            start_time_key="from",
-            # end_time_key="to",
-            limit=limit,
-            time_unit="s",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://www.gate.com/docs/developers/apiv4/zh_CN/#%E5%90%88%E7%BA%A6%E5%B8%82%E5%9C%BA-k-%E7%BA%BF%E5%9B%BE
+    # [
+    #     {
+    #         "t": 1539852480, # 秒(s)精度的 Unix 时间戳
+    #         "v": 97151, # 成交量
+    #         "c": "1.032", # 收盘价
+    #         "h": "1.032", # 最高价
+    #         "l": "1.032", # 最低价
+    #         "o": "1.032", # 开盘价
+    #         "sum": "3580" # 计价货币交易额
+    #     }
+    # ]
+    kline_endpoint = KlineEndpoint(
+        url="/futures/usdt/candlesticks",
+        fields={
+            "timestamp": "t",
+            "open": "o",
+            "high": "h",
+            "low": "l",
+            "close": "c",
+            "volume": "v",
+            "quote_volume": "sum",
+        },
+        start_time_key="from",
+        # end_time_key="to",
+        symbol_key="contract",
+        time_unit="s",
+    )
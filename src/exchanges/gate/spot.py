@@ -1,17 +1,22 @@
 from typing import ClassVar
 
 from constants import InstType, SymbolStatus
-from utils import to_decimal_str
 
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
+from utils import to_decimal_str
 
+from .stream import GateSpotKlineStream
 
-class GateSpotClient(BaseClient):
+
+class GateSpotClient(GateSpotKlineStream, BaseClient):
     """https://www.gate.com/docs/developers/apiv4/zh_CN/"""
 
     exchange_name = "gate"
     inst_type = InstType.SPOT
     base_url = "https://api.gateio.ws/api/v4"
+    # kline 请求不带 to；上架时间由 symbol 接口提供
+    kline_probe = False
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "untradable": SymbolStatus.CLOSED,
@@ -48,62 +53,31 @@ class GateSpotClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://www.gate.com/docs/developers/apiv4/zh_CN/#%E5%B8%82%E5%9C%BA-k-%E7%BA%BF%E5%9B%BE
-        [
-            [
-                "1539852480", # 秒(s)精度的 Unix 时间戳
-                "971519.677", # 计价货币交易额
-                "0.0021724", # 收盘价
-                "0.0021922", # 最高价
-                "0.0021724", # 最低价
-                "0.0021737", # 开盘价
-                "true", # 窗口是否关闭
-            ]
-        ]
-        """
-        limit = 1000
-
-        def get_data(data):
-            if "message" not in data or "Candlestick too long ago" not in data["message"]:
-                return data
-            return []
-
-        async for results in self._get_kline(
-            url="/spot/candlesticks",
-            params={
-                "currency_pair": symbol,
-                "interval": interval,
-                "limit": limit,
-            },
-            get_data=get_data,
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]) * 1000,
-                "open": d[5],
-                "high": d[3],
-                "low": d[4],
-                "close": d[2],
-                "quote_volume": d[1],
-            },
-            start_time_key="from",
-            # end_time_key="to",
-            limit=limit,
-            time_unit="s",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://www.gate.com/docs/developers/apiv4/zh_CN/#%E5%B8%82%E5%9C%BA-k-%E7%BA%BF%E5%9B%BE
+    # [
+    #     [
+    #         "1539852480", # 秒(s)精度的 Unix 时间戳
+    #         "971519.677", # 计价货币交易额
+    #         "0.0021724", # 收盘价
+    #         "0.0021922", # 最高价
+    #         "0.0021724", # 最低价
+    #         "0.0021737", # 开盘价
+    #         "true", # 窗口是否关闭
+    #     ]
+    # ]
+    kline_endpoint = KlineEndpoint(
+        url="/spot/candlesticks",
+        fields={
+            "timestamp": 0,
+            "open": 5,
+            "high": 3,
+            "low": 4,
+            "close": 2,
+            "quote_volume": 1,
+        },
+        start_time_key="from",
+        # end_time_key="to",
+        symbol_key="currency_pair",
+        time_unit="s",
+        empty_messages=("Candlestick too long ago",),
+    )
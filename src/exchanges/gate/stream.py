@@ -0,0 +1,47 @@
+import time
+from typing import ClassVar
+
+
+class GateSpotKlineStream:
+    """
+    https://www.gate.io/docs/developers/apiv4/ws/en/#candlesticks-channel
+
+    每条订阅消息只能带一个交易对；推送的 "w" 为 bar 是否已收盘
+    """
+
+    ws_url = "wss://api.gateio.ws/ws/v4/"
+    ws_max_symbols = 100
+    ws_subscribe_delay = 0.05
+    ws_ping_interval = 20
+    ws_time_unit = "s"
+    ws_fields: ClassVar[dict[str, int | str]] = {
+        "timestamp": "t",
+        "open": "o",
+        "high": "h",
+        "low": "l",
+        "close": "c",
+        "quote_volume": "v",
+    }
+
+    def ws_subscribe_messages(self, symbols: list[str], interval: str) -> list[dict]:
+        return [
+            {"time": int(time.time()), "channel": "spot.candlesticks", "event": "subscribe", "payload": [interval, s]}
+            for s in symbols
+        ]
+
+    def ws_ping_message(self) -> dict:
+        return {"time": int(time.time()), "channel": "spot.ping"}
+
+    def ws_parse_kline(self, message: dict) -> list[tuple[str, dict, bool | None]]:
+        """
+        {
+            "time": 1606292600, "channel": "spot.candlesticks", "event": "update",
+            "result": {"t": "1606292580", "v": "2362.32", "c": "19128.1", "h": "19128.1", "l": "19128.1",
+                       "o": "19128.1", "n": "1m_BTC_USDT", "a": "3.8283", "w": true}
+        }
+        """
+        if message.get("channel") != "spot.candlesticks" or message.get("event") != "update":
+            return []
+        result = message["result"]
+        symbol = result["n"].split("_", 1)[1]
+        return [(symbol, result, result.get("w"))]
@@ -1,9 +1,15 @@
-from decimal import Decimal
+import asyncio
+import time
+import traceback
 from typing import ClassVar
 
-from constants import InstType, SymbolStatus
+from constants import INTERVAL_TO_SECONDS, InstType, SymbolStatus
+from klines.trades import TradeKlineAggregator
+from klines.validate import quarantine_invalid
+import numpy as np
 
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
 
 KRAKEN_NAME_MAP = {
     "XXBT": "BTC",
@@ -32,6 +38,47 @@ class KrakenSpotClient(BaseClient):
     exchange_name = "kraken"
     inst_type = InstType.SPOT
     base_url = "https://api.kraken.com/0"
+    # OHLC 只有 since，且只返回最近 720 根
+    kline_probe = False
+
+    # https://docs.kraken.com/api/docs/rest-api/get-ohlc-data
+    #
+    # {
+    #     "error": [],
+    #     "result": {
+    #         "XBTUSDT": [
+    #             [
+    #                 1763404440, // time
+    #                 "92536.5",  // open
+    #                 "92555.8",  // high
+    #                 "92536.1",  // low
+    #                 "92536.1",  // close
+    #                 "92539.7",  // vwap
+    #                 "0.00889648",  // volume
+    #                 5  // count
+    #             ],
+    #         ]
+    #     }
+    # }
+    kline_endpoint = KlineEndpoint(
+        url="/public/OHLC",
+        fields={
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+            "volume": 6,
+            "quote_volume": 5,  # vwap，get_kline 里乘以 volume
+        },
+        start_time_key="since",
+        symbol_key="pair",
+        interval_map={"1m": "1", "1h": "60", "1d": "1440"},
+        limit_key=None,
+        limit=720,
+        time_unit="s",
+        data_path=("result", "{symbol}"),
+    )
 
     status_map: ClassVar[dict[str, SymbolStatus]] = {
         "online": SymbolStatus.ACTIVE,
@@ -70,6 +117,93 @@ class KrakenSpotClient(BaseClient):
             )
         return rows
 
+    def ohlc_floor(self, interval: str) -> int:
+        """/public/OHLC 能取到的最早 bar（留几根余量），更早的 bar 只能由成交聚合"""
+        interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        return (int(time.time() * 1000) // interval_ms - (self.kline_endpoint.limit - 10)) * interval_ms
+
+    async def iter_trades(self, symbol: str, start_ms: int, end_ms: int, sleep_ms: int = 1000, max_retries: int = 5):
+        """
+        https://docs.kraken.com/api/docs/rest-api/get-recent-trades
+
+        按 since 游标分页取 [start_ms, end_ms] 的成交，每页 yield (timestamp_ms, price, volume) 三个数组
+        {
+            "error": [],
+            "result": {
+                "XXBTZUSD": [
+                    ["30243.40000", "0.34507674", 1688669597.8277369, "b", "m", "", 61044952],
+                ],
+                "last": "1688671969993215696"  // 下一页的 since（纳秒）
+            }
+        }
+        """
+        since = str(start_ms // 1000)
+        retries = 0
+        while True:
+            data = await self.send_request(
+                "GET", "/public/Trades", params={"pair": symbol, "since": since, "count": 1000}
+            )
+            if data.get("error"):
+                # 限频时 HTTP 仍是 200，错误放在 error 里
+                if retries < max_retries and any("Too many requests" in e or "Rate limit" in e for e in data["error"]):
+                    retries += 1
+                    await asyncio.sleep(sleep_ms / 1000 * 2**retries)
+                    continue
+                raise RuntimeError(f"Kraken trades {symbol} since={since}: {data['error']}")
+            retries = 0
+
+            result = data["result"]
+            cursor = result.pop("last")
+            trades = next(iter(result.values()), [])
+            if not trades:
+                return
+            rows = np.array(trades, dtype=object)
+            ts = (rows[:, 2].astype(np.float64) * 1000).astype(np.int64)
+            keep = ts <= end_ms
+            if keep.any():
+                yield ts[keep], rows[keep, 0].astype(np.float64), rows[keep, 1].astype(np.float64)
+            if not keep.all() or cursor == since:
+                return
+            since = cursor
+            await asyncio.sleep(sleep_ms / 1000)
+
+    async def get_kline_from_trades(
+        self,
+        symbol: str,
+        interval: str = "1m",
+        start_ms: int = 0,
+        end_ms: int | None = None,
+        sleep_ms: int = 1000,
+        onboard_ms: int | None = None,
+        raise_errors: bool = False,
+        **kwargs,
+    ):
+        """把 [start_ms, end_ms] 的成交聚合成 kline，只输出完整落在区间内的 bar"""
+        interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        end_ms = end_ms or int(time.time() * 1000)
+        start_ms = max(start_ms, onboard_ms or 0) // interval_ms * interval_ms
+        if start_ms > end_ms:
+            return
+        self.logger.info(f"📈 {symbol}: 由成交聚合 {interval} {start_ms} → {end_ms}")
+
+        aggregator = TradeKlineAggregator(self.exchange_id, self.inst_type, symbol, interval)
+        try:
+            async for ts, price, qty in self.iter_trades(symbol, start_ms, end_ms, sleep_ms=sleep_ms):
+                batch = aggregator.add(ts, price, qty)
+                if batch is not None:
+                    batch = await quarantine_invalid(batch, interval, self.kline_sink)
+                    if len(batch):
+                        yield batch
+            batch = aggregator.finish(end_ms)
+            if batch is not None:
+                batch = await quarantine_invalid(batch, interval, self.kline_sink)
+                if len(batch):
+                    yield batch
+        except Exception as e:
+            self.logger.error({"symbol": symbol, "start_ms": start_ms, "error": e, "traceback": traceback.format_exc()})
+            if raise_errors:
+                raise
+
     async def get_kline(
         self,
         symbol: str,
@@ -77,61 +211,22 @@ class KrakenSpotClient(BaseClient):
         start_ms: int | None = None,
         end_ms: int | None = None,
         sleep_ms: int = 100,
+        **kwargs,
     ):
         """
-        https://docs.kraken.com/api/docs/rest-api/get-ohlc-data
-
-        {
-            "error": [],
-            "result": {
-                "XBTUSDT": [
-                    [
-                        1763404440, // time
-                        "92536.5",  // open
-                        "92555.8",  // high
-                        "92536.1",  // low
-                        "92536.1",  // close
-                        "92539.7",  // vwap
-                        "0.00889648",  // volume
-                        5  // count
-                    ],
-                ]
-            }
-        }
+        OHLC 只能取到最近 720 根：强制起点（回填 / 对账）早于这个窗口时，窗口之前的部分由成交聚合；
+        常规同步只在窗口内扫描缺口，更早的缺口交给 kraken 历史回填，避免每轮重复扫描
         """
-        interval_map = {
-            "1m": "1",
-            "1h": "60",
-            "1d": "1440",
-        }
-        limit = 720
-        async for results in self._get_kline(
-            url="/public/OHLC",
-            params={
-                "pair": symbol,
-                "interval": interval_map.get(interval),
-            },
-            get_data=lambda d: d["result"][symbol],
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[6],
-                "quote_volume": float(Decimal(d[6]) * Decimal(d[5])),
-            },
-            start_time_key="since",
-            end_time_key="",
-            limit=limit,
-            time_unit="s",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
+        floor = self.ohlc_floor(interval)
+        if start_ms is not None and kwargs.get("force_start") and start_ms < floor:
+            trades_end = floor - 1 if end_ms is None else min(end_ms, floor - 1)
+            async for results in self.get_kline_from_trades(symbol, interval, start_ms, trades_end, **kwargs):
+                yield results
+            if end_ms is not None and end_ms < floor:
+                return
+            start_ms = floor
+        kwargs["onboard_ms"] = max(kwargs.get("onboard_ms") or 0, floor)
+
+        async for results in super().get_kline(symbol, interval, start_ms, end_ms, sleep_ms, **kwargs):
+            results.quote_volume *= results.volume
             yield results
@@ -1,4 +1,4 @@
-from datetime import UTC, datetime
+from datetime import datetime
 from decimal import Decimal
 from typing import ClassVar
 
@@ -6,10 +6,13 @@ from constants import InstType, SymbolStatus
 
 from databases.mysql.models import ExchangeSymbol
 from exchanges._base_ import BaseClient
+from exchanges._spec_ import KlineEndpoint
 from utils import align_to_5m, precision
 
+from .stream import OkxKlineStream
 
-class OkxPerpClient(BaseClient):
+
+class OkxPerpClient(OkxKlineStream, BaseClient):
     """https://www.okx.com/docs-v5/en/#public-data"""
 
     exchange_name = "okx"
@@ -52,66 +55,39 @@ class OkxPerpClient(BaseClient):
             )
         return rows
 
-    async def get_kline(
-        self,
-        symbol: str,
-        interval: str = "1m",
-        start_ms: int | None = None,
-        end_ms: int | None = None,
-        sleep_ms: int = 100,
-    ):
-        """
-        https://www.okx.com/docs-v5/en/#public-data-rest-api-get-mark-price-candlesticks-history
-        {
-            "code":"0",
-            "msg":"",
-            "data":[
-                [
-                    "1597026383085",  // open time
-                    "3.721",  // open
-                    "3.743",  // high
-                    "3.677",  // low
-                    "3.708",  // close
-                    "1"  // confirm
-                ]
-            ]
-        }
-
-        """
-        interval_map = {
-            "1m": "1m",
-            "1h": "1H",
-        }
-        limit = 1000
-        async for results in self._get_kline(
-            url="/v5/market/history-mark-price-candles",
-            params={
-                "instId": symbol,
-                "bar": interval_map.get(interval),
-                "limit": limit,
-            },
-            get_data=lambda d: d["data"],
-            format_item=lambda d: {
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type,
-                "symbol": symbol,
-                "timestamp": int(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-            },
-            start_time_key="after",
-            end_time_key="before",
-            limit=limit,
-            time_unit="ms",
-            symbol=symbol,
-            interval=interval,
-            start_ms=start_ms,
-            end_ms=end_ms,
-            sleep_ms=sleep_ms,
-        ):
-            yield results
+    # https://www.okx.com/docs-v5/en/#public-data-rest-api-get-mark-price-candlesticks-history
+    # {
+    #     "code":"0",
+    #     "msg":"",
+    #     "data":[
+    #         [
+    #             "1597026383085",  // open time
+    #             "3.721",  // open
+    #             "3.743",  // high
+    #             "3.677",  // low
+    #             "3.708",  // close
+    #             "1"  // confirm
+    #         ]
+    #     ]
+    # }
+    kline_endpoint = KlineEndpoint(
+        url="/v5/market/history-mark-price-candles",
+        fields={
+            "timestamp": 0,
+            "open": 1,
+            "high": 2,
+            "low": 3,
+            "close": 4,
+        },
+        # OKX 的 after / before 是分页游标：after 返回更早的 bar（上界），before 返回更新的 bar（下界），均不含端点
+        start_time_key="before",
+        end_time_key="after",
+        exclusive_bounds=True,
+        symbol_key="instId",
+        interval_key="bar",
+        interval_map={"1m": "1m", "1h": "1H"},
+        data_path=("data",),
+    )
 
     @staticmethod
     def _split_okx_ratio_decimal(ratio_str: str):
@@ -176,10 +152,7 @@ class OkxPerpClient(BaseClient):
         for ts in all_ts:
             row = {
                 "ts": ts,
-                "dt": datetime.fromtimestamp(ts / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
                 "symbol": symbol.symbol,
-                "exchange_id": self.exchange_id,
-                "inst_type": self.inst_type.value,
                 **pos_dict.get(ts, {}),
                 **acc_dict.get(ts, {}),
                 **retail_dict.get(ts, {}),
@@ -218,10 +191,7 @@ class OkxPerpClient(BaseClient):
             merged.append(
                 {
                     "ts": int(i["fundingTime"]),
-                    "dt": datetime.fromtimestamp(int(i["fundingTime"]) / 1000, tz=UTC),
-                    "exchange_id": self.exchange_id,
                     "symbol": i["instId"],
-                    "inst_type": self.inst_type.value,
                     "funding_rate": i["fundingRate"],
                     "funding_interval": self._compute_funding_interval(
                         int(i["fundingTime"]), int(i["nextFundingTime"])
@@ -0,0 +1,45 @@
+from typing import ClassVar
+
+
+class OkxKlineStream:
+    """
+    https://www.okx.com/docs-v5/en/#public-data-websocket-mark-price-candlesticks-channel
+
+    与 REST get_kline 一致使用标记价格 K 线；spot / swap 共用 business 端点
+    """
+
+    ws_url = "wss://ws.okx.com:8443/ws/v5/business"
+    ws_max_symbols = 200
+    ws_ping_interval = 25  # 30s 无消息会被断开
+    ws_fields: ClassVar[dict[str, int | str]] = {
+        "timestamp": 0,
+        "open": 1,
+        "high": 2,
+        "low": 3,
+        "close": 4,
+    }
+    ws_interval_map: ClassVar[dict[str, str]] = {
+        "1m": "1m",
+        "1h": "1H",
+        "1d": "1Dutc",
+    }
+
+    def ws_subscribe_messages(self, symbols: list[str], interval: str) -> list[dict]:
+        channel = "mark-price-candle" + self.ws_interval_map[interval]
+        args = [{"channel": channel, "instId": s} for s in symbols]
+        return [{"op": "subscribe", "args": args[i : i + 100]} for i in range(0, len(args), 100)]
+
+    def ws_ping_message(self) -> str:
+        return "ping"
+
+    def ws_parse_kline(self, message: dict) -> list[tuple[str, list, bool]]:
+        """
+        {
+            "arg": {"channel": "mark-price-candle1m", "instId": "BTC-USDT"},
+            "data": [["1597026383085", "3.721", "3.743", "3.677", "3.708", "0"]]  // 最后一位 confirm
+        }
+        """
+        arg = message.get("arg")
+        if not arg or "data" not in message or not arg["channel"].startswith("mark-price-candle"):
+            return []
+        return [(arg["instId"], row, row[5] == "1") for row in message["data"]]
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import UTC, date, datetime, time
+
+from klines.backfill import FAILED, drain, submit_backfill
+from prefect import flow, get_run_logger
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from databases.doris import get_doris
+from databases.doris.sink import get_kline_sink
+from databases.mysql import KlineBackfillJob, sync_engine
+from exchanges.kraken import KrakenSpotClient
+
+from .sync_klines import CLIENT_MAP, get_exchanges_map, get_syncable_symbols
+
+
+def _date_to_ms(d: date) -> int:
+    return int(datetime.combine(d, time.min, tzinfo=UTC).timestamp() * 1000)
+
+
+@flow(name="submit-kline-backfill")
+async def submit_kline_backfill(
+    exchange_name: str,
+    inst_type: int,
+    symbol: str,
+    start: date,
+    end: date | None = None,
+    interval: str = "1m",
+    chunk_days: int = 7,
+) -> int:
+    """
+    提交定向回填任务，例如 okx / 1 / BTC-USDT-SWAP / 2024-01-01；
+    end 默认到当前，由 drain-kline-backfill 分片执行
+    """
+    logger = get_run_logger()
+    exchange_ids = {name: exchange_id for exchange_id, name in get_exchanges_map().items()}
+    if (exchange_name, inst_type) not in CLIENT_MAP:
+        raise ValueError(f"No kline client for {exchange_name} inst_type={inst_type}")
+    start_ms = _date_to_ms(start)
+    end_ms = _date_to_ms(end) + 86_400_000 - 1 if end else int(datetime.now(UTC).timestamp() * 1000)
+    job_id = await submit_backfill(
+        exchange_ids[exchange_name], inst_type, symbol, interval, start_ms, end_ms, chunk_days=chunk_days
+    )
+    logger.info(f"Submitted backfill job {job_id}: {exchange_name} {inst_type} {symbol} {interval} {start} → {end}")
+    return job_id
+
+
+@flow(name="drain-kline-backfill")
+async def drain_kline_backfill(concurrency: int = 4):
+    """领取并执行回填 chunk 直到队列为空；多个 flow run 可以同时运行"""
+    logger = get_run_logger()
+    exchange_map = get_exchanges_map()
+    clients = {}
+
+    def client_factory(exchange_id: int, inst_type: int):
+        key = (exchange_map.get(exchange_id), inst_type)
+        if key not in clients:
+            client_class = CLIENT_MAP.get(key)
+            clients[key] = client_class(logger) if client_class else None
+        return clients[key]
+
+    try:
+        stats = await drain(client_factory, concurrency=concurrency)
+    finally:
+        await get_kline_sink().close()
+    logger.info(f"Backfill drained: {stats}")
+    return stats
+
+
+@flow(name="submit-kraken-history")
+async def submit_kraken_history(start: date = date(2017, 1, 1), chunk_days: int = 1) -> list[int]:
+    """
+    Kraken OHLC 只能取到最近 720 根，更早的 1m 由成交聚合：为每个 symbol 提交
+    [max(start, 上架时间), Doris 中最早的 1m 与 OHLC 窗口取早者) 的回填 job，
+    由 drain-kline-backfill 跨 symbol 并发执行，1h / 1d 随 1m rollup 生成。
+    成交量大的 pair 每天几十页，chunk 默认按天切分，单个 chunk 不超过 worker 租约
+    """
+    logger = get_run_logger()
+    client = KrakenSpotClient(logger)
+    symbols = [
+        s for s in get_syncable_symbols() if s.exchange_id == client.exchange_id and s.inst_type == client.inst_type
+    ]
+    r = await get_doris().query(
+        f"""
+        SELECT symbol, MIN(`timestamp`)
+        FROM kline_1m
+        WHERE exchange_id = {client.exchange_id}
+          AND inst_type = '{client.inst_type}'
+        GROUP BY symbol
+        """
+    )
+    earliest = {row[0]: int(row[1]) for row in r if row[1] is not None}
+    with Session(sync_engine) as conn:
+        stmt = select(KlineBackfillJob.symbol, KlineBackfillJob.start_ts).where(
+            KlineBackfillJob.exchange_id == client.exchange_id,
+            KlineBackfillJob.inst_type == client.inst_type,
+            KlineBackfillJob.interval == "1m",
+            KlineBackfillJob.status != FAILED,
+        )
+        submitted = {}
+        for symbol, start_ts in conn.execute(stmt).all():
+            submitted[symbol] = min(start_ts, submitted.get(symbol, start_ts))
+
+    floor = client.ohlc_floor("1m")
+    job_ids = []
+    for s in symbols:
+        start_ms = max(_date_to_ms(start), s.onboard_time or 0)
+        end_ms = min(earliest.get(s.symbol, floor), floor) - 1
+        # 已有覆盖起点的 job（进行中或已完成）不再重复提交
+        if start_ms > end_ms or submitted.get(s.symbol, end_ms + 1) <= start_ms:
+            continue
+        job_id = await submit_backfill(
+            client.exchange_id, client.inst_type.value, s.symbol, "1m", start_ms, end_ms, chunk_days=chunk_days
+        )
+        logger.info(f"Submitted kraken history job {job_id}: {s.symbol} {start_ms} → {end_ms}")
+        job_ids.append(job_id)
+    return job_ids
+
+
+if __name__ == "__main__":
+    asyncio.run(drain_kline_backfill())
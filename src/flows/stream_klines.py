@@ -0,0 +1,61 @@
+import asyncio
+
+from klines.stream import KlineStreamCollector
+from klines.validate import flush_quarantine, log_quarantine_counts
+from prefect import flow, get_run_logger
+
+from databases.doris.sink import get_kline_sink
+from exchanges.binance import BinancePerpClient, BinanceSpotClient
+from exchanges.bitget import BitgetPerpClient, BitgetSpotClient
+from exchanges.bybit import BybitPerpClient, BybitSpotClient
+from exchanges.gate import GateSpotClient
+from exchanges.okx import OkxPerpClient, OkxSpotClient
+
+from .sync_klines import get_exchanges_map, get_syncable_symbols
+
+STREAM_CLIENTS = [
+    BinancePerpClient,
+    BinanceSpotClient,
+    BitgetPerpClient,
+    BitgetSpotClient,
+    BybitPerpClient,
+    BybitSpotClient,
+    GateSpotClient,
+    OkxPerpClient,
+    OkxSpotClient,
+]
+
+STREAM_CLIENT_MAP = {(client.exchange_name, client.inst_type.value): client for client in STREAM_CLIENTS}
+
+
+@flow(name="stream-klines-1m")
+async def stream_klines_1m(max_runtime: int = 6 * 3600):
+    """
+    WebSocket 实时采集 1m 收盘 kline（同时 rollup 1h / 1d）
+    运行 max_runtime 秒后退出，由调度重新拉起以刷新 ClxSymbol 列表；
+    断线期间的缺口由 collector 重连后 REST 补齐，sync-klines-1m 作为兜底
+    """
+    logger = get_run_logger()
+    exchange_map = get_exchanges_map()
+    symbols_map = {}
+    for s in get_syncable_symbols():
+        symbols_map.setdefault((exchange_map[s.exchange_id], s.inst_type), []).append(s.symbol)
+
+    collectors = []
+    for (exchange_name, inst_type), symbols in symbols_map.items():
+        client_class = STREAM_CLIENT_MAP.get((exchange_name, inst_type))
+        if client_class is None:
+            continue
+        collectors.append(KlineStreamCollector(client_class(logger), symbols))
+        logger.info(f"Stream klines 1m for {exchange_name} {inst_type}: {len(symbols)} symbols")
+
+    try:
+        await asyncio.gather(*(c.run(max_runtime=max_runtime) for c in collectors))
+    finally:
+        await flush_quarantine(get_kline_sink(), logger)
+        await get_kline_sink().close()
+        log_quarantine_counts(logger)
+
+
+if __name__ == "__main__":
+    asyncio.run(stream_klines_1m(max_runtime=300))
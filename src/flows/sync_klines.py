@@ -1,14 +1,22 @@
 import asyncio
+import os
+import time
 import traceback
 from typing import Literal
 
+from constants import SymbolStatus
+from klines.schedule import KlineScheduler, KlineWork, PriorityWeights
+from klines.validate import flush_quarantine, log_quarantine_counts
 from prefect import flow, get_run_logger, task
+from prefect.artifacts import acreate_progress_artifact, aupdate_progress_artifact
+from prefect.deployments import run_deployment
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from databases.doris import get_doris
+from databases.doris.sink import get_kline_sink
 from databases.mysql import sync_engine
-from databases.mysql.models import ClxSymbol, ExchangeInfo, ExchangeSymbol
+from databases.mysql.models import ClxSymbol, ExchangeInfo, ExchangeSymbol, KlineOpenBar
 from exchanges.aster import AsterPerpClient
 from exchanges.binance import BinancePerpClient, BinanceSpotClient
 from exchanges.bitget import BitgetPerpClient, BitgetSpotClient
@@ -19,6 +27,9 @@ from exchanges.kraken import KrakenSpotClient
 from exchanges.mexc import MexcPerpClient, MexcSpotClient
 from exchanges.okx import OkxPerpClient, OkxSpotClient
 from exchanges.woox import WooxPerpClient, WooxSpotClient
+from utils.hash_ring import ConsistentHashRing
+
+SHARD_DEPLOYMENT = f"sync-klines-shard/{os.getenv('ENV')}-sync-klines-shard"
 
 
 def get_active_symbols():
@@ -34,6 +45,15 @@ def get_active_symbols():
     return symbols
 
 
+def get_symbol_priorities() -> dict[int, int]:
+    """ExchangeSymbol.id → ClxSymbol.sync_priority（只含非 0）"""
+    with Session(sync_engine) as conn:
+        stmt = select(ClxSymbol.symbol_id, ClxSymbol.sync_priority).where(
+            ClxSymbol.is_active == 1, ClxSymbol.sync_priority != 0
+        )
+        return dict(conn.execute(stmt).all())
+
+
 def get_exchanges_map():
     with Session(sync_engine) as conn:
         stmt = select(ExchangeInfo)
@@ -41,12 +61,29 @@ def get_exchanges_map():
     return {e.id: e.name for e in exchanges}
 
 
+# 暂停 / 下线的 symbol 不会产生新 kline，同步时跳过
+SKIP_STATUSES = (SymbolStatus.HALTED, SymbolStatus.CLOSED)
+
+
+def get_syncable_symbols():
+    """active 且未暂停 / 下线的 symbol"""
+    return [s for s in get_active_symbols() if s.status not in SKIP_STATUSES]
+
+
+def get_open_bars(interval: str) -> dict[tuple[int, int, str], int]:
+    """(exchange_id, inst_type, symbol) → 写入时尚未收盘的最早 bar timestamp"""
+    with Session(sync_engine) as conn:
+        stmt = select(KlineOpenBar).where(KlineOpenBar.interval == interval, KlineOpenBar.open_ts.is_not(None))
+        bars = conn.execute(stmt).scalars().all()
+    return {(b.exchange_id, b.inst_type, b.symbol): b.open_ts for b in bars}
+
+
 async def get_last_kline_timestamp(interval: Literal["1m", "1h", "1d"], symbol: ExchangeSymbol):
     doris = get_doris()
     data = await doris.query(
         f"""
         SELECT
-            dt
+            `timestamp`
         FROM kline_{interval}
         WHERE exchange_id = {symbol.exchange_id}
             AND inst_type = '{symbol.inst_type}'
@@ -56,7 +93,7 @@ async def get_last_kline_timestamp(interval: Literal["1m", "1h", "1d"], symbol:
     )
     if not data:
         return None
-    return data[0][0]
+    return int(data[0][0])
 
 
 HANDLE_CLIENT = [
@@ -82,58 +119,300 @@ HANDLE_CLIENT = [
 CLIENT_MAP = {(client.exchange_name, client.inst_type.value): client for client in HANDLE_CLIENT}
 
 
+class ShardProgress:
+    """shard 进度：每完成一个 symbol 计数，最多每 min_interval 秒更新一次 Prefect progress artifact"""
+
+    def __init__(self, interval: str, shard: int, shards: int, total: int, min_interval: float = 10.0):
+        self.key = f"sync-klines-{interval}-shard-{shard}-of-{shards}"
+        self.total = total
+        self.done = 0
+        self.min_interval = min_interval
+        self.artifact_id = None
+        self._updated_at = 0.0
+
+    def _description(self) -> str:
+        return f"{self.done}/{self.total} symbols"
+
+    async def start(self):
+        try:
+            self.artifact_id = await acreate_progress_artifact(0.0, key=self.key, description=self._description())
+        except Exception as e:
+            get_run_logger().warning(f"Create progress artifact {self.key} failed: {e}")
+
+    async def advance(self, n: int = 1):
+        self.done += n
+        now = time.monotonic()
+        if self.artifact_id is None or (now - self._updated_at < self.min_interval and self.done < self.total):
+            return
+        self._updated_at = now
+        try:
+            progress = 100.0 * self.done / self.total if self.total else 100.0
+            await aupdate_progress_artifact(self.artifact_id, progress, description=self._description())
+        except Exception as e:
+            get_run_logger().warning(f"Update progress artifact {self.key} failed: {e}")
+
+
 @task(name="update-kline-task", retries=2, retry_delay_seconds=3)
 async def update_kline(
-    exchange_name: str, inst_type: int, symbols: [ExchangeSymbol], interval: Literal["1m", "1h", "1d"]
+    exchange_name: str,
+    inst_type: int,
+    work: list[KlineWork],
+    interval: Literal["1m", "1h", "1d"],
+    reconcile_days: int | None = None,
+    open_bars: dict[tuple[int, int, str], int] | None = None,
+    tail_refresh: bool = False,
+    deadline: float | None = None,
+    symbol_budget: float | None = None,
+    progress: ShardProgress | None = None,
 ):
+    """
+    work 已按优先级排序；deadline（time.monotonic）到达后不再开始新的 symbol，
+    单个 symbol 最多占用 symbol_budget 秒，超时的 symbol 下一轮从 watermark 继续。
+    每个 symbol 以自己的 owner 写入共享 sink，处理完即 flush；有 symbol 落盘失败时 task 最后抛出，由 Prefect 重试
+    """
     logger = get_run_logger()
+    open_bars = open_bars or {}
+    load_failed = []
 
-    for i in symbols:
+    for n, item in enumerate(work):
+        i = item.symbol
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.warning(
+                f"Run budget exhausted for {exchange_name} {inst_type}, {len(work) - n} symbols deferred: "
+                f"{[w.symbol.symbol for w in work[n:]]}"
+            )
+            break
+        owner = ("sync", interval, i.exchange_id, i.inst_type, i.symbol)
+        client = None
         try:
-            logger.info(f"Start update kline {interval} for {exchange_name} {inst_type} {i}")
-            last_ts = await get_last_kline_timestamp(interval, i)
+            client = CLIENT_MAP[(exchange_name, inst_type)](logger)
+            open_ts = open_bars.get((i.exchange_id, i.inst_type, i.symbol))
+            if tail_refresh:
+                # tail refresh：只重拉写入时未收盘的 bar，没有记录的 symbol 不发请求
+                if open_ts is None:
+                    continue
+                await client.refresh_open_kline(
+                    i.symbol,
+                    interval,
+                    open_ts,
+                    rollup=interval == "1m",
+                    onboard_ms=i.onboard_time,
+                    budget=symbol_budget,
+                    owner=owner,
+                )
+                continue
+
+            if reconcile_days:
+                # 对账：整段重新拉取交易所 bar，覆盖 rollup 生成的结果
+                logger.info(f"Start reconcile kline {interval} for {exchange_name} {inst_type} {i}")
+                start_ms = int((time.time() - reconcile_days * 86400) * 1000)
+                await client.update_kline(
+                    i.symbol,
+                    interval,
+                    start_ms,
+                    force_start=True,
+                    scan_gaps=False,
+                    onboard_ms=i.onboard_time,
+                    budget=symbol_budget,
+                    owner=owner,
+                )
+                continue
+
+            logger.info(f"Start update kline {interval} for {exchange_name} {inst_type} {i} (score={item.score:.1f})")
+            if open_ts is not None:
+                # 上次写入的最后一根 bar 未收盘，从它开始拉取以覆盖最终值
+                await client.update_kline(
+                    i.symbol,
+                    interval,
+                    open_ts,
+                    force_start=True,
+                    rollup=interval == "1m",
+                    onboard_ms=i.onboard_time,
+                    budget=symbol_budget,
+                    owner=owner,
+                )
+                continue
+            last_ts = item.watermark_ms or await get_last_kline_timestamp(interval, i)
+            onboard_ms = i.onboard_time
+            budget = symbol_budget
+            if not last_ts:
+                # 库里还没有数据：缺上架时间时先二分探测最早的 bar，起点直接跳过上架前的空窗口；
+                # 探测与拉取共用 symbol_budget
+                started = time.monotonic()
+                async with asyncio.timeout(symbol_budget):
+                    onboard_ms = await client.resolve_onboard_time(i.symbol, onboard_ms)
+                if symbol_budget is not None:
+                    budget = max(symbol_budget - (time.monotonic() - started), 0.0)
             last_ts = last_ts or 1735689600000
-            await CLIENT_MAP[(exchange_name, inst_type)](logger).update_kline(i.symbol, interval, last_ts)
+            # 预算只限制拉取：超时后已写入 sink 的 1m 照常 rollup，下一轮从新水位继续不会漏掉 1h / 1d
+            await client.update_kline(
+                i.symbol,
+                interval,
+                last_ts,
+                rollup=interval == "1m",
+                onboard_ms=onboard_ms,
+                budget=budget,
+                owner=owner,
+            )
+        except TimeoutError:
+            logger.warning(f"Kline {interval} for {exchange_name} {inst_type} {i} exceeded {symbol_budget}s budget")
         except Exception as e:
             logger.error(f"Failed to update kline for {exchange_name} {inst_type} {i}: {e}")
             traceback.print_exc()
             await asyncio.sleep(1)
+        finally:
+            if client is not None:
+                try:
+                    await client.kline_sink.flush(owner)
+                except Exception as e:
+                    load_failed.append(i.symbol)
+                    logger.error(f"Failed to load kline {interval} for {exchange_name} {inst_type} {i}: {e}")
+            if progress:
+                await progress.advance()
 
+    if load_failed:
+        raise RuntimeError(f"Kline {interval} load failed for {exchange_name} {inst_type}: {load_failed}")
 
-async def sync_klines(interval):
+
+async def sync_klines(
+    interval,
+    reconcile_days: int | None = None,
+    tail_refresh: bool = False,
+    budget_seconds: float | None = None,
+    max_symbol_share: float = 0.05,
+    weights: PriorityWeights | None = None,
+    shard: int = 0,
+    shards: int = 1,
+):
+    """
+    budget_seconds: 本轮总预算，超时后低优先级 symbol 顺延到下一轮
+    max_symbol_share: 单个 symbol 最多占用预算的比例
+    shard / shards: 只处理一致性 hash 落在本 shard 的 (exchange_id, inst_type, symbol)
+    """
     logger = get_run_logger()
-    symbols = get_active_symbols()
+    symbols = get_syncable_symbols()
+    if shards > 1:
+        ring = ConsistentHashRing(shards)
+        symbols = [s for s in symbols if ring.shard_of(f"{s.exchange_id}:{s.inst_type}:{s.symbol}") == shard]
+        logger.info(f"Shard {shard}/{shards}: {len(symbols)} symbols")
     exchange_map = get_exchanges_map()
-    symbols_map = {}
-    for s in symbols:
-        symbols_map.setdefault((exchange_map[s.exchange_id], s.inst_type), []).append(s)
+    open_bars = get_open_bars(interval)
+    work = await KlineScheduler(interval, weights).plan(symbols, get_symbol_priorities())
+    work_map = {}
+    for item in work:
+        s = item.symbol
+        work_map.setdefault((exchange_map[s.exchange_id], s.inst_type), []).append(item)
+
+    deadline = time.monotonic() + budget_seconds if budget_seconds else None
+    symbol_budget = budget_seconds * max_symbol_share if budget_seconds else None
+
+    skipped = [k for k in work_map if k not in CLIENT_MAP]
+    for exchange_name, inst_type in skipped:
+        items = work_map.pop((exchange_name, inst_type))
+        logger.warning(
+            f"Skip sync klines {interval} for {exchange_name} {inst_type}: {[i.symbol.symbol for i in items]}"
+        )
+
+    progress = ShardProgress(interval, shard, shards, sum(len(items) for items in work_map.values()))
+    await progress.start()
 
     tasks = []
-    for (exchange_name, inst_type), symbols in symbols_map.items():
-        if (exchange_name, inst_type) not in CLIENT_MAP:
-            logger.warning(
-                f"Skip sync klines {interval} for {exchange_name} {inst_type}: {[i.symbol for i in symbols]}"
+    for (exchange_name, inst_type), items in work_map.items():
+        tasks.append(
+            update_kline(
+                exchange_name,
+                inst_type,
+                items,
+                interval,
+                reconcile_days,
+                open_bars,
+                tail_refresh,
+                deadline,
+                symbol_budget,
+                progress,
             )
-            continue
+        )
 
-        tasks.append(update_kline(exchange_name, inst_type, symbols, interval))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # 所有 symbol 共享一个 sink，结束时统一落盘
+        await flush_quarantine(get_kline_sink(), logger)
+        await get_kline_sink().close()
+        log_quarantine_counts(logger)
 
-    await asyncio.gather(*tasks)
+
+@flow(name="sync-klines-shard")
+async def sync_klines_shard(
+    interval: str,
+    shard: int,
+    shards: int,
+    reconcile_days: int | None = None,
+    tail_refresh: bool = False,
+    budget_seconds: float | None = None,
+    max_symbol_share: float = 0.05,
+):
+    """单个 shard 的 kline 同步，由 run_sharded 通过 run_deployment 拉起"""
+    await sync_klines(
+        interval,
+        reconcile_days=reconcile_days,
+        tail_refresh=tail_refresh,
+        budget_seconds=budget_seconds,
+        max_symbol_share=max_symbol_share,
+        shard=shard,
+        shards=shards,
+    )
+
+
+async def run_sharded(interval: str, shards: int, **kwargs):
+    """
+    shards <= 1 时在当前进程执行；否则为每个 shard 创建一次 sync-klines-shard deployment run，
+    由 worker pool 分散到多个节点，等待全部结束，任一 shard 失败时抛出
+    """
+    if shards <= 1:
+        await sync_klines(interval, **kwargs)
+        return
+
+    logger = get_run_logger()
+    runs = await asyncio.gather(
+        *(
+            run_deployment(
+                SHARD_DEPLOYMENT,
+                parameters={"interval": interval, "shard": shard, "shards": shards, **kwargs},
+                flow_run_name=f"sync-klines-{interval}-shard-{shard}-of-{shards}",
+            )
+            for shard in range(shards)
+        )
+    )
+    failed = [shard for shard, run in enumerate(runs) if not (run.state and run.state.is_completed())]
+    for shard, run in enumerate(runs):
+        logger.info(f"Shard {shard}/{shards} {run.name}: {run.state.name if run.state else None}")
+    if failed:
+        raise RuntimeError(f"sync klines {interval}: shards {failed} of {shards} did not complete")
 
 
 @flow(name="sync-klines-1m")
-async def sync_klines_1m():
-    await sync_klines("1m")
+async def sync_klines_1m(budget_seconds: float = 55 * 60, max_symbol_share: float = 0.05, shards: int = 1):
+    """1m 同步，同时 rollup 出 1h / 1d；按优先级排序，预算内没轮到的 symbol 顺延到下一轮"""
+    await run_sharded("1m", shards, budget_seconds=budget_seconds, max_symbol_share=max_symbol_share)
+
+
+@flow(name="refresh-open-klines-1m")
+async def refresh_open_klines_1m(shards: int = 1):
+    """tail refresh：每个 symbol 一次小请求，重拉上次写入时未收盘的 1m bar"""
+    await run_sharded("1m", shards, tail_refresh=True)
 
 
 @flow(name="sync-klines-1h")
-async def sync_klines_1h():
-    await sync_klines("1h")
+async def sync_klines_1h(reconcile_days: int = 3, shards: int = 1):
+    """1h 由 1m rollup 生成，这里只用交易所 bar 做定期对账"""
+    await run_sharded("1h", shards, reconcile_days=reconcile_days)
 
 
 @flow(name="sync-klines-1d")
-async def sync_klines_1d():
-    await sync_klines("1d")
+async def sync_klines_1d(reconcile_days: int = 7, shards: int = 1):
+    """1d 由 1m rollup 生成，这里只用交易所 bar 做定期对账"""
+    await run_sharded("1d", shards, reconcile_days=reconcile_days)
 
 
 if __name__ == "__main__":
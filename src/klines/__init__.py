@@ -0,0 +1,5 @@
+from .rollup import KlineRollup
+
+__all__ = [
+    "KlineRollup",
+]
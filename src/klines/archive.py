@@ -0,0 +1,347 @@
+"""
+交易所公开 kline 归档（Binance data.binance.vision / Bybit 历史数据）批量导入 Doris。
+
+归档先同步到本地目录或 S3 兼容 bucket（保持交易所原始目录结构），导入时：
+- 按月度归档覆盖完整月份，当月剩余天数用日度归档
+- 边读边算 sha256，并与交易所提供的 .CHECKSUM 校验
+- zip / gzip 流式解压，pandas C 解析器整列解析成 KlineBatch
+- 1m 写入 kline_1m，同时 rollup 出 kline_1h / kline_1d
+- 每个归档落盘成功后写入 MySQL kline_archive_coverage（含 sha256），已导入的归档直接跳过（force 时重导）
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, timedelta
+import gzip
+import hashlib
+import io
+import os
+from pathlib import Path
+import tempfile
+import zipfile
+
+import boto3
+from constants import InstType
+import numpy as np
+import pandas as pd
+from prefect import get_run_logger
+from sqlalchemy import select
+
+from databases.doris.sink import get_kline_sink
+from databases.mysql import KlineArchiveCoverage, async_engine, async_upsert
+from utils.logger import logger as _logger
+
+from .batch import KlineBatch
+from .rollup import KlineRollup
+from .validate import quarantine_invalid
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArchiveSpec:
+    """
+    key_template: 相对 store 根目录的归档路径，占位符 {symbol} {interval} {period} {frequency}
+    fields: KlineBatch 列名 → CSV 列下标（无表头）或列名（有表头）
+    checksum_suffix: 交易所随归档发布的 sha256 文件后缀
+    """
+
+    exchange_name: str
+    inst_type: InstType
+    key_template: str
+    fields: dict[str, int | str]
+    checksum_suffix: str | None = None
+    interval_map: dict[str, str] | None = None
+
+
+_BINANCE_FIELDS = {
+    "timestamp": 0,
+    "open": 1,
+    "high": 2,
+    "low": 3,
+    "close": 4,
+    "volume": 5,
+    "quote_volume": 7,
+    "count": 8,
+}
+_BYBIT_FIELDS = {
+    "timestamp": "start_time",
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "volume": "volume",
+    "quote_volume": "turnover",
+}
+
+ARCHIVE_SPECS: dict[tuple[str, int], ArchiveSpec] = {
+    # https://github.com/binance/binance-public-data
+    ("binance", InstType.SPOT): ArchiveSpec(
+        "binance",
+        InstType.SPOT,
+        "data/spot/{frequency}/klines/{symbol}/{interval}/{symbol}-{interval}-{period}.zip",
+        _BINANCE_FIELDS,
+        checksum_suffix=".CHECKSUM",
+    ),
+    ("binance", InstType.PERP): ArchiveSpec(
+        "binance",
+        InstType.PERP,
+        "data/futures/um/{frequency}/klines/{symbol}/{interval}/{symbol}-{interval}-{period}.zip",
+        _BINANCE_FIELDS,
+        checksum_suffix=".CHECKSUM",
+    ),
+    # Bybit 历史数据页下载的 kline CSV（带表头，gzip），按同样的月 / 日粒度存放
+    ("bybit", InstType.SPOT): ArchiveSpec(
+        "bybit",
+        InstType.SPOT,
+        "bybit/spot/{frequency}/klines/{symbol}/{interval}/{symbol}-{interval}-{period}.csv.gz",
+        _BYBIT_FIELDS,
+        interval_map={"1m": "1", "1h": "60", "1d": "D"},
+    ),
+    ("bybit", InstType.PERP): ArchiveSpec(
+        "bybit",
+        InstType.PERP,
+        "bybit/linear/{frequency}/klines/{symbol}/{interval}/{symbol}-{interval}-{period}.csv.gz",
+        _BYBIT_FIELDS,
+        interval_map={"1m": "1", "1h": "60", "1d": "D"},
+    ),
+}
+
+
+def iter_periods(start: date, end: date) -> list[tuple[str, str]]:
+    """
+    [start, end] 覆盖的归档周期：完整月份用 ("monthly", "YYYY-MM")，
+    不完整月份的每一天用 ("daily", "YYYY-MM-DD")
+    """
+    periods = []
+    day = start
+    while day <= end:
+        next_month = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+        if day.day == 1 and next_month - timedelta(days=1) <= end:
+            periods.append(("monthly", day.strftime("%Y-%m")))
+            day = next_month
+        else:
+            periods.append(("daily", day.isoformat()))
+            day += timedelta(days=1)
+    return periods
+
+
+# ----------------------------------------------------------------------
+# Store：本地目录 / S3 兼容 bucket
+# ----------------------------------------------------------------------
+class LocalArchiveStore:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def open(self, key: str):
+        path = self.root / key
+        return path.open("rb") if path.exists() else None
+
+    def read_text(self, key: str) -> str | None:
+        path = self.root / key
+        return path.read_text() if path.exists() else None
+
+    def describe(self, key: str) -> str:
+        return str(self.root / key)
+
+
+class S3ArchiveStore:
+    """zip 需要随机访问，先下载到 SpooledTemporaryFile（小文件留在内存）"""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.s3 = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def open(self, key: str):
+        f = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
+        try:
+            self.s3.download_fileobj(self.bucket, self._key(key), f)
+        except self.s3.exceptions.ClientError as e:
+            f.close()
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+        f.seek(0)
+        return f
+
+    def read_text(self, key: str) -> str | None:
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=self._key(key))
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return obj["Body"].read().decode()
+
+    def describe(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._key(key)}"
+
+
+def get_archive_store(source: str) -> LocalArchiveStore | S3ArchiveStore:
+    """source: 本地目录，或 s3://bucket/prefix（endpoint 取 ARCHIVE_S3_ENDPOINT）"""
+    if source.startswith("s3://"):
+        bucket, _, prefix = source[len("s3://") :].partition("/")
+        return S3ArchiveStore(bucket, prefix, endpoint_url=os.getenv("ARCHIVE_S3_ENDPOINT"))
+    return LocalArchiveStore(source)
+
+
+# ----------------------------------------------------------------------
+# 解析
+# ----------------------------------------------------------------------
+def _sha256(f) -> str:
+    h = hashlib.sha256()
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()
+
+
+def _open_csv(f, key: str):
+    """返回解压后的 CSV 二进制流（不整体解压到内存）"""
+    if key.endswith(".zip"):
+        archive = zipfile.ZipFile(f)
+        return archive.open(archive.namelist()[0])
+    if key.endswith(".gz"):
+        return gzip.GzipFile(fileobj=f)
+    return f
+
+
+def parse_kline_csv(stream, fields: dict[str, int | str]) -> dict[str, np.ndarray]:
+    """
+    整列解析 kline CSV：
+    - fields 为下标时按无表头读取；Binance futures 归档带表头，首行非数字时跳过
+    - fields 为列名时按表头读取
+    """
+    if all(isinstance(key, str) for key in fields.values()):
+        frame = pd.read_csv(stream, usecols=list(fields.values()), engine="c")
+    else:
+        stream = io.BufferedReader(stream) if not hasattr(stream, "peek") else stream
+        has_header = not stream.peek(1)[:1].isdigit()
+        frame = pd.read_csv(
+            stream, header=None, skiprows=1 if has_header else 0, usecols=list(fields.values()), engine="c"
+        )
+    columns = {name: frame[key].to_numpy() for name, key in fields.items()}
+
+    timestamp = columns["timestamp"].astype(np.int64)
+    # Binance spot 自 2025-01-01 起归档时间戳为微秒，Bybit 部分归档为秒
+    timestamp = np.where(timestamp >= 10**14, timestamp // 1000, timestamp)
+    columns["timestamp"] = np.where(timestamp < 10**11, timestamp * 1000, timestamp)
+    return columns
+
+
+@dataclass
+class ArchiveFile:
+    key: str
+    period: str
+    checksum: str
+    batch: KlineBatch
+
+
+class KlineArchiveIngester:
+    def __init__(self, store, sink=None, doris_client=None):
+        try:
+            self.logger = get_run_logger()
+        except Exception:
+            self.logger = _logger
+        self.store = store
+        self.sink = sink or get_kline_sink()
+        self.doris_client = doris_client
+
+    def _read_archive(
+        self, spec: ArchiveSpec, exchange_id: int, symbol: str, interval: str, frequency: str, period: str
+    ) -> ArchiveFile | None:
+        """阻塞 IO + 解析，在线程池里执行"""
+        key = spec.key_template.format(
+            symbol=symbol,
+            interval=(spec.interval_map or {}).get(interval, interval),
+            period=period,
+            frequency=frequency,
+        )
+        f = self.store.open(key)
+        if f is None:
+            return None
+        with f:
+            checksum = _sha256(f)
+            if spec.checksum_suffix:
+                expected = self.store.read_text(key + spec.checksum_suffix)
+                if expected and expected.split()[0].lower() != checksum:
+                    raise ValueError(f"checksum mismatch for {self.store.describe(key)}: {checksum} != {expected}")
+            with _open_csv(f, key) as stream:
+                columns = parse_kline_csv(stream, spec.fields)
+        batch = KlineBatch.from_columns(columns, exchange_id, int(spec.inst_type), symbol)
+        return ArchiveFile(key, period, checksum, batch)
+
+    async def _loaded_checksums(self, exchange_id: int, inst_type: int, symbol: str, interval: str) -> dict[str, str]:
+        stmt = select(KlineArchiveCoverage.period, KlineArchiveCoverage.checksum).where(
+            KlineArchiveCoverage.exchange_id == exchange_id,
+            KlineArchiveCoverage.inst_type == inst_type,
+            KlineArchiveCoverage.symbol == symbol,
+            KlineArchiveCoverage.interval == interval,
+        )
+        async with async_engine.connect() as conn:
+            rows = (await conn.execute(stmt)).all()
+        return dict(rows)
+
+    async def ingest(
+        self,
+        spec: ArchiveSpec,
+        exchange_id: int,
+        symbol: str,
+        start: date,
+        end: date,
+        interval: str = "1m",
+        force: bool = False,
+    ) -> dict[str, int]:
+        """
+        导入 symbol 在 [start, end] 的归档；缺失的归档（未上架 / 尚未发布）跳过，
+        由 REST 路径补齐。返回 {"archives", "rows", "skipped", "missing"}
+        """
+        stats = {"archives": 0, "rows": 0, "skipped": 0, "missing": 0}
+        loaded = {} if force else await self._loaded_checksums(exchange_id, spec.inst_type, symbol, interval)
+        rollup = KlineRollup(doris_client=self.doris_client, sink=self.sink) if interval == "1m" else None
+
+        for frequency, period in iter_periods(start, end):
+            if period in loaded:
+                stats["skipped"] += 1
+                continue
+            archive = await asyncio.to_thread(
+                self._read_archive, spec, exchange_id, symbol, interval, frequency, period
+            )
+            if archive is None:
+                stats["missing"] += 1
+                continue
+
+            batch = await quarantine_invalid(archive.batch, interval, self.sink)
+            await self.sink.put(batch, "kline_" + interval)
+            if rollup:
+                # rollup seed 需要从 Doris 读到前一个归档的分钟，先让 1m 落盘
+                await self.sink.flush()
+                rollup.add(batch)
+                await rollup.flush()
+            # 落盘成功后才记录 coverage，失败的归档下次会重新导入
+            await self.sink.flush()
+            await async_upsert(
+                [
+                    {
+                        "exchange_id": exchange_id,
+                        "inst_type": int(spec.inst_type),
+                        "symbol": symbol,
+                        "interval": interval,
+                        "period": period,
+                        "start_ts": int(archive.batch.timestamp.min()),
+                        "end_ts": int(archive.batch.timestamp.max()),
+                        "row_count": len(batch),
+                        "checksum": archive.checksum,
+                        "source": self.store.describe(archive.key),
+                    }
+                ],
+                KlineArchiveCoverage,
+                ["start_ts", "end_ts", "row_count", "checksum", "source"],
+            )
+            stats["archives"] += 1
+            stats["rows"] += len(batch)
+            self.logger.info(f"[{spec.exchange_name}] {symbol} {interval} {period}: {len(batch)} rows loaded")
+
+        return stats
@@ -0,0 +1,318 @@
+"""
+MySQL 持久化的 kline 回填队列。
+
+submit_backfill 把 [start, end] 按 UTC 自然日对齐切成 chunk 写入 kline_backfill_chunk；
+BackfillWorker 用 SELECT ... FOR UPDATE SKIP LOCKED 领取 chunk（带租约），多个 worker / 进程并行消费：
+- chunk 完成：sink flush 落盘后标记 DONE，job.done_chunks + 1；
+  chunk 的行以 chunk 为 owner 写入共享 sink，flush 只等待、只抛出本 chunk 的写入，并发 worker 互不影响
+- chunk 失败：flush 已拉到的数据，cursor_ts 推进到已落盘位置，退回 PENDING（超过 max_attempts 标记 FAILED）
+- worker 崩溃：租约过期后 chunk 被重新领取，从 cursor_ts 继续；处理期间后台按 lease_seconds / 3 续租，
+  续租 / 完成 / 失败都只更新 worker 和 attempts 仍是自己的行，租约被别人接手后不再改 chunk 和 job
+chunk 边界按天对齐，1h / 1d rollup 的 bucket 不会跨 chunk。
+"""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import os
+import socket
+import uuid
+
+from constants import INTERVAL_TO_SECONDS
+from prefect import get_run_logger
+from sqlalchemy import and_, case, insert, or_, select, update
+
+from databases.doris.sink import get_kline_sink
+from databases.mysql import ExchangeSymbol, KlineBackfillChunk, KlineBackfillJob, async_engine
+from utils.logger import logger as _logger
+from utils.timestamps import MS_PER_DAY
+
+from .rollup import KlineRollup
+
+PENDING, RUNNING, DONE, FAILED = 0, 1, 2, 3
+
+
+class LeaseLost(Exception):
+    """chunk 的租约已被其它 worker 接手"""
+
+
+@dataclass
+class BackfillChunk:
+    id: int
+    job_id: int
+    exchange_id: int
+    inst_type: int
+    symbol: str
+    interval: str
+    cursor_ts: int
+    end_ts: int
+    attempts: int
+    onboard_ms: int | None = None
+
+
+def split_chunks(start_ms: int, end_ms: int, chunk_days: int) -> list[tuple[int, int]]:
+    """[start_ms, end_ms] 按 UTC 自然日对齐切分，每段最多 chunk_days 天"""
+    chunks = []
+    current = start_ms
+    while current <= end_ms:
+        boundary = (current // MS_PER_DAY + chunk_days) * MS_PER_DAY
+        chunks.append((current, min(boundary - 1, end_ms)))
+        current = boundary
+    return chunks
+
+
+async def submit_backfill(
+    exchange_id: int,
+    inst_type: int,
+    symbol: str,
+    interval: str,
+    start_ms: int,
+    end_ms: int,
+    chunk_days: int = 7,
+) -> int:
+    """创建回填 job 及其 chunk，返回 job id"""
+    chunks = split_chunks(start_ms, end_ms, chunk_days)
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
+            insert(KlineBackfillJob).values(
+                exchange_id=exchange_id,
+                inst_type=inst_type,
+                symbol=symbol,
+                interval=interval,
+                start_ts=start_ms,
+                end_ts=end_ms,
+                total_chunks=len(chunks),
+            )
+        )
+        job_id = result.inserted_primary_key[0]
+        await conn.execute(
+            insert(KlineBackfillChunk),
+            [{"job_id": job_id, "start_ts": s, "end_ts": e, "cursor_ts": s} for s, e in chunks],
+        )
+    return job_id
+
+
+class BackfillWorker:
+    """
+    client_factory: (exchange_id, inst_type) → BaseClient，没有对应 client 时返回 None
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable,
+        lease_seconds: int = 600,
+        max_attempts: int = 5,
+        sink=None,
+    ):
+        try:
+            self.logger = get_run_logger()
+        except Exception:
+            self.logger = _logger
+        self.client_factory = client_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.sink = sink or get_kline_sink()
+        # 同一进程里 drain() 会起多个 worker，加随机后缀区分
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stats = {"done": 0, "failed": 0, "retried": 0}
+
+    async def claim(self) -> BackfillChunk | None:
+        """领取一个 PENDING 或租约已过期的 chunk；被其它事务锁住的行直接跳过"""
+        now = datetime.now()
+        c, j = KlineBackfillChunk, KlineBackfillJob
+        # 只锁 chunk 行：join 时 job 行也会被锁，同一 job 的其它 chunk 会被 SKIP LOCKED 跳过
+        stmt = (
+            select(c.id, c.job_id, c.cursor_ts, c.end_ts, c.attempts)
+            .where(or_(c.status == PENDING, and_(c.status == RUNNING, c.lease_until < now)))
+            .order_by(c.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_engine.begin() as conn:
+            row = (await conn.execute(stmt)).first()
+            if row is None:
+                return None
+            await conn.execute(
+                update(c)
+                .where(c.id == row.id)
+                .values(
+                    status=RUNNING,
+                    worker=self.worker_id,
+                    lease_until=now + timedelta(seconds=self.lease_seconds),
+                    attempts=c.attempts + 1,
+                )
+            )
+            job = (
+                await conn.execute(select(j.exchange_id, j.inst_type, j.symbol, j.interval).where(j.id == row.job_id))
+            ).one()
+            await conn.execute(update(j).where(j.id == row.job_id, j.status == PENDING).values(status=RUNNING))
+            onboard_ms = (
+                await conn.execute(
+                    select(ExchangeSymbol.onboard_time).where(
+                        ExchangeSymbol.exchange_id == job.exchange_id,
+                        ExchangeSymbol.inst_type == job.inst_type,
+                        ExchangeSymbol.symbol == job.symbol,
+                    )
+                )
+            ).scalar()
+        return BackfillChunk(
+            row.id,
+            row.job_id,
+            *job,
+            cursor_ts=row.cursor_ts,
+            end_ts=row.end_ts,
+            attempts=row.attempts,
+            onboard_ms=onboard_ms,
+        )
+
+    def _owned(self, chunk: BackfillChunk):
+        """chunk 仍由本 worker 的这次领取持有（租约没有过期后被别人接手）"""
+        c = KlineBackfillChunk
+        return and_(c.id == chunk.id, c.worker == self.worker_id, c.attempts == chunk.attempts + 1)
+
+    async def _renew(self, chunk: BackfillChunk) -> bool:
+        async with async_engine.begin() as conn:
+            result = await conn.execute(
+                update(KlineBackfillChunk)
+                .where(self._owned(chunk))
+                .values(lease_until=datetime.now() + timedelta(seconds=self.lease_seconds))
+            )
+        return result.rowcount > 0
+
+    async def _heartbeat(self, chunk: BackfillChunk, lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self._renew(chunk):
+                    self.logger.warning(f"Backfill chunk {chunk.id}: lease taken over by another worker")
+                    lost.set()
+                    return
+            except Exception as e:
+                self.logger.warning(f"Backfill chunk {chunk.id}: lease renewal failed: {e}")
+
+    async def _complete(self, chunk: BackfillChunk):
+        c, j = KlineBackfillChunk, KlineBackfillJob
+        async with async_engine.begin() as conn:
+            result = await conn.execute(
+                update(c).where(self._owned(chunk)).values(status=DONE, cursor_ts=chunk.end_ts + 1, lease_until=None)
+            )
+            if not result.rowcount:
+                self.logger.warning(f"Backfill chunk {chunk.id}: lease lost, not marking DONE")
+                return
+            # MySQL 按顺序求值 SET，status 要先于 done_chunks 计算
+            await conn.execute(
+                update(j)
+                .where(j.id == chunk.job_id)
+                .ordered_values(
+                    (j.status, case((j.done_chunks + 1 >= j.total_chunks, DONE), else_=j.status)),
+                    (j.done_chunks, j.done_chunks + 1),
+                )
+            )
+        self.stats["done"] += 1
+
+    async def _fail(self, chunk: BackfillChunk, cursor_ts: int, error: Exception):
+        c, j = KlineBackfillChunk, KlineBackfillJob
+        exhausted = chunk.attempts + 1 >= self.max_attempts
+        async with async_engine.begin() as conn:
+            result = await conn.execute(
+                update(c)
+                .where(self._owned(chunk))
+                .values(
+                    status=FAILED if exhausted else PENDING,
+                    cursor_ts=cursor_ts,
+                    lease_until=None,
+                    error=str(error)[:512],
+                )
+            )
+            if not result.rowcount:
+                self.logger.warning(f"Backfill chunk {chunk.id}: lease lost, failure not recorded")
+                return
+            if exhausted:
+                await conn.execute(update(j).where(j.id == chunk.job_id).values(status=FAILED))
+        self.stats["failed" if exhausted else "retried"] += 1
+
+    async def _land(self, owner: tuple, rollup: KlineRollup | None):
+        """落盘本 chunk 已写入 sink 的 1m，再写出并落盘对应的 1h / 1d"""
+        await self.sink.flush(owner)
+        if rollup:
+            await rollup.flush()
+            await self.sink.flush(owner)
+
+    async def process(self, chunk: BackfillChunk):
+        client = self.client_factory(chunk.exchange_id, chunk.inst_type)
+        interval_ms = INTERVAL_TO_SECONDS[chunk.interval] * 1000
+        cursor = chunk.cursor_ts
+        owner = ("backfill", chunk.id)
+        rollup = KlineRollup(sink=self.sink, owner=owner) if chunk.interval == "1m" else None
+        landing = False
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(chunk, lost))
+        try:
+            if client is None:
+                raise ValueError(f"No kline client for exchange_id={chunk.exchange_id} inst_type={chunk.inst_type}")
+            # 上架前的 chunk 不发请求直接完成；缺上架时间时探测一次，结果进程内共享
+            onboard_ms = await client.resolve_onboard_time(chunk.symbol, chunk.onboard_ms)
+            async for batch in client.get_kline(
+                chunk.symbol,
+                chunk.interval,
+                start_ms=cursor,
+                end_ms=chunk.end_ts,
+                force_start=True,
+                scan_gaps=False,
+                raise_errors=True,
+                onboard_ms=onboard_ms,
+            ):
+                await self.sink.put(batch, "kline_" + chunk.interval, owner=owner)
+                if rollup:
+                    rollup.add(batch)
+                cursor = max(cursor, int(batch.timestamp.max()) + interval_ms)
+                if lost.is_set():
+                    raise LeaseLost(f"chunk {chunk.id} was reclaimed by another worker")
+            landing = True
+            await self._land(owner, rollup)
+        except LeaseLost as e:
+            # 已拉到的数据照常落盘（重复写入是幂等的覆盖），chunk / job 的状态交给新的持有者
+            self.logger.warning(f"Backfill chunk {chunk.id} abandoned: {e}")
+            try:
+                await self._land(owner, rollup)
+            except Exception as e:
+                self.logger.error(f"Backfill chunk {chunk.id}: flush after lease loss failed: {e}")
+            return
+        except Exception as e:
+            self.logger.error(f"Backfill chunk {chunk.id} ({chunk.symbol} {chunk.interval}) failed at {cursor}: {e}")
+            if landing:
+                # 落盘本身失败：flush 已经取走了本 chunk 的错误，不能再靠重试 flush 判断，整段重拉
+                cursor = chunk.cursor_ts
+            else:
+                try:
+                    # 已拉到的数据（连同 rollup）落盘后才推进 cursor
+                    await self._land(owner, rollup)
+                except Exception:
+                    cursor = chunk.cursor_ts
+            await self._fail(chunk, cursor, e)
+            return
+        finally:
+            heartbeat.cancel()
+        await self._complete(chunk)
+
+    async def run(self, max_chunks: int | None = None):
+        """持续领取并处理 chunk，直到队列为空或处理满 max_chunks 个"""
+        processed = 0
+        while max_chunks is None or processed < max_chunks:
+            chunk = await self.claim()
+            if chunk is None:
+                break
+            self.logger.info(
+                f"Backfill chunk {chunk.id}: {chunk.symbol} {chunk.interval} {chunk.cursor_ts} → {chunk.end_ts}"
+            )
+            await self.process(chunk)
+            processed += 1
+        return self.stats
+
+
+async def drain(client_factory: Callable, concurrency: int = 4, **kwargs) -> dict[str, int]:
+    """在当前进程里并发跑 concurrency 个 worker，返回合计统计"""
+    workers = [BackfillWorker(client_factory, **kwargs) for _ in range(concurrency)]
+    results = await asyncio.gather(*(w.run() for w in workers))
+    return {k: sum(r[k] for r in results) for k in results[0]}
@@ -0,0 +1,156 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, fields as dataclass_fields, replace
+
+import numpy as np
+import pandas as pd
+
+from utils.timestamps import ms_to_dt_array
+
+# timestamp 之外的 kline 数值列；volume / quote_volume / count 部分交易所没有
+KLINE_FIELDS = ("open", "high", "low", "close", "volume", "quote_volume", "count")
+OPTIONAL_FIELDS = ("volume", "quote_volume", "count")
+
+
+def _as_int64(values: Sequence) -> np.ndarray:
+    """数字 / 数字字符串 → int64；"12.0" 这类带小数点的字符串退回 float 再截断"""
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError):
+        return np.array(values, dtype=np.float64).astype(np.int64)
+
+
+@dataclass(slots=True)
+class KlineBatch:
+    """
+    单个 symbol 的列式 kline batch：int64 毫秒 timestamp + float64 OHLCV，
+    exchange_id / inst_type / symbol 作为整批常量，只在序列化时展开。
+    """
+
+    exchange_id: int
+    inst_type: int
+    symbol: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray | None = None
+    quote_volume: np.ndarray | None = None
+    count: np.ndarray | None = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: dict[str, Sequence],
+        exchange_id: int,
+        inst_type: int,
+        symbol: str,
+        time_scale: int = 1,
+    ) -> "KlineBatch":
+        """
+        columns: {"timestamp": [...], "open": [...], ...}，值可以是数字或数字字符串
+        time_scale: timestamp 乘数（秒级时间戳传 1000）
+        """
+        timestamp = _as_int64(columns["timestamp"]) * time_scale
+        values = {}
+        for name in KLINE_FIELDS:
+            if name not in columns:
+                continue
+            values[name] = _as_int64(columns[name]) if name == "count" else np.array(columns[name], dtype=np.float64)
+        return cls(exchange_id, inst_type, symbol, timestamp, **values)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable,
+        fields: dict[str, int | str],
+        exchange_id: int,
+        inst_type: int,
+        symbol: str,
+        time_scale: int = 1,
+    ) -> "KlineBatch":
+        """
+        rows: 交易所返回的 list[list] 或 list[dict]
+        fields: 列名 → 行内下标 / key，例如 {"timestamp": 0, "open": 1, ...}
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        columns = {name: [r[key] for r in rows] for name, key in fields.items()}
+        return cls.from_columns(columns, exchange_id, inst_type, symbol, time_scale)
+
+    @classmethod
+    def concat(cls, batches: Sequence["KlineBatch"]) -> "KlineBatch":
+        """合并同一 symbol 的多个 batch"""
+        first = batches[0]
+        if len(batches) == 1:
+            return first
+        arrays = {
+            f.name: np.concatenate([getattr(b, f.name) for b in batches])
+            for f in dataclass_fields(cls)
+            if isinstance(getattr(first, f.name), np.ndarray)
+        }
+        return replace(first, **arrays)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """当前 batch 实际包含的数值列"""
+        return tuple(name for name in KLINE_FIELDS if getattr(self, name) is not None)
+
+    @property
+    def column_names(self) -> list[str]:
+        """to_tsv 输出的列；exchange_id / inst_type 走 constants，dt 由 Doris 端计算"""
+        return ["symbol", "timestamp", *self.fields]
+
+    @property
+    def constants(self) -> dict[str, int]:
+        return {"exchange_id": int(self.exchange_id), "inst_type": int(self.inst_type)}
+
+    def align(self, interval_ms: int) -> "KlineBatch":
+        """timestamp 就地向下对齐到 interval"""
+        self.timestamp //= interval_ms
+        self.timestamp *= interval_ms
+        return self
+
+    def take(self, index: np.ndarray) -> "KlineBatch":
+        """按下标 / bool mask 取子集"""
+        arrays = {name: getattr(self, name)[index] for name in ("timestamp", *self.fields)}
+        return replace(self, **arrays)
+
+    def to_tsv(self) -> str:
+        """
+        按列整批序列化为 StreamLoad TSV（列顺序同 column_names），
+        symbol 只格式化一次作为行前缀，NaN 输出为空（Doris NULL）。
+        str(float) 对 < 1e-4 或 >= 1e16 的值输出科学计数法（如 1e-08），Doris DECIMAL 列不接受，
+        这些值单独改成定点格式（最短可还原的位数）。
+        """
+        prefix = f"{self.symbol}\t"
+        columns = [map(str, self.timestamp.tolist())]
+        for name in self.fields:
+            values = getattr(self, name)
+            column = list(map(str, values.tolist()))
+            if values.dtype.kind == "f":
+                for i in np.flatnonzero(np.isnan(values)).tolist():
+                    column[i] = ""
+                magnitude = np.abs(values)
+                with np.errstate(invalid="ignore"):
+                    exponent = ((magnitude > 0) & (magnitude < 1e-4)) | ((magnitude >= 1e16) & np.isfinite(magnitude))
+                for i in np.flatnonzero(exponent).tolist():
+                    column[i] = np.format_float_positional(values[i], trim="-")
+            columns.append(column)
+        return "\n".join([prefix + line for line in map("\t".join, zip(*columns, strict=True))])
+
+    def to_frame(self) -> pd.DataFrame:
+        """展开为 Doris kline 表的列（含 dt）"""
+        n = len(self)
+        return pd.DataFrame(
+            {
+                "exchange_id": np.full(n, int(self.exchange_id), dtype=np.int64),
+                "inst_type": np.full(n, int(self.inst_type), dtype=np.int64),
+                "symbol": np.full(n, self.symbol, dtype=object),
+                "timestamp": self.timestamp,
+                **{name: getattr(self, name) for name in self.fields},
+                "dt": ms_to_dt_array(self.timestamp),
+            }
+        )
@@ -0,0 +1,171 @@
+from constants import INTERVAL_TO_SECONDS
+import numpy as np
+
+from databases.doris import get_doris
+from databases.doris.sink import get_kline_sink
+
+from .batch import KlineBatch
+
+# 参与聚合的字段：open=first, high=max, low=min, close=last, 其余求和
+SUM_COLUMNS = ("volume", "quote_volume", "count")
+ROLLUP_COLUMNS = ("open", "high", "low", "close", *SUM_COLUMNS)
+
+
+class KlineRollup:
+    """
+    由 1m kline 增量聚合出更高周期（默认 1h / 1d）。
+
+    每个 1m batch 到达时用 numpy 按 bucket 归约，再与内存中的 bucket 状态合并；
+    flush 时对本轮没有拉满全部分钟的 bucket，从 Doris 的 kline_1m 读出整个 bucket 补齐其余分钟（seed，
+    跳过本轮拉到的 timestamp，以新数据为准），再把所有被更新的 bucket 写入 kline_{interval}。
+    输入可以是多段不连续的区间、乱序或只覆盖 bucket 中间一段。
+    """
+
+    def __init__(self, intervals: tuple[str, ...] = ("1h", "1d"), doris_client=None, sink=None, owner=None):
+        self.intervals = intervals
+        self.doris_client = doris_client or get_doris()
+        self.sink = sink or get_kline_sink()
+        self.owner = owner  # 写入 sink 时的 owner，与调用方 flush(owner) 对应
+        self.columns: tuple[str, ...] | None = None
+        # (exchange_id, inst_type, symbol) -> interval -> bucket -> [first_ts, last_ts, open, high, low, close, *sums]
+        self._state: dict[tuple, dict[str, dict[int, list]]] = {}
+        # (exchange_id, inst_type, symbol) -> 本轮收到的 1m timestamp
+        self._fetched: dict[tuple, list[np.ndarray]] = {}
+        self._dirty: dict[tuple, dict[str, set[int]]] = {}
+
+    def add(self, batch: KlineBatch):
+        """接收同一 symbol 的一批 1m kline"""
+        if not len(batch):
+            return
+        if self.columns is None:
+            self.columns = batch.fields
+
+        key = (batch.exchange_id, batch.inst_type, batch.symbol)
+        self._fetched.setdefault(key, []).append(batch.timestamp)
+        values = {c: getattr(batch, c).astype(np.float64) for c in self.columns}
+        self._accumulate(self._state.setdefault(key, {}), self._dirty.setdefault(key, {}), batch.timestamp, values)
+
+    def _accumulate(
+        self,
+        state: dict[str, dict[int, list]],
+        dirty_buckets: dict[str, set[int]] | None,
+        ts: np.ndarray,
+        values: dict[str, np.ndarray],
+    ):
+        """把一批 1m 归约进 state；dirty_buckets 为 None 时（seed 读回的行）不标脏"""
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        values = {c: v[order] for c, v in values.items()}
+
+        for interval in self.intervals:
+            interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+            buckets = ts // interval_ms * interval_ms
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            ends = np.r_[starts[1:], len(ts)] - 1
+
+            reduced = {
+                "first_ts": ts[starts],
+                "last_ts": ts[ends],
+                "open": values["open"][starts] if "open" in values else None,
+                "close": values["close"][ends] if "close" in values else None,
+                "high": np.maximum.reduceat(values["high"], starts) if "high" in values else None,
+                "low": np.minimum.reduceat(values["low"], starts) if "low" in values else None,
+            }
+            for c in SUM_COLUMNS:
+                if c in values:
+                    reduced[c] = np.add.reduceat(np.nan_to_num(values[c]), starts)
+
+            interval_state = state.setdefault(interval, {})
+            for i, bucket in enumerate(buckets[starts].tolist()):
+                new = [int(reduced["first_ts"][i]), int(reduced["last_ts"][i])] + [
+                    float(reduced[c][i]) for c in self.columns
+                ]
+                old = interval_state.get(bucket)
+                interval_state[bucket] = new if old is None else self._merge(old, new)
+                if dirty_buckets is not None:
+                    dirty_buckets.setdefault(interval, set()).add(bucket)
+
+    def _merge(self, old: list, new: list) -> list:
+        merged = [min(old[0], new[0]), max(old[1], new[1])]
+        for i, c in enumerate(self.columns, start=2):
+            if c == "open":
+                merged.append(old[i] if old[0] <= new[0] else new[i])
+            elif c == "close":
+                merged.append(old[i] if old[1] >= new[1] else new[i])
+            elif c == "high":
+                merged.append(max(old[i], new[i]))
+            elif c == "low":
+                merged.append(min(old[i], new[i]))
+            else:
+                merged.append(old[i] + new[i])
+        return merged
+
+    def _incomplete_ranges(self, dirty: dict[str, set[int]], fetched: np.ndarray) -> list[tuple[int, int]]:
+        """本轮没有拉满全部分钟的脏 bucket → 合并后的 [start, end) 区间"""
+        ranges = []
+        for interval, buckets in dirty.items():
+            interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+            starts = np.array(sorted(buckets), dtype=np.int64)
+            counts = np.searchsorted(fetched, starts + interval_ms) - np.searchsorted(fetched, starts)
+            ranges += [(int(b), int(b) + interval_ms) for b in starts[counts < interval_ms // 60_000]]
+
+        merged = []
+        for lower, upper in sorted(ranges):
+            if merged and lower <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], upper))
+            else:
+                merged.append((lower, upper))
+        return merged
+
+    async def _seed(self, key: tuple, state: dict, dirty: dict, fetched: list[np.ndarray]):
+        """从 Doris 读出不完整 bucket 中本轮没拉到的 1m，保证部分 bucket 聚合完整"""
+        fetched = np.unique(np.concatenate(fetched or [np.empty(0, dtype=np.int64)]))
+        ranges = self._incomplete_ranges(dirty, fetched)
+        if not ranges:
+            return
+
+        exchange_id, inst_type, symbol = key
+        columns = ", ".join(f"`{c}`" for c in self.columns)
+        bounds = " OR ".join(f"(`timestamp` >= {lower} AND `timestamp` < {upper})" for lower, upper in ranges)
+        r = await self.doris_client.query(
+            f"""
+            SELECT `timestamp`, {columns}
+            FROM kline_1m
+            WHERE exchange_id = {exchange_id}
+              AND inst_type = '{inst_type}'
+              AND symbol = '{symbol}'
+              AND ({bounds})
+            """
+        )
+        if not r:
+            return
+        ts = np.array([row[0] for row in r], dtype=np.int64)
+        keep = ~np.isin(ts, fetched)
+        if not keep.any():
+            return
+        values = {c: np.array([row[i + 1] for row in r], dtype=np.float64)[keep] for i, c in enumerate(self.columns)}
+        self._accumulate(state, None, ts[keep], values)
+
+    async def flush(self):
+        """
+        把所有被更新的 bucket 写入 sink，并释放对应 symbol 的状态。
+        每个 symbol 在第一次 await 之前取走自己的状态，flush 期间 add 进来的 batch 进入新的状态，留给下一次 flush
+        """
+        for key in list(self._dirty):
+            dirty = self._dirty.pop(key, None)
+            if dirty is None:
+                continue
+            state = self._state.pop(key, {})
+            await self._seed(key, state, dirty, self._fetched.pop(key, None))
+            exchange_id, inst_type, symbol = key
+            for interval, buckets in dirty.items():
+                interval_state = state[interval]
+                buckets = sorted(buckets)
+                values = np.array([interval_state[b][2:] for b in buckets], dtype=np.float64)
+                batch = KlineBatch.from_columns(
+                    {"timestamp": buckets, **{c: values[:, i] for i, c in enumerate(self.columns)}},
+                    exchange_id,
+                    inst_type,
+                    symbol,
+                )
+                await self.sink.put(batch, "kline_" + interval, owner=self.owner)
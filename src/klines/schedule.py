@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+import math
+import time
+
+from constants import INTERVAL_TO_SECONDS
+import numpy as np
+
+from databases.doris import get_doris
+from utils.timestamps import MS_PER_DAY, ms_to_dt
+
+# symbol 最近 VOLUME_DAYS 天的日均成交额（计价币）决定 volume tier
+VOLUME_DAYS = 7
+# watermark 只在最近 WATERMARK_DAYS 天的分区里找，更早的由调用方单独查询
+WATERMARK_DAYS = 7
+
+
+@dataclass(frozen=True)
+class PriorityWeights:
+    """
+    score = tier * volume_tier + staleness * log2(1 + 落后 bar 数) + flag * ClxSymbol.sync_priority
+    volume_tiers: 日均成交额分档阈值，落在第 k 档得 k 分
+    """
+
+    volume_tiers: tuple[float, ...] = (1e6, 1e7, 1e8, 1e9)
+    tier: float = 2.0
+    staleness: float = 0.5
+    flag: float = 4.0
+
+
+@dataclass
+class KlineWork:
+    symbol: object  # ExchangeSymbol
+    watermark_ms: int | None
+    daily_volume: float
+    priority: int
+    score: float = 0.0
+
+
+class KlineScheduler:
+    """
+    按优先级排序 kline 同步任务：成交额档位高、落后越多、ClxSymbol 标记越高的 symbol 越先同步，
+    watermark / 成交额各用一条 GROUP BY 查询批量取回
+    """
+
+    def __init__(self, interval: str, weights: PriorityWeights | None = None, doris_client=None):
+        self.interval = interval
+        self.interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        self.weights = weights or PriorityWeights()
+        self.doris_client = doris_client or get_doris()
+
+    async def _grouped(self, select: str, table: str, days: int) -> dict[tuple[int, int, str], object]:
+        since = ms_to_dt(int(time.time() * 1000) - days * MS_PER_DAY)
+        r = await self.doris_client.query(
+            f"""
+            SELECT exchange_id, inst_type, symbol, {select}
+            FROM {table}
+            WHERE dt >= '{since}'
+            GROUP BY exchange_id, inst_type, symbol
+            """
+        )
+        return {(int(row[0]), int(row[1]), row[2]): row[3] for row in r}
+
+    async def watermarks(self) -> dict[tuple[int, int, str], int]:
+        """(exchange_id, inst_type, symbol) → 最近 WATERMARK_DAYS 天内最新 bar 的毫秒 timestamp"""
+        r = await self._grouped("MAX(`timestamp`)", f"kline_{self.interval}", WATERMARK_DAYS)
+        return {key: int(ts) for key, ts in r.items() if ts is not None}
+
+    async def daily_volumes(self) -> dict[tuple[int, int, str], float]:
+        # 部分交易所没有 quote_volume，用 volume * close 近似
+        r = await self._grouped("SUM(COALESCE(quote_volume, volume * `close`))", "kline_1d", VOLUME_DAYS)
+        return {key: float(v) / VOLUME_DAYS for key, v in r.items() if v is not None}
+
+    def score(self, work: KlineWork, now_ms: int) -> float:
+        w = self.weights
+        tier = int(np.searchsorted(w.volume_tiers, work.daily_volume, side="right"))
+        if work.watermark_ms is None:
+            # 最近没有数据：按落后一整个 watermark 窗口计
+            lag = WATERMARK_DAYS * MS_PER_DAY // self.interval_ms
+        else:
+            lag = max(now_ms - work.watermark_ms, 0) // self.interval_ms
+        return w.tier * tier + w.staleness * math.log2(1 + lag) + w.flag * work.priority
+
+    async def plan(self, symbols: list, priorities: dict[int, int] | None = None) -> list[KlineWork]:
+        """
+        symbols: ExchangeSymbol 列表
+        priorities: ExchangeSymbol.id → ClxSymbol.sync_priority
+        返回按 score 从高到低排序的 KlineWork
+        """
+        priorities = priorities or {}
+        watermarks = await self.watermarks()
+        volumes = await self.daily_volumes()
+        now_ms = int(time.time() * 1000)
+
+        work = []
+        for s in symbols:
+            key = (s.exchange_id, s.inst_type, s.symbol)
+            item = KlineWork(s, watermarks.get(key), volumes.get(key, 0.0), priorities.get(s.id, 0))
+            item.score = self.score(item, now_ms)
+            work.append(item)
+        work.sort(key=lambda item: item.score, reverse=True)
+        return work
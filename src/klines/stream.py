@@ -0,0 +1,242 @@
+import asyncio
+import json
+import time
+
+import aiohttp
+from constants import INTERVAL_TO_SECONDS
+from prefect import get_run_logger
+
+from databases.doris.sink import get_kline_sink
+from utils.logger import logger as _logger
+
+from .batch import KlineBatch
+from .rollup import KlineRollup
+from .validate import flush_quarantine, quarantine_invalid
+
+
+class KlineStreamCollector:
+    """
+    单个 client 的 WebSocket 收盘 kline 采集：
+    - 按 client.ws_max_symbols 把 symbol 分组，每组一条连接多路订阅
+    - 断线 / 长时间无消息时指数退避重连并重新订阅，重连后用 REST get_kline 补齐断线期间的 bar
+    - 收盘 bar 按 flush_interval 聚成每 symbol 一个 KlineBatch 写入 KlineSink，
+      同时增量 rollup 出 1h / 1d，每 rollup_interval 落一次
+    """
+
+    def __init__(
+        self,
+        client,
+        symbols: list[str],
+        interval: str = "1m",
+        flush_interval: float = 1.0,
+        rollup_interval: float = 300.0,
+        stale_after: float = 90.0,
+        heartbeat: float = 20.0,
+        max_backoff: float = 60.0,
+        sink=None,
+    ):
+        try:
+            self.logger = get_run_logger()
+        except Exception:
+            self.logger = _logger
+        self.client = client
+        self.symbols = symbols
+        self.interval = interval
+        self.interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        self.flush_interval = flush_interval
+        self.rollup_interval = rollup_interval
+        self.stale_after = stale_after
+        self.heartbeat = heartbeat
+        self.max_backoff = max_backoff
+        self.sink = sink or get_kline_sink()
+        self.rollup = KlineRollup(doris_client=client.doris_client, sink=self.sink) if interval == "1m" else None
+
+        self._time_key = client.ws_fields["timestamp"]
+        self._time_scale = 1 if client.ws_time_unit == "ms" else 1000
+        # symbol → 尚未确认收盘的最新 bar (timestamp, item)
+        self._open: dict[str, tuple[int, list | dict]] = {}
+        # symbol → 待写入的收盘 bar
+        self._closed: dict[str, list] = {}
+        # symbol → 最后一根已写入的收盘 bar timestamp，用于去重和断线补齐
+        self._last_closed: dict[str, int] = {}
+        self._repairs: set[asyncio.Task] = set()
+        self._stopped = asyncio.Event()
+        self.stats = {"messages": 0, "candles": 0, "reconnects": 0, "repaired": 0}
+
+    async def run(self, max_runtime: float | None = None):
+        """运行到 max_runtime 秒后退出（None 表示一直运行），退出前 flush 全部数据"""
+        if not self.symbols:
+            return
+        self._stopped.clear()
+        groups = [
+            self.symbols[i : i + self.client.ws_max_symbols]
+            for i in range(0, len(self.symbols), self.client.ws_max_symbols)
+        ]
+        self.logger.info(
+            f"[{self.client.exchange_name}] streaming {len(self.symbols)} symbols over {len(groups)} connection(s)"
+        )
+        async with aiohttp.ClientSession() as session:
+            workers = [asyncio.create_task(self._run_connection(session, group)) for group in groups]
+            workers.append(asyncio.create_task(self._flush_periodically()))
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=max_runtime)
+            except TimeoutError:
+                pass
+            finally:
+                self._stopped.set()
+                for worker in (*workers, *self._repairs):
+                    worker.cancel()
+                await asyncio.gather(*workers, *self._repairs, return_exceptions=True)
+                await self._flush(final=True)
+        self.logger.info(f"[{self.client.exchange_name}] stream stopped: {self.stats}")
+
+    def stop(self):
+        self._stopped.set()
+
+    # ------------------------------------------------------------------
+    # 连接
+    # ------------------------------------------------------------------
+    async def _run_connection(self, session: aiohttp.ClientSession, symbols: list[str]):
+        backoff = 1.0
+        connected_before = False
+        while not self._stopped.is_set():
+            try:
+                async with session.ws_connect(self.client.ws_url, heartbeat=self.heartbeat) as ws:
+                    for message in self.client.ws_subscribe_messages(symbols, self.interval):
+                        if isinstance(message, str):
+                            await ws.send_str(message)
+                        else:
+                            await ws.send_json(message)
+                        await asyncio.sleep(self.client.ws_subscribe_delay)
+
+                    if connected_before:
+                        self.stats["reconnects"] += 1
+                        repair = asyncio.create_task(self._repair(symbols))
+                        self._repairs.add(repair)
+                        repair.add_done_callback(self._repairs.discard)
+                    connected_before = True
+                    backoff = 1.0
+
+                    pinger = asyncio.create_task(self._ping(ws)) if self.client.ws_ping_interval else None
+                    try:
+                        await self._receive(ws)
+                    finally:
+                        if pinger:
+                            pinger.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"[{self.client.exchange_name}] websocket error: {e!r}")
+
+            if self._stopped.is_set():
+                break
+            self.logger.info(f"[{self.client.exchange_name}] reconnecting in {backoff:.0f}s ({len(symbols)} symbols)")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _ping(self, ws: aiohttp.ClientWebSocketResponse):
+        while not ws.closed:
+            await asyncio.sleep(self.client.ws_ping_interval)
+            message = self.client.ws_ping_message()
+            if isinstance(message, str):
+                await ws.send_str(message)
+            elif message is not None:
+                await ws.send_json(message)
+
+    async def _receive(self, ws: aiohttp.ClientWebSocketResponse):
+        while not self._stopped.is_set():
+            # 超过 stale_after 没有任何消息视为假死，抛 TimeoutError 触发重连
+            msg = await ws.receive(timeout=self.stale_after)
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                if msg.data == "pong":
+                    continue
+                self.stats["messages"] += 1
+                for symbol, item, closed in self.client.ws_parse_kline(json.loads(msg.data)):
+                    self._on_candle(symbol, item, closed)
+            elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                raise ConnectionError(f"websocket closed: {msg.type.name} {msg.data}")
+
+    # ------------------------------------------------------------------
+    # 收盘判断与写入
+    # ------------------------------------------------------------------
+    def _on_candle(self, symbol: str, item: list | dict, closed: bool | None):
+        ts = int(item[self._time_key]) * self._time_scale
+        pending = self._open.get(symbol)
+        if closed is None and pending and ts > pending[0]:
+            # 交易所不推送收盘标记：新 bar 出现，上一根必然已收盘
+            self._emit(symbol, *pending)
+            self._open.pop(symbol)
+        if closed:
+            self._emit(symbol, ts, item)
+            self._open.pop(symbol, None)
+        else:
+            self._open[symbol] = (ts, item)
+
+    def _emit(self, symbol: str, ts: int, item: list | dict):
+        if ts <= self._last_closed.get(symbol, -1):
+            return
+        self._last_closed[symbol] = ts
+        self._closed.setdefault(symbol, []).append(item)
+
+    async def _put(self, batch: KlineBatch):
+        await self.sink.put(batch, "kline_" + self.interval)
+        if self.rollup:
+            self.rollup.add(batch)
+
+    async def _flush(self, final: bool = False):
+        closed, self._closed = self._closed, {}
+        for symbol, items in closed.items():
+            batch = KlineBatch.from_rows(
+                items,
+                self.client.ws_fields,
+                self.client.exchange_id,
+                self.client.inst_type,
+                symbol,
+                time_scale=self._time_scale,
+            ).align(self.interval_ms)
+            batch = await quarantine_invalid(batch, self.interval, self.sink)
+            self.stats["candles"] += len(batch)
+            await self._put(batch)
+        if final:
+            await self._flush_rollup()
+
+    async def _flush_rollup(self):
+        # 先让 1m 落盘，rollup seed 时才能从 Doris 读到本轮之前的分钟
+        await self.sink.flush()
+        if self.rollup:
+            await self.rollup.flush()
+            await self.sink.flush()
+
+    async def _flush_periodically(self):
+        last_rollup = time.monotonic()
+        while not self._stopped.is_set():
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._flush()
+                await flush_quarantine(self.sink, self.logger)
+                if time.monotonic() - last_rollup >= self.rollup_interval:
+                    last_rollup = time.monotonic()
+                    await self._flush_rollup()
+            except Exception as e:
+                self.logger.error(f"[{self.client.exchange_name}] stream flush failed: {e}")
+
+    async def _repair(self, symbols: list[str]):
+        """重连后用 REST 补齐断线期间的收盘 bar（只补已经收到过数据的 symbol）"""
+        for symbol in symbols:
+            last = self._last_closed.get(symbol)
+            if last is None:
+                continue
+            try:
+                async for batch in self.client.get_kline(
+                    symbol, self.interval, start_ms=last + self.interval_ms, scan_gaps=False
+                ):
+                    # 去掉当前未收盘的 bar，由 WebSocket 继续推送
+                    batch = batch.take(batch.timestamp < int(time.time() * 1000) // self.interval_ms * self.interval_ms)
+                    # 补齐期间 WebSocket 已经恢复，它推过的 bar 不能再写一次（rollup 会重复累加成交量）
+                    batch = batch.take(batch.timestamp > self._last_closed[symbol])
+                    if len(batch):
+                        self._last_closed[symbol] = int(batch.timestamp.max())
+                        self.stats["repaired"] += len(batch)
+                        await self._put(batch)
+            except Exception as e:
+                self.logger.error(f"[{self.client.exchange_name}] repair {symbol} failed: {e}")
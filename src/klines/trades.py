@@ -0,0 +1,110 @@
+from constants import INTERVAL_TO_SECONDS
+import numpy as np
+
+from .batch import KlineBatch
+
+
+class TradeKlineAggregator:
+    """
+    逐页接收按时间排序的成交（毫秒 timestamp / price / qty），用 numpy 按 bucket 归约成 OHLCV kline。
+
+    每页最后一个 bucket 可能延续到下一页，先留在 _pending，下一页到达或 finish 时再输出；
+    两笔成交之间没有成交的 bucket 用上一根 close 补成平 bar（volume / count 为 0），
+    与交易所 OHLC 接口的输出一致，写入后不会再被当作缺口扫描。
+    """
+
+    def __init__(self, exchange_id: int, inst_type: int, symbol: str, interval: str = "1m"):
+        self.exchange_id = exchange_id
+        self.inst_type = inst_type
+        self.symbol = symbol
+        self.interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        empty = np.empty(0, dtype=np.float64)
+        self._pending = (np.empty(0, dtype=np.int64), empty, empty)
+        # 下一根待输出 bar 的 bucket 和上一根 bar 的 close，用于跨页补平
+        self._next_bucket: int | None = None
+        self._last_close: float | None = None
+
+    def add(self, ts: np.ndarray, price: np.ndarray, qty: np.ndarray) -> KlineBatch | None:
+        """接收一页成交，返回已经完整的 bucket（没有时返回 None）"""
+        ts = np.concatenate([self._pending[0], ts])
+        price = np.concatenate([self._pending[1], price])
+        qty = np.concatenate([self._pending[2], qty])
+        if not len(ts):
+            return None
+        order = np.argsort(ts, kind="stable")
+        ts, price, qty = ts[order], price[order], qty[order]
+
+        # 最后一个 bucket 可能还有成交在下一页
+        cut = int(np.searchsorted(ts, ts[-1] // self.interval_ms * self.interval_ms))
+        self._pending = (ts[cut:], price[cut:], qty[cut:])
+        if cut == 0:
+            return None
+        return self._aggregate(ts[:cut], price[:cut], qty[:cut])
+
+    def finish(self, end_ms: int) -> KlineBatch | None:
+        """
+        成交已经取到 end_ms：输出剩余的 bucket，并把最后一笔成交之后到 end_ms 的空 bucket 补平；
+        只输出完整落在 end_ms 之前的 bucket
+        """
+        last_bucket = (end_ms + 1) // self.interval_ms * self.interval_ms - self.interval_ms
+        ts, price, qty = self._pending
+        keep = ts < last_bucket + self.interval_ms
+        self._pending = (ts[~keep], price[~keep], qty[~keep])
+        batches = []
+        if keep.any():
+            batches.append(self._aggregate(ts[keep], price[keep], qty[keep]))
+        if self._last_close is not None and self._next_bucket <= last_bucket:
+            batches.append(self._flat(np.arange(self._next_bucket, last_bucket + 1, self.interval_ms)))
+        return KlineBatch.concat(batches) if batches else None
+
+    def _aggregate(self, ts: np.ndarray, price: np.ndarray, qty: np.ndarray) -> KlineBatch:
+        iv = self.interval_ms
+        buckets = ts // iv * iv
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(ts)] - 1
+        bars = buckets[starts]
+
+        # 第一页从首笔成交所在 bucket 开始，之后接着上一页的 bucket 连续输出
+        first = bars[0] if self._next_bucket is None else self._next_bucket
+        timestamp = np.arange(first, bars[-1] + iv, iv, dtype=np.int64)
+        slot = (bars - first) // iv
+        present = np.zeros(len(timestamp), dtype=bool)
+        present[slot] = True
+        # 每个 bucket 之前（含）最近一根有成交 bar 的序号，-1 表示还在上一页的 close 之后
+        ordinal = np.cumsum(present) - 1
+        close = price[ends]
+        prev_close = np.where(ordinal >= 0, close[ordinal.clip(0)], self._last_close or np.nan)
+
+        columns = {name: prev_close.copy() for name in ("open", "high", "low")}
+        columns["open"][slot] = price[starts]
+        columns["high"][slot] = np.maximum.reduceat(price, starts)
+        columns["low"][slot] = np.minimum.reduceat(price, starts)
+        for name, values in (
+            ("volume", np.add.reduceat(qty, starts)),
+            ("quote_volume", np.add.reduceat(price * qty, starts)),
+            ("count", np.diff(np.r_[starts, len(ts)])),
+        ):
+            columns[name] = np.zeros(len(timestamp), dtype=values.dtype)
+            columns[name][slot] = values
+
+        self._next_bucket = int(timestamp[-1]) + iv
+        self._last_close = float(prev_close[-1])
+        return KlineBatch(self.exchange_id, self.inst_type, self.symbol, timestamp, close=prev_close, **columns)
+
+    def _flat(self, timestamp: np.ndarray) -> KlineBatch:
+        n = len(timestamp)
+        price = np.full(n, self._last_close)
+        self._next_bucket = int(timestamp[-1]) + self.interval_ms
+        return KlineBatch(
+            self.exchange_id,
+            self.inst_type,
+            self.symbol,
+            timestamp,
+            open=price,
+            high=price.copy(),
+            low=price.copy(),
+            close=price.copy(),
+            volume=np.zeros(n),
+            quote_volume=np.zeros(n),
+            count=np.zeros(n, dtype=np.int64),
+        )
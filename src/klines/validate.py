@@ -0,0 +1,180 @@
+from collections import Counter
+from functools import lru_cache
+import time
+
+from constants import INTERVAL_TO_SECONDS
+import numpy as np
+
+from .batch import KLINE_FIELDS, KlineBatch
+
+QUARANTINE_TABLE = "kline_quarantine"
+# quarantine 行在共享 sink 里单独缓冲、单独 StreamLoad：写入失败不会混进 kline 的 flush
+QUARANTINE_OWNER = "quarantine"
+
+# 2010-01-01 UTC 之前不可能有 crypto kline
+MIN_KLINE_MS = 1_262_304_000_000
+
+# 原因位：一行可以同时命中多个
+BAD_PRICE = 1 << 0  # 价格非有限或 <= 0
+BAD_RANGE = 1 << 1  # high / low 不包住 open / close（含 high < low）
+BAD_VOLUME = 1 << 2  # volume / quote_volume / count 为负或非有限
+VOLUME_SPIKE = 1 << 3  # volume 超过批内中位数 spike_factor 倍
+DUPLICATE = 1 << 4  # 对齐后 timestamp 重复（保留最后一根）
+BAD_TIMESTAMP = 1 << 5  # 对齐后 timestamp 早于 MIN_KLINE_MS 或晚于当前 bar
+
+REASONS = {
+    BAD_PRICE: "bad_price",
+    BAD_RANGE: "bad_range",
+    BAD_VOLUME: "bad_volume",
+    VOLUME_SPIKE: "volume_spike",
+    DUPLICATE: "duplicate",
+    BAD_TIMESTAMP: "bad_timestamp",
+}
+
+
+def reason_names(code: int) -> str:
+    return ",".join(name for bit, name in REASONS.items() if code & bit)
+
+
+class KlineValidator:
+    """
+    整批向量化校验 KlineBatch：
+    - 先走快速路径判断整批是否合法，全部通过时原 batch 原样返回，不复制数组
+    - 有坏行时才逐项计算原因位，坏行拆成 quarantine 行，计数按 (exchange_id, inst_type, 原因) 累计
+    - volume spike 需要足够样本估计中位数，小于 spike_min_rows 的 batch（如 WebSocket 单根）不检查
+    """
+
+    def __init__(self, spike_factor: float = 1000.0, spike_min_rows: int = 60):
+        self.spike_factor = spike_factor
+        self.spike_min_rows = spike_min_rows
+        self.counts: Counter = Counter()
+
+    def _reasons(self, batch: KlineBatch, interval_ms: int, now_ms: int) -> np.ndarray:
+        o, h, lo, c = batch.open, batch.high, batch.low, batch.close
+        codes = np.zeros(len(batch), dtype=np.uint8)
+
+        with np.errstate(invalid="ignore"):
+            codes[~((o > 0) & (h > 0) & (lo > 0) & (c > 0) & np.isfinite(o + h + lo + c))] |= BAD_PRICE
+            codes[(h < np.maximum(o, c)) | (lo > np.minimum(o, c))] |= BAD_RANGE
+            for name in ("volume", "quote_volume", "count"):
+                values = getattr(batch, name)
+                if values is not None:
+                    codes[~(values >= 0)] |= BAD_VOLUME
+
+            volume = batch.volume
+            if volume is not None and len(volume) >= self.spike_min_rows:
+                median = np.nanmedian(volume)
+                if median > 0:
+                    codes[volume > median * self.spike_factor] |= VOLUME_SPIKE
+
+        ts = batch.timestamp
+        codes[(ts < MIN_KLINE_MS) | (ts > now_ms + interval_ms)] |= BAD_TIMESTAMP
+        if len(ts) > 1 and not (ts[1:] > ts[:-1]).all():
+            # 同一 timestamp 保留最后一根（最新推送 / 最后一页）
+            _, last = np.unique(ts[::-1], return_index=True)
+            keep = np.zeros(len(ts), dtype=bool)
+            keep[len(ts) - 1 - last] = True
+            codes[~keep] |= DUPLICATE
+        return codes
+
+    def _is_clean(self, batch: KlineBatch, interval_ms: int, now_ms: int) -> bool:
+        """快速路径：只判断整批是否全部合法，不计算原因位"""
+        o, h, lo, c = batch.open, batch.high, batch.low, batch.close
+        ts = batch.timestamp
+        with np.errstate(invalid="ignore"):
+            ok = (lo > 0) & (lo <= np.minimum(o, c)) & (h >= np.maximum(o, c)) & np.isfinite(h)
+            if not ok.all():
+                return False
+            volume = batch.volume
+            if volume is not None:
+                if not (volume >= 0).all():
+                    return False
+                if len(batch) >= self.spike_min_rows:
+                    # min <= median：max 不超过 min 的 spike_factor 倍时不可能有 spike，省掉求中位数
+                    high_volume = volume.max()
+                    if high_volume > volume.min() * self.spike_factor:
+                        median = np.median(volume)
+                        if median > 0 and high_volume > median * self.spike_factor:
+                            return False
+            for values in (batch.quote_volume, batch.count):
+                if values is not None and not (values >= 0).all():
+                    return False
+        # 严格递增时首尾就是最小 / 最大 timestamp
+        if len(ts) > 1 and not (ts[1:] > ts[:-1]).all():
+            return False
+        return bool(MIN_KLINE_MS <= ts[0] and ts[-1] <= now_ms + interval_ms)
+
+    def split(self, batch: KlineBatch, interval: str, now_ms: int | None = None) -> tuple[KlineBatch, list[dict]]:
+        """返回 (合法行 batch, quarantine 行)"""
+        if not len(batch):
+            return batch, []
+        interval_ms = INTERVAL_TO_SECONDS[interval] * 1000
+        now_ms = now_ms or int(time.time() * 1000)
+        if self._is_clean(batch, interval_ms, now_ms):
+            return batch, []
+
+        codes = self._reasons(batch, interval_ms, now_ms)
+        bad = np.flatnonzero(codes)
+        if not len(bad):
+            return batch, []
+
+        for code, n in zip(*np.unique(codes[bad], return_counts=True), strict=True):
+            for bit, name in REASONS.items():
+                if code & bit:
+                    self.counts[(batch.exchange_id, int(batch.inst_type), name)] += int(n)
+        return batch.take(codes == 0), self._quarantine_rows(batch, bad, codes, interval)
+
+    @staticmethod
+    def _quarantine_rows(batch: KlineBatch, bad: np.ndarray, codes: np.ndarray, interval: str) -> list[dict]:
+        rows = [
+            {
+                "exchange_id": int(batch.exchange_id),
+                "inst_type": int(batch.inst_type),
+                "symbol": batch.symbol,
+                "interval": interval,
+                "timestamp": ts,
+                "reason": reason_names(code),
+            }
+            for ts, code in zip(batch.timestamp[bad].tolist(), codes[bad].tolist(), strict=True)
+        ]
+        for name in KLINE_FIELDS:
+            values = getattr(batch, name)
+            values = [None] * len(bad) if values is None else values[bad].tolist()
+            for row, v in zip(rows, values, strict=True):
+                # NaN / inf 写成 NULL
+                row[name] = v if v is None or np.isfinite(v) else None
+        return rows
+
+    def pop_counts(self) -> Counter:
+        counts, self.counts = self.counts, Counter()
+        return counts
+
+
+@lru_cache
+def get_kline_validator() -> KlineValidator:
+    return KlineValidator()
+
+
+async def quarantine_invalid(batch: KlineBatch, interval: str, sink) -> KlineBatch:
+    """校验 batch，坏行写入 kline_quarantine，返回合法行"""
+    batch, quarantined = get_kline_validator().split(batch, interval)
+    if quarantined:
+        await sink.put(quarantined, QUARANTINE_TABLE, owner=QUARANTINE_OWNER)
+    return batch
+
+
+async def flush_quarantine(sink, logger):
+    """落盘 quarantine 行；失败只记日志（坏行本身不入库，计数仍由 log_quarantine_counts 输出）"""
+    try:
+        await sink.flush(QUARANTINE_OWNER)
+    except Exception as e:
+        logger.error(f"Flush {QUARANTINE_TABLE} failed: {e}")
+
+
+def log_quarantine_counts(logger):
+    """按 (exchange_id, inst_type) 输出并清零本轮 quarantine 计数"""
+    by_exchange = {}
+    for (exchange_id, inst_type, reason), n in sorted(get_kline_validator().pop_counts().items()):
+        by_exchange.setdefault((exchange_id, inst_type), {})[reason] = n
+    for (exchange_id, inst_type), counts in by_exchange.items():
+        logger.warning(f"Quarantined klines for exchange_id={exchange_id} inst_type={inst_type}: {counts}")
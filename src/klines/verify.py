@@ -0,0 +1,193 @@
+"""
+抽样校验已入库的 1m kline 是否被交易所修订过。
+
+每个 symbol 在 lookback 窗口内随机抽几页（一页 = 交易所单次请求能返回的 bar 数，约十几个小时），
+对每个完整小时比较指纹：Doris 端 GROUP BY 小时算 count / OHLCV 之和 / 按分钟加权的 close 之和，
+本地对重新拉到的 bar 做同样的归约。只有不一致的小时用这次拉到的数据覆盖写回，
+一次请求可以校验十几个小时，请求量只是全量重拉的一小部分。
+1h bucket 随写回的整小时直接 rollup；1d bucket 需要整天的 1m，写回落盘后从 Doris 读出受影响的整天重新聚合。
+"""
+
+import random
+import time
+
+from constants import INTERVAL_TO_SECONDS
+import numpy as np
+from prefect import get_run_logger
+
+from databases.doris import get_doris
+from databases.doris.sink import get_kline_sink
+from utils.logger import logger as _logger
+from utils.timestamps import MS_PER_DAY, ms_to_dt
+
+from .batch import KlineBatch
+from .rollup import KlineRollup
+
+HOUR_MS = 3_600_000
+INTERVAL_MS = INTERVAL_TO_SECONDS["1m"] * 1000
+
+
+def fingerprints(batch: KlineBatch) -> dict[int, np.ndarray]:
+    """按 UTC 小时归约 batch，返回 hour_ms → 指纹；与 stored_fingerprints 的 SQL 一一对应"""
+    if not len(batch):
+        return {}
+    order = np.argsort(batch.timestamp, kind="stable")
+    ts = batch.timestamp[order]
+    hours = ts // HOUR_MS * HOUR_MS
+    starts = np.flatnonzero(np.r_[True, hours[1:] != hours[:-1]])
+    close = batch.close[order]
+    volume = np.nan_to_num(batch.volume[order]) if batch.volume is not None else np.zeros(len(ts))
+    minute = (ts % HOUR_MS) // INTERVAL_MS + 1
+    columns = [
+        np.diff(np.r_[starts, len(ts)]).astype(np.float64),
+        np.add.reduceat(batch.open[order], starts),
+        np.add.reduceat(batch.high[order], starts),
+        np.add.reduceat(batch.low[order], starts),
+        np.add.reduceat(close, starts),
+        np.add.reduceat(volume, starts),
+        np.add.reduceat(close * minute, starts),
+    ]
+    stacked = np.column_stack(columns)
+    return dict(zip(hours[starts].tolist(), stacked, strict=True))
+
+
+class KlineVerifier:
+    """
+    client: BaseClient；kline 接口需要支持 [start, end] 窗口（没有 end 参数的接口无法按页抽样）
+    sample_pages: 每个 symbol 抽几页
+    rtol / atol: 指纹比较容差，吸收 Doris DECIMAL 精度与交易所字符串之间的舍入
+    """
+
+    def __init__(
+        self,
+        client,
+        lookback_days: int = 30,
+        sample_pages: int = 2,
+        rtol: float = 1e-6,
+        atol: float = 1e-6,
+        seed: int | None = None,
+        doris_client=None,
+        sink=None,
+    ):
+        try:
+            self.logger = get_run_logger()
+        except Exception:
+            self.logger = _logger
+        self.client = client
+        self.lookback_days = lookback_days
+        self.sample_pages = sample_pages
+        self.rtol = rtol
+        self.atol = atol
+        self.random = random.Random(seed)
+        self.doris_client = doris_client or get_doris()
+        self.sink = sink or get_kline_sink()
+        self.stats = {"pages": 0, "hours": 0, "mismatched_hours": 0, "missing_hours": 0, "rewritten_rows": 0}
+
+    async def stored_fingerprints(self, symbol: str, start_ms: int, end_ms: int) -> dict[int, np.ndarray]:
+        r = await self.doris_client.query(
+            f"""
+            SELECT
+                `timestamp` DIV {HOUR_MS} * {HOUR_MS} AS h,
+                COUNT(*),
+                SUM(`open`),
+                SUM(`high`),
+                SUM(`low`),
+                SUM(`close`),
+                SUM(COALESCE(volume, 0)),
+                SUM(`close` * (`timestamp` % {HOUR_MS} DIV {INTERVAL_MS} + 1))
+            FROM kline_1m
+            WHERE exchange_id = {self.client.exchange_id}
+              AND inst_type = '{self.client.inst_type}'
+              AND symbol = '{symbol}'
+              AND dt BETWEEN '{ms_to_dt(start_ms)}' AND '{ms_to_dt(end_ms)}'
+            GROUP BY h
+            """
+        )
+        return {int(row[0]): np.array([float(v or 0) for v in row[1:]]) for row in r}
+
+    def sample_windows(self, page: int, onboard_ms: int | None = None) -> list[tuple[int, int]]:
+        """在 lookback 窗口内随机抽 sample_pages 个按小时对齐、互不重叠的页；最近 2 小时不抽（可能未收盘）"""
+        span = page // 60 * HOUR_MS
+        if span <= 0:
+            return []
+        now = int(time.time() * 1000) // HOUR_MS * HOUR_MS - 2 * HOUR_MS
+        lower = max(now - self.lookback_days * MS_PER_DAY, onboard_ms or 0)
+        lower = -(-lower // HOUR_MS) * HOUR_MS
+        slots = (now - lower) // span
+        if slots <= 0:
+            return []
+        picked = self.random.sample(range(slots), min(self.sample_pages, slots))
+        return sorted((lower + i * span, lower + (i + 1) * span - 1) for i in picked)
+
+    async def verify(self, symbol: str, onboard_ms: int | None = None) -> dict[str, int]:
+        """抽样校验一个 symbol，不一致的小时覆盖写回"""
+        client = self.client
+        if not (client.kline_endpoint and client.kline_endpoint.end_time_key):
+            raise ValueError(f"{client.exchange_name} kline endpoint cannot fetch a bounded window")
+        # 共享 sink 里按 symbol 隔离写入，flush 只等待、只抛出本 symbol 的 load
+        owner = ("verify", client.exchange_id, client.inst_type, symbol)
+        rollup = KlineRollup(intervals=("1h",), doris_client=self.doris_client, sink=self.sink, owner=owner)
+        days = set()
+        for start, end in self.sample_windows(client.page_size("1m"), onboard_ms):
+            batches = [
+                b
+                async for b in client.get_kline(
+                    symbol, "1m", start, end, force_start=True, scan_gaps=False, raise_errors=True
+                )
+            ]
+            self.stats["pages"] += 1
+            remote = fingerprints(KlineBatch.concat(batches)) if batches else {}
+            stored = await self.stored_fingerprints(symbol, start, end)
+
+            mismatched = []
+            for hour in range(start, end, HOUR_MS):
+                self.stats["hours"] += 1
+                if hour not in remote:
+                    if hour in stored:
+                        # 交易所这一小时没有数据而库里有：只记录，不删除
+                        self.stats["missing_hours"] += 1
+                        self.logger.warning(f"{symbol}: hour {hour} stored but not returned by exchange")
+                    continue
+                if hour not in stored or not np.allclose(stored[hour], remote[hour], rtol=self.rtol, atol=self.atol):
+                    mismatched.append(hour)
+            if not mismatched:
+                continue
+
+            self.stats["mismatched_hours"] += len(mismatched)
+            self.logger.warning(f"{symbol}: {len(mismatched)} revised hours in {start} → {end}: {mismatched}")
+            batch = KlineBatch.concat(batches)
+            rewrite = batch.take(np.isin(batch.timestamp // HOUR_MS * HOUR_MS, mismatched))
+            await self.sink.put(rewrite, "kline_1m", owner=owner)
+            rollup.add(rewrite)
+            days.update(h // MS_PER_DAY * MS_PER_DAY for h in mismatched)
+            self.stats["rewritten_rows"] += len(rewrite)
+
+        await self.sink.flush(owner)
+        await rollup.flush()
+        await self.sink.flush(owner)
+        if days:
+            await self._rollup_days(symbol, days, owner)
+        return self.stats
+
+    async def _rollup_days(self, symbol: str, days: set[int], owner):
+        r = await self.doris_client.query(
+            f"""
+            SELECT `timestamp`, `open`, `high`, `low`, `close`, volume, quote_volume, COALESCE(`count`, 0)
+            FROM kline_1m
+            WHERE exchange_id = {self.client.exchange_id}
+              AND inst_type = '{self.client.inst_type}'
+              AND symbol = '{symbol}'
+              AND dt BETWEEN '{ms_to_dt(min(days))}' AND '{ms_to_dt(max(days) + MS_PER_DAY - 1)}'
+            """
+        )
+        if not r:
+            return
+        names = ("timestamp", "open", "high", "low", "close", "volume", "quote_volume", "count")
+        batch = KlineBatch.from_rows(
+            r, dict(zip(names, range(len(names)), strict=True)), self.client.exchange_id, self.client.inst_type, symbol
+        )
+        batch = batch.take(np.isin(batch.timestamp // MS_PER_DAY * MS_PER_DAY, list(days)))
+        rollup = KlineRollup(intervals=("1d",), doris_client=self.doris_client, sink=self.sink, owner=owner)
+        rollup.add(batch)
+        await rollup.flush()
+        await self.sink.flush(owner)
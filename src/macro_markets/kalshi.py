@@ -1,5 +1,4 @@
 import asyncio
-from datetime import datetime
 import time
 from typing import Literal
 
@@ -181,7 +180,6 @@ class KalshiClient:
                         "ts": i["updated_ts"],
                         "event_ticker": i["event_ticker"],
                         "ticker": i["ticker"],
-                        "dt": datetime.fromtimestamp(i["updated_ts"] / 1000).strftime("%Y-%m-%d %H:%M:%S"),
                         "last_price": i.get("last_price"),
                         "yes_bid": i.get("yes_bid"),
                         "yes_ask": i.get("yes_ask"),
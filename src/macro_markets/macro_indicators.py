@@ -1,6 +1,7 @@
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import yfinance as yf
 
 from databases.doris import get_stream_loader
@@ -31,6 +32,9 @@ MACRO_SYMBOLS = {
     "SSEC": "000001.SS",  # 上证指数 - A股整体代表
 }
 
+# 写入列 → yfinance DataFrame 列
+OHLCV_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
 
 def _download_symbol(yf_symbol: str):
     """使用同步的 yfinance 下载单个 symbol 的数据"""
@@ -65,18 +69,18 @@ async def get_macro_klines(logger):
         if df is None or df.empty:
             continue
 
-        # 3) 处理 K线
-        for ts, row in df.iterrows():
+        # 3) 处理 K线：按列取出，index 统一转成 UTC 毫秒
+        ts = df.index.values.astype("datetime64[ms]").astype(np.int64).tolist()
+        columns = {
+            name: df[col].to_numpy(dtype=np.float64).reshape(len(df), -1)[:, 0].tolist()
+            for name, col in OHLCV_COLUMNS.items()
+        }
+        for i, t in enumerate(ts):
             results.append(
                 {
-                    "ts": int(ts.timestamp()) * 1000,
-                    "dt": ts.strftime("%Y-%m-%d %H:%M:%S"),
+                    "ts": t,
                     "symbol": key,
-                    "open": float(row["Open"].iloc[0]),
-                    "high": float(row["High"].iloc[0]),
-                    "low": float(row["Low"].iloc[0]),
-                    "close": float(row["Close"].iloc[0]),
-                    "volume": float(row["Volume"].iloc[0]),
+                    **{name: values[i] for name, values in columns.items()},
                     "source": "yfinance",
                 }
             )
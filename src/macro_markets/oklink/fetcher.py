@@ -1,6 +1,5 @@
 import asyncio
 from collections import defaultdict
-from datetime import UTC, datetime
 from typing import Literal
 from uuid import uuid4
 
@@ -99,7 +98,6 @@ class OklinkOnchainInfo:
                     {
                         "ts": i["timestamp"],
                         "exchange_id": exchange.id,
-                        "dt": datetime.fromtimestamp(i["timestamp"] / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
                         "netflow": i["totalValue"],
                     }
                 )
@@ -182,7 +180,6 @@ class OklinkOnchainInfo:
                 {
                     "chain": tx["chain"],
                     "ts": tx["timestamp"],
-                    "dt": datetime.fromtimestamp(tx["timestamp"] / 1000, tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
                     "tx_hash": tx["txHash"],
                     "from_address": tx["fromAddress"],
                     "from_tag": from_tag,
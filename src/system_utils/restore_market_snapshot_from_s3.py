@@ -168,8 +168,8 @@ async def restore_from_s3(symbol, exchange_id, inst_type, day, hour, logger):
       AND dt < ?
     """
 
-    batch = []
-    for row in sqlite_cur.execute(
+    # cursor 直接作为 rows 流式发送（chunked），不在内存里攒整小时的行
+    sqlite_cur.execute(
         sql,
         (
             symbol,
@@ -178,14 +178,22 @@ async def restore_from_s3(symbol, exchange_id, inst_type, day, hour, logger):
             hour_start,
             hour_end,
         ),
-    ):
-        batch.append(row)
-
-    if batch:
-        logger.info("Sending rows..." + str(len(batch)))
-        res = await stream_loader.send_rows(
-            batch, "market_snapshot", column_names=[i[0] for i in sqlite_cur.description]
-        )
+    )
+
+    logger.info("Sending rows...")
+    # 同一个 symbol / 小时的备份重跑时 label 相同，Doris 返回 Label Already Exists，不会重复导入
+    res = await stream_loader.send_rows(
+        sqlite_cur,
+        "market_snapshot",
+        column_names=[i[0] for i in sqlite_cur.description],
+        stream=True,
+        label_key=f"restore-{symbol}-{exchange_id}-{inst_type}-{hour_start:%Y%m%d%H}",
+    )
+    if res is not None:
+        if res.get("Duplicate"):
+            logger.info(f"{symbol} {hour_start:%Y-%m-%d %H}:00 already restored, skipped")
+        else:
+            logger.info(f"Loaded {res.get('NumberLoadedRows')} rows")
         if res["Status"] != "Success":
             raise RuntimeError(f"Failed to restore {symbol} {hour_start:%Y-%m-%d %H}:00")
     sqlite_conn.close()
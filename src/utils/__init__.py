@@ -1,6 +1,9 @@
-from datetime import UTC, datetime
 from decimal import Decimal
 
+from .timestamps import align_to_5m
+
+__all__ = ["align_to_5m", "precision", "to_decimal_str"]
+
 
 def precision(x):
     if x is None:
@@ -15,15 +18,3 @@ def to_decimal_str(precision: int) -> str:
     """
     d = Decimal(1) / (Decimal(10) ** precision)
     return f"{d:.{precision}f}"
-
-
-def align_to_5m(ms: int | str) -> datetime:
-    """
-    将毫秒时间戳对齐到整 5 分钟
-    如 13:07 → 13:05；13:04 → 13:00
-    返回 UTC datetime
-    """
-    dt = datetime.fromtimestamp(int(ms) / 1000, tz=UTC)
-    minute = dt.minute - (dt.minute % 5)
-    aligned = dt.replace(minute=minute, second=0, microsecond=0)
-    return int(aligned.timestamp() * 1000)
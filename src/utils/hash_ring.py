@@ -0,0 +1,26 @@
+from bisect import bisect
+import hashlib
+
+
+def _hash(value: str) -> int:
+    """跨进程稳定的 64 位 hash（内置 hash() 受 PYTHONHASHSEED 影响）"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """
+    一致性 hash 环：每个 shard 在环上放 vnodes 个虚拟节点，key 归属顺时针第一个虚拟节点。
+    shard 数从 N 调到 N+1 时只有约 1/(N+1) 的 key 换 shard。
+    """
+
+    def __init__(self, shards: int, vnodes: int = 128):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.shards = shards
+        points = sorted((_hash(f"shard-{shard}#{v}"), shard) for shard in range(shards) for v in range(vnodes))
+        self._points = [p for p, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_of(self, key: str) -> int:
+        i = bisect(self._points, _hash(key))
+        return self._owners[i % len(self._points)]
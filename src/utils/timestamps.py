@@ -0,0 +1,65 @@
+"""
+统一的时间戳工具：毫秒时间戳 ↔ Doris DATETIME 字符串，一律按 UTC。
+
+- 对齐用整数运算，不构造 datetime
+- ms_to_dt_array 按数组批量转换：日期部分按天去重后格式化一次，
+  时分秒查 86400 项的预生成表，避免逐行 strftime
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from functools import lru_cache
+import time
+
+import numpy as np
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+MS_PER_SECOND = 1000
+MS_PER_DAY = 86_400_000
+
+
+def align_ms(ms: int | str | np.ndarray, interval_ms: int) -> int | np.ndarray:
+    """毫秒时间戳向下对齐到 interval_ms 的整数倍；ndarray 按元素对齐"""
+    if isinstance(ms, np.ndarray):
+        return ms.astype(np.int64) // interval_ms * interval_ms
+    return int(ms) // interval_ms * interval_ms
+
+
+def align_to_5m(ms: int | str | np.ndarray) -> int | np.ndarray:
+    """
+    将毫秒时间戳对齐到整 5 分钟
+    如 13:07 → 13:05；13:04 → 13:00
+    """
+    return align_ms(ms, 300_000)
+
+
+def ms_to_dt(ms: int | str | float) -> str:
+    """单个毫秒时间戳 → 'YYYY-MM-DD HH:MM:SS'（UTC）"""
+    return time.strftime(DT_FORMAT, time.gmtime(int(ms) // MS_PER_SECOND))
+
+
+def dt_to_ms(dt: datetime) -> int:
+    """datetime → 毫秒时间戳；naive datetime 视为 UTC"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return int(dt.timestamp() * MS_PER_SECOND)
+
+
+@lru_cache(maxsize=1)
+def _time_of_day_table() -> list[str]:
+    return [f" {h:02d}:{m:02d}:{s:02d}" for h in range(24) for m in range(60) for s in range(60)]
+
+
+def ms_to_dt_array(ms: Sequence | np.ndarray) -> list[str]:
+    """批量毫秒时间戳 → 'YYYY-MM-DD HH:MM:SS' 列表（UTC），顺序与输入一致"""
+    ms = np.asarray(ms, dtype=np.int64).reshape(-1)
+    if ms.size == 0:
+        return []
+    days, ms_of_day = np.divmod(ms, MS_PER_DAY)
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    dates = np.datetime_as_string(unique_days.astype("datetime64[D]")).tolist()
+    time_of_day = _time_of_day_table()
+    return [
+        dates[d] + time_of_day[s]
+        for d, s in zip(day_index.tolist(), (ms_of_day // MS_PER_SECOND).tolist(), strict=True)
+    ]
@@ -0,0 +1,72 @@
+from datetime import date
+import gzip
+import hashlib
+import io
+import zipfile
+
+from constants import InstType
+from klines.archive import ARCHIVE_SPECS, KlineArchiveIngester, LocalArchiveStore, iter_periods
+import pytest
+
+BASE = 1_735_689_600_000  # 2025-01-01 UTC
+
+
+def test_iter_periods_uses_monthly_for_whole_months():
+    assert iter_periods(date(2024, 1, 30), date(2024, 3, 2)) == [
+        ("daily", "2024-01-30"),
+        ("daily", "2024-01-31"),
+        ("monthly", "2024-02"),
+        ("daily", "2024-03-01"),
+        ("daily", "2024-03-02"),
+    ]
+
+
+def write_binance(root, period: str, rows: str, checksum: str | None = None) -> None:
+    key = f"data/spot/daily/klines/BTCUSDT/1m/BTCUSDT-1m-{period}.zip"
+    path = root / key
+    path.parent.mkdir(parents=True)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(f"BTCUSDT-1m-{period}.csv", rows)
+    path.write_bytes(buffer.getvalue())
+    digest = checksum or hashlib.sha256(buffer.getvalue()).hexdigest()
+    (root / (key + ".CHECKSUM")).write_text(f"{digest}  BTCUSDT-1m-{period}.zip\n")
+
+
+def read(root, exchange: str, period: str, symbol: str = "BTCUSDT"):
+    spec = ARCHIVE_SPECS[(exchange, InstType.SPOT)]
+    ingester = KlineArchiveIngester(LocalArchiveStore(root), sink=object())
+    return ingester._read_archive(spec, 1, symbol, "1m", "daily", period)
+
+
+def test_binance_microsecond_archive(tmp_path):
+    # 2025 起 Binance spot 归档的时间戳是微秒
+    rows = "".join(
+        f"{(BASE + i * 60_000) * 1000},1.0,2.0,0.5,1.5,10.0,{(BASE + i * 60_000 + 59_999) * 1000},15.0,{i + 1},5.0,7.5,0\n"
+        for i in range(3)
+    )
+    write_binance(tmp_path, "2025-01-01", rows)
+    archive = read(tmp_path, "binance", "2025-01-01")
+    assert archive.batch.timestamp.tolist() == [BASE, BASE + 60_000, BASE + 120_000]
+    assert archive.batch.quote_volume.tolist() == [15.0] * 3
+    assert archive.batch.count.tolist() == [1, 2, 3]
+    assert read(tmp_path, "binance", "2025-01-02") is None
+
+
+def test_binance_checksum_mismatch(tmp_path):
+    write_binance(tmp_path, "2025-01-01", f"{BASE},1,2,0.5,1.5,10,{BASE + 59_999},15,1,5,7.5,0\n", checksum="0" * 64)
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        read(tmp_path, "binance", "2025-01-01")
+
+
+def test_bybit_header_and_second_timestamps(tmp_path):
+    key = tmp_path / "bybit/spot/daily/klines/BTCUSDT/1/BTCUSDT-1-2025-01-01.csv.gz"
+    key.parent.mkdir(parents=True)
+    csv = "start_time,open,high,low,close,volume,turnover\n" + "".join(
+        f"{BASE // 1000 + i * 60},1.0,2.0,0.5,1.5,10.0,15.0\n" for i in range(2)
+    )
+    key.write_bytes(gzip.compress(csv.encode()))
+    archive = read(tmp_path, "bybit", "2025-01-01")
+    assert archive.batch.timestamp.tolist() == [BASE, BASE + 60_000]
+    assert archive.batch.close.tolist() == [1.5, 1.5]
+    assert archive.batch.count is None
@@ -0,0 +1,122 @@
+import asyncio
+
+from klines.backfill import BackfillChunk, BackfillWorker, split_chunks
+from klines.batch import KlineBatch
+import numpy as np
+
+from utils.timestamps import MS_PER_DAY
+
+HOUR = 3_600_000
+BASE = 1_700_000_000_000 // MS_PER_DAY * MS_PER_DAY
+
+
+def test_split_chunks_aligns_to_utc_days():
+    start, end = BASE + 5 * HOUR, BASE + 10 * MS_PER_DAY + 3 * HOUR
+    chunks = split_chunks(start, end, chunk_days=4)
+    assert chunks == [
+        (start, BASE + 4 * MS_PER_DAY - 1),
+        (BASE + 4 * MS_PER_DAY, BASE + 8 * MS_PER_DAY - 1),
+        (BASE + 8 * MS_PER_DAY, end),
+    ]
+    assert split_chunks(start, start, chunk_days=7) == [(start, start)]
+    assert split_chunks(end, start, chunk_days=7) == []
+
+
+class FakeSink:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.rows: dict = {}
+        self.flushed: dict = {}
+
+    async def put(self, batch, table, owner=None):
+        self.rows.setdefault(owner, []).extend(batch.timestamp.tolist())
+
+    async def flush(self, owner=None):
+        if self.fail:
+            raise RuntimeError("load failed")
+        self.flushed.setdefault(owner, []).extend(self.rows.pop(owner, []))
+
+
+class FakeClient:
+    """每页 10 根 1h bar，拉到 fail_after 页后抛错"""
+
+    def __init__(self, pages: int = 3, fail_after: int | None = None, delay: float = 0.0):
+        self.pages = pages
+        self.fail_after = fail_after
+        self.delay = delay
+
+    async def resolve_onboard_time(self, symbol, onboard_ms):
+        return onboard_ms
+
+    async def get_kline(self, symbol, interval, start_ms, end_ms, **kwargs):
+        for page in range(self.pages):
+            if page == self.fail_after:
+                raise RuntimeError("exchange error")
+            await asyncio.sleep(self.delay)
+            ts = start_ms + (np.arange(10) + page * 10) * HOUR
+            yield KlineBatch.from_columns(
+                {
+                    "timestamp": ts,
+                    "open": ts * 0.0 + 1,
+                    "high": ts * 0.0 + 2,
+                    "low": ts * 0.0 + 1,
+                    "close": ts * 0.0 + 1,
+                },
+                1,
+                1,
+                symbol,
+            )
+
+
+class FakeQueueWorker(BackfillWorker):
+    """kline_backfill_chunk 的状态迁移记在内存里，不连 MySQL"""
+
+    def __init__(self, client, renew: bool = True, **kwargs):
+        super().__init__(lambda exchange_id, inst_type: client, **kwargs)
+        self.renew = renew
+        self.transitions: list[tuple] = []
+
+    async def _renew(self, chunk):
+        self.transitions.append(("renew",))
+        return self.renew
+
+    async def _complete(self, chunk):
+        self.transitions.append(("done",))
+
+    async def _fail(self, chunk, cursor_ts, error):
+        self.transitions.append(("retry", cursor_ts, str(error)))
+
+
+def chunk() -> BackfillChunk:
+    return BackfillChunk(1, 1, 1, 1, "BTC-USDT", "1h", cursor_ts=BASE, end_ts=BASE + 7 * MS_PER_DAY - 1, attempts=0)
+
+
+def test_chunk_done_after_flush():
+    sink = FakeSink()
+    worker = FakeQueueWorker(FakeClient(), sink=sink)
+    asyncio.run(worker.process(chunk()))
+    assert worker.transitions == [("done",)]
+    assert len(sink.flushed[("backfill", 1)]) == 30
+
+
+def test_fetch_error_lands_fetched_rows_and_advances_cursor():
+    sink = FakeSink()
+    worker = FakeQueueWorker(FakeClient(fail_after=2), sink=sink)
+    asyncio.run(worker.process(chunk()))
+    assert worker.transitions == [("retry", BASE + 20 * HOUR, "exchange error")]
+    assert len(sink.flushed[("backfill", 1)]) == 20
+
+
+def test_load_error_keeps_cursor():
+    worker = FakeQueueWorker(FakeClient(), sink=FakeSink(fail=True))
+    asyncio.run(worker.process(chunk()))
+    assert worker.transitions == [("retry", BASE, "load failed")]
+
+
+def test_lost_lease_leaves_chunk_to_new_owner():
+    sink = FakeSink()
+    worker = FakeQueueWorker(FakeClient(pages=5, delay=0.05), renew=False, sink=sink, lease_seconds=0.15)
+    asyncio.run(worker.process(chunk()))
+    # 续租失败后既不标记 DONE 也不退回 PENDING，已拉到的行照常落盘
+    assert worker.transitions == [("renew",)]
+    assert 0 < len(sink.flushed[("backfill", 1)]) < 50
@@ -0,0 +1,23 @@
+from klines.batch import KlineBatch
+import numpy as np
+
+
+def test_to_tsv_fixed_point():
+    batch = KlineBatch.from_columns(
+        {
+            "timestamp": [1, 2],
+            "open": [1e-8, 0.5],
+            "high": [1.23e-5, 2e16],
+            "low": [5e-9, 0.0],
+            "close": [9.87654321e-7, np.nan],
+        },
+        1,
+        1,
+        "PEPE-USDT",
+    )
+    lines = [line.split("\t") for line in batch.to_tsv().split("\n")]
+    assert lines == [
+        ["PEPE-USDT", "1", "0.00000001", "0.0000123", "0.000000005", "0.000000987654321"],
+        ["PEPE-USDT", "2", "0.5", "20000000000000000", "0.0", ""],
+    ]
+    assert all("e" not in value for line in lines for value in line[1:])
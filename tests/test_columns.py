@@ -0,0 +1,20 @@
+from databases.doris.columns import columns_header, payload_columns
+
+KLINE = ["exchange_id", "inst_type", "symbol", "timestamp", "open", "close", "dt"]
+
+
+def test_computed_and_constant_columns_are_not_serialized():
+    constants = {"exchange_id": 3, "inst_type": 1}
+    payload = payload_columns("kline_1m", KLINE, constants)
+    assert payload == ["symbol", "timestamp", "open", "close"]
+
+    header, has_computed = columns_header("kline_1m", payload, constants)
+    assert header == "symbol,timestamp,open,close,dt=from_unixtime(`timestamp` div 1000),exchange_id=3,inst_type=1"
+    assert has_computed
+
+
+def test_string_constants_are_quoted():
+    header, has_computed = columns_header("unknown_table", ["a"], {"name": "o'neil", "flag": True, "x": 1.5})
+    assert header == "a,name='o''neil',flag=1,x=1.5"
+    assert not has_computed
+    assert payload_columns("unknown_table", ["a", "dt"]) == ["a", "dt"]
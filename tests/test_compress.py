@@ -0,0 +1,78 @@
+import asyncio
+
+from klines.batch import KlineBatch
+import pytest
+
+from databases.doris import DorisStreamLoader
+from databases.doris.compress import (
+    COMPRESS_TYPES,
+    LARGE_BYTES,
+    MIN_COMPRESS_BYTES,
+    available,
+    choose,
+    compress,
+    compressor,
+    decompress,
+)
+
+PAYLOAD = b"".join(b"BTC\t%d\t1.0\t2.0\t0.5\t1.5\n" % (i * 60_000) for i in range(20_000))
+
+
+def test_choose():
+    assert choose("none", LARGE_BYTES) is None
+    assert choose(None, LARGE_BYTES) is None
+    assert choose("auto", MIN_COMPRESS_BYTES - 1) is None
+    assert choose("gz", 10) == "gz"
+    assert choose("auto", MIN_COMPRESS_BYTES) == ("lz4" if available("lz4") else "zstd" if available("zstd") else "gz")
+    assert choose("auto", LARGE_BYTES) == ("zstd" if available("zstd") else "lz4" if available("lz4") else "gz")
+    # 未安装的可选依赖退回 gzip
+    for compress_type in ("lz4", "zstd"):
+        assert choose(compress_type, 10) == (compress_type if available(compress_type) else "gz")
+    with pytest.raises(ValueError):
+        choose("brotli", 10)
+
+
+@pytest.mark.parametrize("compress_type", COMPRESS_TYPES)
+def test_round_trip(compress_type):
+    if not available(compress_type):
+        pytest.skip(f"{compress_type} is not installed")
+    body = compress(PAYLOAD, compress_type)
+    assert len(body) < len(PAYLOAD) / 4
+    assert decompress(body, compress_type) == PAYLOAD
+
+    # 流式压缩逐块输出，拼起来与整体压缩同格式
+    stream = compressor(compress_type)
+    chunks = [stream.compress(PAYLOAD[i : i + 65536]) for i in range(0, len(PAYLOAD), 65536)]
+    assert decompress(b"".join(chunks) + stream.flush(), compress_type) == PAYLOAD
+
+
+class Resp:
+    status = 200
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_send_rows_compresses_body(monkeypatch, stream):
+    monkeypatch.setenv("DORIS_HOST", "fe")
+    monkeypatch.setenv("DORIS_USER", "root")
+    doris = DorisStreamLoader(load_format="csv", compress_type="gz", stream=stream, cache_redirects=False)
+    sent = []
+
+    async def request(url, data, headers, auth):
+        body = b"".join([chunk async for chunk in data()]) if callable(data) else bytes(data)
+        sent.append((headers, body))
+        return Resp(), {"Status": "Success"}
+
+    doris._send_streamload_request_async = request
+    n = 5_000
+    ts = [i * 60_000 for i in range(n)]
+    batch = KlineBatch.from_columns(
+        {"timestamp": ts, "open": [1.0] * n, "high": [2.0] * n, "low": [0.5] * n, "close": [1.5] * n}, 1, 1, "BTC"
+    )
+    asyncio.run(doris.send_rows(batch, "kline_1m"))
+
+    headers, body = sent[0]
+    assert headers["compress_type"] == "gz"
+    assert decompress(body, "gz").decode().rstrip("\n") == batch.to_tsv()
+    stats = doris.stats["kline_1m"]
+    assert stats["sent_bytes"] == len(body)
+    assert stats["raw_bytes"] > 4 * stats["sent_bytes"]
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from constants import InstType
+import pytest
+
+from exchanges._base_ import BaseClient
+from utils.logger import logger
+
+MINUTE = 60_000
+NOW = int(time.time() * 1000) // MINUTE * MINUTE
+
+
+class FakeSink:
+    async def put(self, rows, table, owner=None):
+        pass
+
+
+class FakeExchange(BaseClient):
+    """
+    交易所的替身：listed_ms 起每分钟一根 bar，[startTime, endTime] 两端都含；
+    单次最多返回 min(limit, cap) 根（保留最早的），limit 超过 error_above 时报错
+    """
+
+    exchange_name = "fake"
+    inst_type = InstType.SPOT
+    base_url = "https://example.invalid"
+
+    def __init__(self, listed_ms: int, cap: int = 1000, error_above: int | None = None):
+        # 不连 Doris / MySQL；页大小缓存按实例隔离
+        self._exchange_id = 1
+        self._page_sizes = {}
+        self.logger = logger
+        self.kline_sink = FakeSink()
+        self.listed_ms = listed_ms
+        self.cap = cap
+        self.error_above = error_above
+        self.requests: list[tuple[int, int, int]] = []
+
+    async def get_all_symbols(self):
+        return []
+
+    async def send_request(self, method, endpoint, params=None, **kwargs):
+        start, end, limit = params["startTime"], params["endTime"], params["limit"]
+        self.requests.append((start, end, limit))
+        if self.error_above and limit > self.error_above:
+            raise RuntimeError(f"limit {limit} too large")
+        first = -(-max(start, self.listed_ms) // MINUTE) * MINUTE
+        ts = list(range(first, min(end, NOW) + 1, MINUTE))[: min(limit, self.cap)]
+        return [[t, 1.0, 2.0, 0.5, 1.5, 10.0] for t in ts]
+
+    def fetch(self, start_ms: int, end_ms: int | None = None, declared: int = 100, **kwargs) -> list[int]:
+        async def collect():
+            return [
+                t
+                async for batch in self._get_kline(
+                    url="/klines",
+                    params={"symbol": "BTCUSDT", "limit": declared},
+                    get_data=lambda data: data,
+                    fields={"timestamp": 0, "open": 1, "high": 2, "low": 3, "close": 4, "volume": 5},
+                    start_time_key="startTime",
+                    end_time_key="endTime",
+                    limit=declared,
+                    symbol="BTCUSDT",
+                    start_ms=start_ms,
+                    end_ms=end_ms,
+                    sleep_ms=0,
+                    force_start=True,
+                    scan_gaps=False,
+                    **kwargs,
+                )
+                for t in batch.timestamp.tolist()
+            ]
+
+        return asyncio.run(collect())
+
+
+def test_start_is_clamped_to_onboard_time():
+    listed = NOW - 30 * MINUTE
+    client = FakeExchange(listed)
+    client._page_sizes[("fake", InstType.SPOT.value, "1m")] = 100
+    # 上架时间向下对齐到 bar 开盘时间
+    bars = client.fetch(NOW - 10_000 * MINUTE, onboard_ms=listed + 5_000)
+    assert bars == list(range(listed, NOW + 1, MINUTE))
+    # 上架前的空窗口一个请求都不发
+    assert [start for start, _, _ in client.requests] == [listed]
+
+
+def test_not_listed_yet_sends_no_request():
+    client = FakeExchange(NOW)
+    assert client.fetch(NOW - 100 * MINUTE, end_ms=NOW - MINUTE, onboard_ms=NOW) == []
+    assert client.requests == []
+
+
+def page_size(client: FakeExchange, declared: int) -> int:
+    client.fetch(NOW - 10 * MINUTE, declared=declared)
+    return client.page_size("1m")
+
+
+@pytest.mark.parametrize(
+    ("declared", "cap", "error_above", "expected"),
+    [
+        (1000, 300, None, 300),  # 声明偏大：按实际截断的页大小分页
+        (100, 1000, None, 1000),  # 声明偏小：翻倍直到被截断
+        (100, 5000, 400, 400),  # 更大的 limit 报错：停在上一个可用值
+    ],
+)
+def test_discovered_page_size(declared, cap, error_above, expected):
+    client = FakeExchange(NOW - 30 * 86_400_000, cap=cap, error_above=error_above)
+    assert page_size(client, declared) == expected
+
+
+def test_recent_listing_is_not_a_page_cap():
+    # 探测窗口（一天前结束）里只有最后 50 根：是刚上架，不是单页上限
+    client = FakeExchange(NOW - 86_400_000 - 49 * MINUTE, cap=1000)
+    assert page_size(client, 100) == 100
+
+
+def test_pages_follow_discovered_size_without_gaps():
+    client = FakeExchange(NOW - 30 * 86_400_000, cap=300)
+    start = NOW - 2_000 * MINUTE
+    assert client.fetch(start, declared=1000) == list(range(start, NOW + 1, MINUTE))
+    pages = [limit for _, _, limit in client.requests][-7:]
+    assert pages == [300] * 7
@@ -0,0 +1,34 @@
+from collections import Counter
+
+import pytest
+
+from utils.hash_ring import ConsistentHashRing
+
+KEYS = [
+    f"{exchange_id}:{inst_type}:SYM{i}-USDT" for exchange_id in range(1, 6) for inst_type in (1, 2) for i in range(500)
+]
+
+
+def test_assignment_is_stable_and_balanced():
+    ring = ConsistentHashRing(4)
+    owners = [ring.shard_of(key) for key in KEYS]
+    rebuilt = ConsistentHashRing(4)
+    # 与进程无关：同样的参数重建出同样的分配
+    assert owners == list(map(rebuilt.shard_of, KEYS))
+    counts = Counter(owners)
+    assert set(counts) == {0, 1, 2, 3}
+    assert max(counts.values()) < 1.5 * len(KEYS) / 4
+
+
+def test_adding_a_shard_moves_few_keys():
+    before, after = ConsistentHashRing(4), ConsistentHashRing(5)
+    moved = [key for key in KEYS if before.shard_of(key) != after.shard_of(key)]
+    # 只有约 1/5 的 key 换 shard，且都换到新 shard
+    assert len(moved) < 0.3 * len(KEYS)
+    assert {after.shard_of(key) for key in moved} == {4}
+
+
+def test_single_shard_and_invalid_count():
+    assert set(map(ConsistentHashRing(1).shard_of, KEYS)) == {0}
+    with pytest.raises(ValueError):
+        ConsistentHashRing(0)
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from constants import InstType
+from klines.batch import KlineBatch
+import numpy as np
+
+from exchanges._base_ import BaseClient
+from utils.logger import logger
+
+MINUTE = 60_000
+
+
+class FakeSink:
+    def __init__(self):
+        self.rows = []
+
+    async def put(self, batch, table, owner=None):
+        self.rows += batch.timestamp.tolist()
+
+
+class TailClient(BaseClient):
+    """交易所的替身：按 pages 依次返回 bar，记录 kline_open_bar 的写入"""
+
+    exchange_name = "tail"
+    inst_type = InstType.SPOT
+    base_url = "https://example.invalid"
+
+    def __init__(self, pages: list[list[int]]):
+        # 不连 Doris / MySQL
+        self.pages = pages
+        self.logger = logger
+        self.kline_sink = FakeSink()
+        self.tracked: list[int | None] = []
+        self.kwargs: dict = {}
+
+    async def get_all_symbols(self):
+        return []
+
+    async def get_kline(self, symbol, interval, start_ms=None, end_ms=None, **kwargs):
+        self.kwargs = kwargs
+        for page in self.pages:
+            ts = np.array(page, dtype=np.int64)
+            yield KlineBatch.from_columns(
+                {
+                    "timestamp": ts,
+                    "open": ts * 0.0 + 1,
+                    "high": ts * 0.0 + 1,
+                    "low": ts * 0.0 + 1,
+                    "close": ts * 0.0 + 1,
+                },
+                1,
+                1,
+                symbol,
+            )
+
+    async def _track_open_bar(self, symbol, interval, open_ts):
+        self.tracked.append(open_ts)
+
+
+def current_minute() -> int:
+    return int(time.time() * 1000) // MINUTE * MINUTE
+
+
+def test_open_bar_is_tracked():
+    now = current_minute()
+    client = TailClient([[now - 3 * MINUTE, now - 2 * MINUTE], [now - MINUTE, now]])
+    asyncio.run(client.update_kline("BTCUSDT", "1m", now - 3 * MINUTE))
+    assert client.tracked == [now]
+    assert len(client.kline_sink.rows) == 4
+
+
+def test_closed_bars_clear_the_record():
+    now = current_minute()
+    client = TailClient([[now - 3 * MINUTE, now - 2 * MINUTE]])
+    asyncio.run(client.update_kline("BTCUSDT", "1m", now - 3 * MINUTE))
+    assert client.tracked == [None]
+
+
+def test_no_bars_leave_the_record_alone():
+    client = TailClient([])
+    asyncio.run(client.update_kline("BTCUSDT", "1m", current_minute()))
+    assert client.tracked == []
+
+
+def test_refresh_open_kline_forces_start_without_gap_scan():
+    now = current_minute()
+    client = TailClient([[now]])
+    asyncio.run(client.refresh_open_kline("BTCUSDT", "1m", now))
+    assert client.kwargs == {"force_start": True, "scan_gaps": False}
+    assert client.tracked == [now]
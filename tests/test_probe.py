@@ -0,0 +1,61 @@
+import asyncio
+
+from constants import InstType
+import pytest
+
+from exchanges._base_ import PROBE_START_MS, BaseClient
+from utils.timestamps import MS_PER_DAY
+
+NOW = 1_760_000_000_000
+
+
+class ProbeClient(BaseClient):
+    """交易所的替身：first_ms 之后每天都有 bar，记录每次窗口请求"""
+
+    exchange_name = "probe"
+    inst_type = InstType.SPOT
+    base_url = "https://example.invalid"
+
+    def __init__(self, first_ms: int | None, fail: bool = False):
+        # 不连 Doris / MySQL，只验证二分
+        self.first_ms = first_ms
+        self.fail = fail
+        self.windows: list[tuple[int, int]] = []
+
+    async def get_all_symbols(self):
+        return []
+
+    async def _has_kline(self, symbol: str, start_ms: int, end_ms: int) -> bool:
+        if self.fail:
+            raise RuntimeError("rate limited")
+        self.windows.append((start_ms, end_ms))
+        return self.first_ms is not None and start_ms <= max(self.first_ms, start_ms) <= end_ms
+
+
+def probe(client: ProbeClient, **kwargs) -> int | None:
+    return asyncio.run(client.probe_first_kline("BTCUSDT", hi_ms=NOW, **kwargs))
+
+
+def test_finds_first_bar_with_logarithmic_requests():
+    first = PROBE_START_MS + 1234 * MS_PER_DAY
+    client = ProbeClient(first)
+    assert probe(client) == first
+    days = (NOW - PROBE_START_MS) // MS_PER_DAY
+    assert len(client.windows) <= days.bit_length() + 1
+    # 每次请求都是从下界开始的窗口
+    assert {lo for lo, _ in client.windows} == {PROBE_START_MS}
+
+
+def test_listed_before_lower_bound_returns_lower_bound():
+    assert probe(ProbeClient(PROBE_START_MS - 100 * MS_PER_DAY)) == PROBE_START_MS
+
+
+def test_no_bars_returns_none():
+    client = ProbeClient(None)
+    assert probe(client) is None
+    assert len(client.windows) == 1
+
+
+def test_request_failure_is_raised():
+    with pytest.raises(RuntimeError):
+        probe(ProbeClient(PROBE_START_MS, fail=True))
@@ -0,0 +1,141 @@
+import asyncio
+import re
+
+from klines.batch import KlineBatch
+from klines.rollup import KlineRollup
+import numpy as np
+
+MINUTE, HOUR, DAY = 60_000, 3_600_000, 86_400_000
+BASE = 1_700_000_000_000 // DAY * DAY
+COLUMNS = ("open", "high", "low", "close", "volume", "quote_volume", "count")
+
+
+class FakeDoris:
+    """kline_1m 的替身：按 rollup seed 查询里的 `timestamp` 区间返回行"""
+
+    def __init__(self, rows: dict[int, tuple]):
+        self.rows = rows
+
+    async def query(self, sql: str):
+        ranges = [(int(a), int(b)) for a, b in re.findall(r"`timestamp` >= (\d+) AND `timestamp` < (\d+)", sql)]
+        return [(ts, *values) for ts, values in sorted(self.rows.items()) if any(a <= ts < b for a, b in ranges)]
+
+
+class FakeSink:
+    def __init__(self):
+        self.bars: dict[str, dict[int, tuple]] = {}
+
+    async def put(self, batch: KlineBatch, table: str, owner=None):
+        bars = self.bars.setdefault(table, {})
+        for i, ts in enumerate(batch.timestamp.tolist()):
+            bars[ts] = tuple(float(getattr(batch, c)[i]) for c in COLUMNS)
+
+
+def minute(price: float) -> tuple:
+    return price, price + 2, price - 2, price + 1, 1.0, price, 1
+
+
+def batch(rows: dict[int, tuple]) -> KlineBatch:
+    ts = sorted(rows)
+    return KlineBatch.from_columns(
+        {"timestamp": ts, **{c: [rows[t][i] for t in ts] for i, c in enumerate(COLUMNS)}}, 1, 1, "BTC-USDT"
+    )
+
+
+def expected(rows: dict[int, tuple], start: int, interval_ms: int) -> tuple:
+    bucket = [rows[ts] for ts in sorted(rows) if start <= ts < start + interval_ms]
+    return (
+        bucket[0][0],
+        max(r[1] for r in bucket),
+        min(r[2] for r in bucket),
+        bucket[-1][3],
+        *(sum(r[i] for r in bucket) for i in (4, 5, 6)),
+    )
+
+
+def roll(stored: dict[int, tuple], fetched: list[dict[int, tuple]]) -> dict[str, dict[int, tuple]]:
+    sink = FakeSink()
+    rollup = KlineRollup(doris_client=FakeDoris(stored), sink=sink)
+    for rows in fetched:
+        rollup.add(batch(rows))
+    asyncio.run(rollup.flush())
+    return sink.bars
+
+
+def test_disjoint_ranges_in_one_bucket():
+    stored = {BASE + i * MINUTE: minute(100.0 + i % 7) for i in range(1440)}
+    first = {BASE + 3 * HOUR + i * MINUTE: minute(500.0 + i) for i in range(5, 11)}
+    second = {BASE + 3 * HOUR + i * MINUTE: minute(50.0 + i) for i in range(40, 46)}
+    bars = roll(stored, [second, first])
+
+    merged = stored | first | second
+    assert bars["kline_1h"] == {BASE + 3 * HOUR: expected(merged, BASE + 3 * HOUR, HOUR)}
+    assert bars["kline_1d"] == {BASE: expected(merged, BASE, DAY)}
+    assert bars["kline_1d"][BASE][6] == 1440
+
+
+def test_bucket_cut_off_at_tail():
+    # 拉到的最后一根之后，Doris 里还有同一小时的分钟（缺口补齐 / tail refresh）
+    stored = {BASE + i * MINUTE: minute(100.0 + i) for i in range(11 * 60 + 31) if not 658 <= i <= 662}
+    fetched = {BASE + i * MINUTE: minute(300.0 - i) for i in range(658, 663)}
+    bars = roll(stored, [fetched])
+
+    merged = stored | fetched
+    assert bars["kline_1h"] == {
+        BASE + 10 * HOUR: expected(merged, BASE + 10 * HOUR, HOUR),
+        BASE + 11 * HOUR: expected(merged, BASE + 11 * HOUR, HOUR),
+    }
+    assert bars["kline_1h"][BASE + 11 * HOUR][3] == stored[BASE + 11 * HOUR + 30 * MINUTE][3]
+    assert bars["kline_1d"] == {BASE: expected(merged, BASE, DAY)}
+
+
+def test_complete_buckets_skip_seed():
+    fetched = {BASE + i * MINUTE: minute(100.0 + i) for i in range(1440)}
+
+    class NoQuery(FakeDoris):
+        async def query(self, sql: str):
+            raise AssertionError("complete buckets should not be seeded")
+
+    sink = FakeSink()
+    rollup = KlineRollup(doris_client=NoQuery({}), sink=sink)
+    rollup.add(batch(fetched))
+    asyncio.run(rollup.flush())
+    assert len(sink.bars["kline_1h"]) == 24
+    assert sink.bars["kline_1d"][BASE] == expected(fetched, BASE, DAY)
+    assert np.isclose(sink.bars["kline_1d"][BASE][4], 1440)
+
+
+def test_add_during_flush_goes_to_next_flush():
+    stored = {BASE + i * MINUTE: minute(100.0 + i) for i in range(60)}
+    first = {BASE + i * MINUTE: minute(500.0 + i) for i in range(5, 11)}
+    second = {BASE + i * MINUTE: minute(50.0 + i) for i in range(20, 26)}
+
+    class SlowDoris(FakeDoris):
+        def __init__(self, rows):
+            super().__init__(rows)
+            self.querying = asyncio.Event()
+            self.release = asyncio.Event()
+
+        async def query(self, sql: str):
+            self.querying.set()
+            await self.release.wait()
+            return await super().query(sql)
+
+    async def main():
+        doris, sink = SlowDoris(dict(stored)), FakeSink()
+        rollup = KlineRollup(intervals=("1h",), doris_client=doris, sink=sink)
+        rollup.add(batch(first))
+        flushing = asyncio.create_task(rollup.flush())
+        await doris.querying.wait()
+        # seed 查询进行中收到新的 batch：不能混进本次 flush，也不能被本次 flush 丢掉
+        rollup.add(batch(second))
+        doris.release.set()
+        await flushing
+        assert sink.bars["kline_1h"] == {BASE: expected(stored | first, BASE, HOUR)}
+
+        doris.rows |= first
+        await rollup.flush()
+        assert sink.bars["kline_1h"] == {BASE: expected(stored | first | second, BASE, HOUR)}
+        assert sink.bars["kline_1h"][BASE][6] == 60
+
+    asyncio.run(main())
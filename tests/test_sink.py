@@ -0,0 +1,103 @@
+import asyncio
+
+from klines.batch import KlineBatch
+import pytest
+
+from databases.doris.sink import KlineSink
+
+
+class FakeLoader:
+    """DorisStreamLoader 的替身：记录每次 StreamLoad，fail 里的 symbol 写入失败"""
+
+    def __init__(self, fail=(), delay: float = 0.0):
+        self.fail = set(fail)
+        self.delay = delay
+        self.loads: list[tuple[str, list[str], bool]] = []
+        self.committed: list[int] = []
+        self.aborted: list[int] = []
+        self.txn_id = 0
+
+    async def send_rows(self, rows, table: str, two_phase_commit: bool = False):
+        await asyncio.sleep(self.delay)
+        symbols = [batch.symbol for batch in rows]
+        self.loads.append((table, symbols, two_phase_commit))
+        if self.fail & set(symbols):
+            raise RuntimeError(f"load {symbols} failed")
+        if two_phase_commit:
+            self.txn_id += 1
+            return {"TxnId": self.txn_id}
+        return {}
+
+    async def commit(self, txn_id: int):
+        self.committed.append(txn_id)
+
+    async def abort(self, txn_id: int):
+        self.aborted.append(txn_id)
+
+    async def close(self):
+        pass
+
+
+def bars(symbol: str, n: int = 3, start: int = 0) -> KlineBatch:
+    ts = [start + i * 60_000 for i in range(n)]
+    return KlineBatch.from_columns(
+        {"timestamp": ts, "open": [1.0] * n, "high": [2.0] * n, "low": [0.5] * n, "close": [1.5] * n}, 1, 1, symbol
+    )
+
+
+def test_flush_is_scoped_to_owner():
+    async def main():
+        loader = FakeLoader(fail={"BAD"})
+        sink = KlineSink(loader)
+        await sink.put(bars("BTC"), "kline_1m", owner="a")
+        await sink.put(bars("BAD"), "kline_1m", owner="b")
+
+        await sink.flush("a")
+        assert loader.loads == [("kline_1m", ["BTC"], False)]
+        with pytest.raises(Exception, match="BAD"):
+            await sink.flush("b")
+        # 失败只上报一次，且不会出现在其它 owner 的 flush 里
+        await sink.flush("b")
+        await sink.flush()
+        await sink.close()
+
+    asyncio.run(main())
+
+
+def test_put_blocks_until_pending_rows_drain():
+    async def main():
+        loader = FakeLoader(delay=0.05)
+        sink = KlineSink(loader, max_rows=3, max_pending_rows=3)
+        await sink.put(bars("BTC"), "kline_1m")
+        # 第一批已占满 pending 上限：第二批要等它的 StreamLoad 完成才能写入
+        second = asyncio.create_task(sink.put(bars("ETH"), "kline_1m"))
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        await asyncio.wait_for(second, 1)
+        assert [symbols for _, symbols, _ in loader.loads] == [["BTC"]]
+        await sink.flush()
+        assert [symbols for _, symbols, _ in loader.loads] == [["BTC"], ["ETH"]]
+        await sink.close()
+
+    asyncio.run(main())
+
+
+def test_two_phase_commit_and_abort():
+    async def main():
+        loader = FakeLoader(fail={"BAD"})
+        sink = KlineSink(loader, two_phase_commit=True)
+        await sink.put(bars("BTC"), "kline_1m", owner="ok")
+        await sink.put(bars("BTC"), "kline_1h", owner="ok")
+        await sink.flush("ok")
+        assert sorted(loader.committed) == [1, 2]
+
+        await sink.put(bars("ETH"), "kline_1m", owner="mixed")
+        await sink.put(bars("BAD"), "kline_1h", owner="mixed")
+        with pytest.raises(Exception, match="BAD"):
+            await sink.flush("mixed")
+        # 同一 owner 有一次失败：预提交成功的那次也要 abort，不能部分可见
+        assert loader.aborted == [3]
+        assert sorted(loader.committed) == [1, 2]
+        await sink.close()
+
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from klines.batch import KlineBatch
+import pytest
+
+from databases.doris import DorisStreamLoader
+
+
+def bars(n: int = 3) -> KlineBatch:
+    ts = [i * 60_000 for i in range(n)]
+    return KlineBatch.from_columns(
+        {"timestamp": ts, "open": [1.0] * n, "high": [2.0] * n, "low": [0.5] * n, "close": [1.5] * n}, 1, 1, "BTC"
+    )
+
+
+class FakeCluster:
+    """FE 把 StreamLoad 307 重定向到 BE，BE 记录收到的 header 和 body"""
+
+    def __init__(self):
+        self.fe_loads = 0
+        self.be_loads: list[tuple[dict, bytes]] = []
+        self.fe = TestServer(self._app(self._fe))
+        self.be = TestServer(self._app(self._be))
+
+    @staticmethod
+    def _app(handler) -> web.Application:
+        app = web.Application()
+        app.router.add_put("/api/{db}/{table}/_stream_load", handler)
+        app.router.add_get("/api/health", lambda request: web.json_response({"status": "OK"}))
+        return app
+
+    async def _fe(self, request: web.Request):
+        self.fe_loads += 1
+        raise web.HTTPTemporaryRedirect(f"http://127.0.0.1:{self.be.port}{request.path}")
+
+    async def _be(self, request: web.Request):
+        self.be_loads.append((dict(request.headers), await request.read()))
+        return web.json_response({"Status": "Success", "NumberLoadedRows": 1})
+
+    async def __aenter__(self):
+        await self.fe.start_server()
+        await self.be.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fe.close()
+        await self.be.close()
+
+
+def loader(monkeypatch, cluster: FakeCluster, **kwargs) -> DorisStreamLoader:
+    monkeypatch.setenv("DORIS_HOST", "127.0.0.1")
+    monkeypatch.setenv("DORIS_HTTP_PORT", str(cluster.fe.port))
+    monkeypatch.setenv("DORIS_USER", "root")
+    monkeypatch.delenv("DORIS_BE_NODES", raising=False)
+    kwargs.setdefault("load_format", "csv")
+    kwargs.setdefault("compress_type", "none")
+    kwargs.setdefault("stream", False)
+    return DorisStreamLoader(**kwargs)
+
+
+def test_redirect_target_is_cached(monkeypatch):
+    async def main():
+        async with FakeCluster() as cluster:
+            doris = loader(monkeypatch, cluster, cache_redirects=True)
+            for _ in range(3):
+                await doris.send_rows(bars(), "kline_1m")
+            await doris.close()
+            # 第一次由 FE 分配 BE，之后直接写缓存的 BE
+            assert cluster.fe_loads == 1
+            assert len(cluster.be_loads) == 3
+
+    asyncio.run(main())
+
+
+def test_unreachable_backend_falls_back_to_fe(monkeypatch):
+    async def main():
+        async with FakeCluster() as cluster:
+            doris = loader(monkeypatch, cluster, cache_redirects=True, be_cooldown=60)
+            doris._backends["http://127.0.0.1:1"] = 0.0
+            await doris.send_rows(bars(), "kline_1m")
+            await doris.send_rows(bars(), "kline_1m")
+            await doris.close()
+            # 连不上的 BE 被摘除，退回 FE 重新分配，之后用 FE 给出的 BE
+            assert doris._backends["http://127.0.0.1:1"] > 0
+            assert cluster.fe_loads == 1
+            assert len(cluster.be_loads) == 2
+
+    asyncio.run(main())
+
+
+def test_without_cache_every_load_goes_through_fe(monkeypatch):
+    async def main():
+        async with FakeCluster() as cluster:
+            doris = loader(monkeypatch, cluster, cache_redirects=False)
+            await doris.send_rows(bars(), "kline_1m")
+            await doris.send_rows(bars(), "kline_1m")
+            await doris.close()
+            assert cluster.fe_loads == 2
+            headers, body = cluster.be_loads[0]
+            assert headers["columns"].startswith("symbol,timestamp,open,high,low,close,dt=")
+            assert body.decode().splitlines()[0] == "BTC\t0\t1.0\t2.0\t0.5\t1.5"
+
+    asyncio.run(main())
+
+
+def test_arrow_payload(monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+
+    async def main():
+        async with FakeCluster() as cluster:
+            doris = loader(monkeypatch, cluster, load_format="arrow")
+            batch = bars()
+            batch.close[1] = float("nan")
+            await doris.send_rows(batch, "kline_1m")
+            await doris.close()
+            return cluster.be_loads[0]
+
+    headers, body = asyncio.run(main())
+    assert headers["format"] == "arrow"
+    assert "column_separator" not in headers
+    table = pa.ipc.open_stream(body).read_all()
+    # 常量列和 dt 由 columns 头生成，不进 payload
+    assert table.column_names == ["symbol", "timestamp", "open", "high", "low", "close"]
+    assert table.column("timestamp").to_pylist() == [0, 60_000, 120_000]
+    assert table.column("close").to_pylist() == [1.5, None, 1.5]
+
+
+def test_arrow_falls_back_to_csv_on_mixed_types(monkeypatch):
+    pytest.importorskip("pyarrow")
+
+    async def main():
+        async with FakeCluster() as cluster:
+            doris = loader(monkeypatch, cluster, load_format="arrow")
+            await doris.send_rows([{"id": 1, "name": "a"}, {"id": "x", "name": "b"}], "some_table")
+            await doris.close()
+            return cluster.be_loads[0]
+
+    headers, body = asyncio.run(main())
+    assert "format" not in headers
+    assert body.decode() == "1\ta\nx\tb"
@@ -0,0 +1,76 @@
+import asyncio
+
+from klines.batch import KlineBatch
+import pytest
+
+from databases.doris import DorisStreamLoader
+
+
+class Resp:
+    status = 200
+
+
+class FakeDoris:
+    """FE 的替身：第一次 StreamLoad 返回 Label Already Exists，之后成功；记录 2PC 请求"""
+
+    def __init__(self, existing: str, waited: str):
+        self.existing = existing
+        self.waited = waited
+        self.loads = 0
+        self.two_phase: list[dict] = []
+
+    async def request(self, url, data, headers, auth):
+        if url.endswith("_stream_load_2pc"):
+            self.two_phase.append(headers)
+            return Resp(), {"status": "Success"}
+        self.loads += 1
+        if self.loads == 1:
+            return Resp(), {"Status": "Label Already Exists", "ExistingJobStatus": self.existing}
+        return Resp(), {"Status": "Success", "TxnId": 7}
+
+    async def wait_label(self, label):
+        return self.waited
+
+
+def send(monkeypatch, existing: str, waited: str) -> tuple[dict, FakeDoris]:
+    monkeypatch.setenv("DORIS_HOST", "fe")
+    monkeypatch.setenv("DORIS_USER", "root")
+    loader = DorisStreamLoader(stream=False, compress_type="none", load_format="csv")
+    doris = FakeDoris(existing, waited)
+    loader._send_streamload_request_async = doris.request
+    loader._wait_label = doris.wait_label
+    batch = KlineBatch.from_columns(
+        {"timestamp": [0, 60_000], "open": [1.0, 1.0], "high": [2.0, 2.0], "low": [0.5, 0.5], "close": [1.5, 1.5]},
+        1,
+        1,
+        "BTC-USDT",
+    )
+    result = asyncio.run(loader.send_rows(batch, "kline_1m", label="kline_1m-BTC-USDT"))
+    return result, doris
+
+
+@pytest.mark.parametrize(
+    ("existing", "waited", "visible"),
+    [("FINISHED", None, True), ("RUNNING", "VISIBLE", True), ("RUNNING", "COMMITTED", False)],
+)
+def test_finished_label_is_duplicate(monkeypatch, existing, waited, visible):
+    result, doris = send(monkeypatch, existing, waited)
+    assert result["Duplicate"] is True
+    assert result["Visible"] is visible
+    assert doris.loads == 1
+    assert doris.two_phase == []
+
+
+def test_stale_precommitted_label_is_aborted_and_reloaded(monkeypatch):
+    result, doris = send(monkeypatch, "PRECOMMITTED", "PRECOMMITTED")
+    assert doris.two_phase == [{"label": "kline_1m-BTC-USDT", "txn_operation": "abort"}]
+    assert doris.loads == 2
+    assert "Duplicate" not in result
+    assert result["Visible"] is True
+
+
+def test_failed_label_is_reloaded(monkeypatch):
+    result, doris = send(monkeypatch, "CANCELLED", "CANCELLED")
+    assert doris.loads == 2
+    assert doris.two_phase == []
+    assert "Duplicate" not in result
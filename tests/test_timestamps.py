@@ -0,0 +1,35 @@
+from datetime import UTC, datetime, timedelta, timezone
+import time
+
+import numpy as np
+
+from utils.timestamps import DT_FORMAT, align_ms, align_to_5m, dt_to_ms, ms_to_dt, ms_to_dt_array
+
+
+def test_ms_to_dt_array_matches_scalar_utc():
+    rng = np.random.default_rng(0)
+    ms = rng.integers(0, 4_102_444_800_000, 2000)  # 1970 → 2100
+    ms[:3] = [0, 86_399_999, 951_782_400_000]  # 纪元、当天最后一毫秒、2000-02-29
+    expected = [time.strftime(DT_FORMAT, time.gmtime(v // 1000)) for v in ms.tolist()]
+    assert ms_to_dt_array(ms) == expected
+    assert [ms_to_dt(v) for v in ms[:3].tolist()] == [
+        "1970-01-01 00:00:00",
+        "1970-01-01 23:59:59",
+        "2000-02-29 00:00:00",
+    ]
+    assert ms_to_dt_array([]) == []
+
+
+def test_dt_to_ms_treats_naive_as_utc():
+    assert dt_to_ms(datetime(2025, 1, 1)) == 1_735_689_600_000
+    assert dt_to_ms(datetime(2025, 1, 1, 8, tzinfo=timezone(timedelta(hours=8)))) == 1_735_689_600_000
+    assert dt_to_ms(datetime(2025, 1, 1, tzinfo=UTC)) == 1_735_689_600_000
+
+
+def test_align():
+    assert align_ms(1_735_689_659_999, 60_000) == 1_735_689_600_000
+    assert align_ms("1735689659999", 60_000) == 1_735_689_600_000
+    assert align_to_5m(np.array([1_735_689_899_999, 1_735_689_900_000])).tolist() == [
+        1_735_689_600_000,
+        1_735_689_900_000,
+    ]
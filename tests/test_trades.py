@@ -0,0 +1,99 @@
+import asyncio
+
+from klines.trades import TradeKlineAggregator
+import numpy as np
+
+from exchanges._base_ import BaseClient
+from exchanges.kraken import KrakenSpotClient
+
+MINUTE = 60_000
+BASE = 1_700_000_000_000 // MINUTE * MINUTE
+
+
+def trades(*rows: tuple[int, float, float]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ts, price, qty = zip(*rows, strict=True)
+    return np.array(ts, dtype=np.int64), np.array(price), np.array(qty)
+
+
+def test_bucket_spanning_pages_and_flat_gaps():
+    aggregator = TradeKlineAggregator(1, 1, "XBTUSD")
+    first = aggregator.add(*trades((BASE + 1_000, 10.0, 1.0), (BASE + 2_000, 12.0, 2.0), (BASE + MINUTE, 11.0, 1.0)))
+    # 最后一个 bucket 可能还有成交在下一页，先不输出
+    assert first.timestamp.tolist() == [BASE]
+    assert (first.open[0], first.high[0], first.low[0], first.close[0]) == (10.0, 12.0, 10.0, 12.0)
+    assert (first.volume[0], first.quote_volume[0], first.count[0]) == (3.0, 34.0, 2)
+
+    second = aggregator.add(*trades((BASE + MINUTE + 5_000, 9.0, 1.0), (BASE + 4 * MINUTE, 13.0, 1.0)))
+    assert second.timestamp.tolist() == [BASE + MINUTE]
+    assert (second.open[0], second.high[0], second.low[0], second.close[0], second.count[0]) == (
+        11.0,
+        11.0,
+        9.0,
+        9.0,
+        2,
+    )
+
+    last = aggregator.finish(BASE + 7 * MINUTE - 1)
+    assert last.timestamp.tolist() == [BASE + i * MINUTE for i in range(2, 7)]
+    # 没有成交的 bucket 用上一根 close 补成平 bar，包括最后一笔成交之后到 end_ms 的部分
+    assert last.open.tolist() == [9.0, 9.0, 13.0, 13.0, 13.0]
+    assert last.close.tolist() == [9.0, 9.0, 13.0, 13.0, 13.0]
+    assert last.volume.tolist() == [0.0, 0.0, 1.0, 0.0, 0.0]
+    assert last.count.tolist() == [0, 0, 1, 0, 0]
+
+
+def test_finish_only_emits_complete_buckets():
+    aggregator = TradeKlineAggregator(1, 1, "XBTUSD")
+    assert aggregator.add(*trades((BASE, 10.0, 1.0), (BASE + MINUTE + 1, 11.0, 1.0))).timestamp.tolist() == [BASE]
+    # end_ms 落在 BASE + 1 分钟的 bucket 中间：这根还不完整，留到下一次
+    assert aggregator.finish(BASE + MINUTE + 30_000) is None
+    assert aggregator.finish(BASE + 2 * MINUTE - 1).timestamp.tolist() == [BASE + MINUTE]
+
+
+FLOOR = BASE + 1_000 * MINUTE
+
+
+class FakeKraken(KrakenSpotClient):
+    def __init__(self):
+        # 不连 Doris / MySQL，只验证 get_kline 的拆分
+        self.calls = []
+
+    def ohlc_floor(self, interval: str) -> int:
+        return FLOOR
+
+    async def get_kline_from_trades(self, symbol, interval, start_ms, end_ms, **kwargs):
+        self.calls.append(("trades", start_ms, end_ms))
+        yield "trades"
+
+
+def run(monkeypatch, **kwargs) -> tuple[list, list]:
+    client = FakeKraken()
+
+    async def ohlc(self, symbol, interval, start_ms, end_ms, sleep_ms, **kwargs):
+        self.calls.append(("ohlc", start_ms, end_ms, kwargs["onboard_ms"]))
+        volume = np.array([2.0])
+        yield type("Batch", (), {"volume": volume, "quote_volume": np.array([10.0])})()
+
+    monkeypatch.setattr(BaseClient, "get_kline", ohlc)
+
+    async def collect():
+        return [b async for b in client.get_kline("XBTUSD", "1m", **kwargs)]
+
+    return asyncio.run(collect()), client.calls
+
+
+def test_forced_start_before_ohlc_window_uses_trades(monkeypatch):
+    results, calls = run(monkeypatch, start_ms=BASE, force_start=True)
+    assert calls == [("trades", BASE, FLOOR - 1), ("ohlc", FLOOR, None, FLOOR)]
+    # OHLC 返回的是 vwap：quote_volume = vwap * volume
+    assert results[1].quote_volume.tolist() == [20.0]
+
+
+def test_window_entirely_before_ohlc_floor(monkeypatch):
+    _, calls = run(monkeypatch, start_ms=BASE, end_ms=BASE + 10 * MINUTE, force_start=True)
+    assert calls == [("trades", BASE, BASE + 10 * MINUTE)]
+
+
+def test_regular_sync_stays_in_ohlc_window(monkeypatch):
+    _, calls = run(monkeypatch, start_ms=BASE, onboard_ms=BASE)
+    assert calls == [("ohlc", BASE, None, FLOOR)]
@@ -0,0 +1,105 @@
+import asyncio
+
+from klines.batch import KlineBatch
+from klines.validate import (
+    BAD_PRICE,
+    BAD_RANGE,
+    BAD_TIMESTAMP,
+    BAD_VOLUME,
+    DUPLICATE,
+    MIN_KLINE_MS,
+    QUARANTINE_OWNER,
+    QUARANTINE_TABLE,
+    VOLUME_SPIKE,
+    KlineValidator,
+    get_kline_validator,
+    quarantine_invalid,
+    reason_names,
+)
+import numpy as np
+
+NOW = 1_700_000_000_000 // 60_000 * 60_000
+
+
+def batch(rows: list[tuple], ts: list[int] | None = None) -> KlineBatch:
+    ts = ts if ts is not None else [NOW - (len(rows) - i) * 60_000 for i in range(len(rows))]
+    names = ("open", "high", "low", "close", "volume")
+    return KlineBatch.from_columns(
+        {"timestamp": ts, **{c: [r[i] for r in rows] for i, c in enumerate(names)}}, 1, 1, "BTC-USDT"
+    )
+
+
+GOOD = (10.0, 12.0, 9.0, 11.0, 5.0)
+
+
+def test_clean_batch_is_returned_as_is():
+    b = batch([GOOD] * 100)
+    valid, quarantined = KlineValidator().split(b, "1m", now_ms=NOW)
+    assert valid is b
+    assert quarantined == []
+
+
+def test_bad_rows_are_split_with_reasons():
+    rows = [
+        GOOD,
+        (-1.0, 12.0, 9.0, 11.0, 5.0),  # 价格 <= 0，同时 low 不包住 open
+        (10.0, 10.5, 9.0, 11.0, 5.0),  # high < close
+        (10.0, 12.0, 9.0, 11.0, -1.0),  # volume < 0
+        (10.0, 12.0, 9.0, float("nan"), 5.0),
+        GOOD,
+    ]
+    validator = KlineValidator()
+    valid, quarantined = validator.split(batch(rows), "1m", now_ms=NOW)
+    assert len(valid) == 2
+    assert [r["reason"] for r in quarantined] == [
+        reason_names(BAD_PRICE | BAD_RANGE),
+        reason_names(BAD_RANGE),
+        reason_names(BAD_VOLUME),
+        reason_names(BAD_PRICE),
+    ]
+    # NaN 写成 NULL
+    assert quarantined[3]["close"] is None
+    assert validator.pop_counts() == {(1, 1, "bad_price"): 2, (1, 1, "bad_range"): 2, (1, 1, "bad_volume"): 1}
+    assert validator.counts == {}
+
+
+def test_volume_spike_needs_enough_rows():
+    rows = [GOOD] * 59 + [(10.0, 12.0, 9.0, 11.0, 5.0 * 10_000)]
+    validator = KlineValidator(spike_min_rows=60)
+    valid, quarantined = validator.split(batch(rows), "1m", now_ms=NOW)
+    assert len(valid) == 59
+    assert [r["reason"] for r in quarantined] == [reason_names(VOLUME_SPIKE)]
+
+    valid, quarantined = validator.split(batch(rows[1:]), "1m", now_ms=NOW)
+    assert len(valid) == 59
+    assert quarantined == []
+
+
+def test_duplicate_and_out_of_range_timestamps():
+    ts = [MIN_KLINE_MS - 60_000, NOW - 120_000, NOW - 120_000, NOW + 120_000]
+    rows = [GOOD, (1.0, 2.0, 0.5, 1.5, 1.0), (3.0, 4.0, 2.5, 3.5, 1.0), GOOD]
+    valid, quarantined = KlineValidator().split(batch(rows, ts), "1m", now_ms=NOW)
+    # 同一 timestamp 保留最后一根
+    assert valid.timestamp.tolist() == [NOW - 120_000]
+    assert np.isclose(valid.open[0], 3.0)
+    assert [(r["timestamp"], r["reason"]) for r in quarantined] == [
+        (MIN_KLINE_MS - 60_000, reason_names(BAD_TIMESTAMP)),
+        (NOW - 120_000, reason_names(DUPLICATE)),
+        (NOW + 120_000, reason_names(BAD_TIMESTAMP)),
+    ]
+
+
+def test_quarantine_rows_go_to_their_own_owner():
+    class FakeSink:
+        def __init__(self):
+            self.puts = []
+
+        async def put(self, rows, table, owner=None):
+            self.puts.append((table, owner, len(rows)))
+
+    sink = FakeSink()
+    rows = [GOOD, (-1.0, 12.0, 9.0, 11.0, 5.0), GOOD]
+    valid = asyncio.run(quarantine_invalid(batch(rows), "1m", sink))
+    get_kline_validator().pop_counts()
+    assert len(valid) == 2
+    assert sink.puts == [(QUARANTINE_TABLE, QUARANTINE_OWNER, 1)]